@@ -1,20 +1,84 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, File, Header, Query, Request, Response, UploadFile
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Set, Dict, Optional, Any
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Set, Dict, Optional, Any, Literal
 from enum import Enum
+from datetime import datetime
 from models import Employee, Shift, ScheduleRequest, ScheduleResponse, ScheduleConstraints, BusinessRules
 from models import Department, SkillLevel, ShiftType
+import asyncio
+import dataclasses
 import json
-import sys
-from optimizers.BaseOptimizer import BaseOptimizer
-from optimizers.FallbackOptimizer import FallbackOptimizer
-from optimizers.GradualOptimizer import GradualOptimizer
+import os
+import time
+import uuid
+# Solver-backed optimizers (and PuLP with them) are loaded by name through
+# jobs.load_optimizer when first used; only the numpy-only pieces load here
+from optimizers.BatchEvaluator import BatchEvaluator
+from optimizers.CompiledProblem import CompiledProblem
+from optimizers.RepairOptimizer import RepairOptimizer
+from jobs import OPTIMIZERS, JobManager, JobQueueFull, load_optimizer, quick_schedule, solve_schedule
+from cache import ResultCache, request_key
+from datasets import DatasetError, DatasetStore, UnsupportedFormat, detect_format, parse_employees, parse_shifts, parse_traffic
+from demand import DemandModel, TrafficStore, epoch_minute, staff_shifts
+from demand import cache_stats as demand_cache_stats
+from store import ScheduleStore, assignment_delta
+from scenarios import release_base, scenario_overrides, scenario_request, share_base, solve_scenario
+from views import employee_rota, encoded_response, not_modified, schedule_etag, schedule_page
+from perf import PerfMetrics, profiler_available
+from logs import configure_logging, elapsed_ms, get_logger, request_id, shutdown_logging
+from starlette.concurrency import run_in_threadpool
 
-sys.stdout.reconfigure(line_buffering=True)
+configure_logging()
+log = get_logger("app")
 
 app = FastAPI(title="Workforce Scheduler")
 
+# CPU-bound solves run here, never on the event loop
+jobs = JobManager()
+
+# Solved schedules (and their patched versions) by schedule id, in memory;
+# SCHEDULER_STORE_PATH also keeps every version in SQLite across restarts
+schedules = ScheduleStore(
+    max_schedules=int(os.environ.get("SCHEDULER_STORE_SIZE", 200)),
+    path=os.environ.get("SCHEDULER_STORE_PATH"),
+)
+
+# Phase timings and optimizer counters of every solve, served on /api/metrics
+solve_metrics = PerfMetrics()
+
+def _job_completed(job, schedule_request):
+    solve_metrics.observe(job.result.metrics.get("perf"))
+    schedules.save(schedule_request, job.result)
+
+jobs.on_complete = _job_completed
+
+# Uploaded rosters / shift lists that schedule requests can reference by id
+datasets = DatasetStore()
+
+# Traffic series per department / region that demand-driven staffing reads
+traffic = TrafficStore()
+
+# Solved responses by canonical request hash; SCHEDULER_CACHE_PATH adds a SQLite copy
+cache = ResultCache(
+    max_entries=int(os.environ.get("SCHEDULER_CACHE_SIZE", 256)),
+    path=os.environ.get("SCHEDULER_CACHE_PATH"),
+)
+
+@app.middleware("http")
+async def tag_request(request: Request, call_next):
+    """Give every request an id (X-Request-ID, or a new one) for its log records"""
+    rid = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id.set(rid)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id.reset(token)
+    response.headers["X-Request-ID"] = rid
+    return response
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -72,18 +136,133 @@ class ShiftModel(BaseModel):
     priority: int = 1
     expected_traffic: int = 0
 
+class DemandModelSpec(BaseModel):
+    """Staffing model turning traffic into shift bounds; see demand.DemandModel"""
+    method: Literal["ratio", "erlang_c"] = "ratio"
+    traffic_per_agent: float = Field(1000000.0, gt=0)  # ratio: traffic one person handles per hour
+    handle_seconds: float = Field(300.0, gt=0)  # erlang_c: average handling time per contact
+    service_level: float = Field(0.8, gt=0, lt=1)  # erlang_c: share answered within answer_seconds
+    answer_seconds: float = Field(20.0, ge=0)
+    max_occupancy: float = Field(0.85, gt=0, le=1)
+    shrinkage: float = Field(0.0, ge=0, lt=1)  # share of paid time not available for traffic
+    min_staff: int = Field(1, ge=0)
+    headroom: int = Field(1, ge=0)  # max_employees = required headcount + headroom
+    max_agents: int = Field(500, ge=1, le=5000)
+
+    def demand_model(self) -> DemandModel:
+        return DemandModel(**self.model_dump())
+
 class ScheduleRequestModel(BaseModel):
     start_date: str
     end_date: str
-    employees: List[EmployeeModel]
-    shifts: List[ShiftModel]
+    employees: List[EmployeeModel] = []
+    shifts: List[ShiftModel] = []
+    dataset_id: Optional[str] = None  # uploaded employees/shifts, used where the lists above are empty
     constraints: Dict = {}
     business_rules: Dict = {}
+    phase: int = Field(1, ge=1, le=4)  # GradualOptimizer constraint phase
+    optimizer: Literal["gradual", "fallback", "milp", "decomposed", "local_search", "rolling"] = "gradual"
+    time_limit_seconds: Optional[float] = Field(None, gt=0)  # milp/decomposed, per window for rolling
+    mip_gap: Optional[float] = Field(None, ge=0, le=1)  # milp/decomposed/rolling only
+    time_budget_ms: Optional[int] = Field(None, gt=0)  # local_search only
+    window_days: Optional[int] = Field(None, ge=1)  # rolling only
+    overlap_days: Optional[int] = Field(None, ge=0)  # rolling only
+    profile: Optional[Literal["cprofile", "pyinstrument"]] = None  # profiler report in metrics["perf"]
+    # Set shift min/max_employees from uploaded traffic (or expected_traffic) unless
+    # business_rules.traffic_based_staffing is false
+    demand: Optional[DemandModelSpec] = None
+
+    blackouts: Dict[str, Set[str]] = {}  # employee id -> unavailable dates
+
+    def optimizer_options(self) -> Dict:
+        """Constructor arguments for the selected optimizer"""
+        if self.optimizer == "local_search":
+            return {"time_budget_ms": self.time_budget_ms} if self.time_budget_ms else {}
+        if self.optimizer not in ("milp", "decomposed", "rolling"):
+            return {}
+        options = {}
+        if self.optimizer == "rolling":
+            if self.window_days is not None:
+                options["window_days"] = self.window_days
+            if self.overlap_days is not None:
+                options["overlap_days"] = self.overlap_days
+        if self.time_limit_seconds is not None:
+            options["time_limit"] = self.time_limit_seconds
+        if self.mip_gap is not None:
+            options["mip_gap"] = self.mip_gap
+        return options
+
+class ShiftUpdateModel(BaseModel):
+    id: str
+    min_employees: Optional[int] = None
+    max_employees: Optional[int] = None
+    priority: Optional[int] = None
+    required_skill_level: Optional[SkillLevelModel] = None
+    required_skills: Optional[Set[str]] = None
+
+class BlackoutModel(BaseModel):
+    employee_id: str
+    dates: List[str]
+
+class EvaluateRequestModel(BaseModel):
+    schedule_id: str
+    version: Optional[int] = None  # latest by default
+    candidates: List[Dict[str, List[str]]] = Field(..., min_length=1, max_length=10000)  # shift id -> employee ids
+    include_details: bool = True  # per-shift understaffing lists in each risk_assessment
+
+class SchedulePatchModel(BaseModel):
+    add_employees: List[EmployeeModel] = []
+    remove_employees: List[str] = []
+    add_shifts: List[ShiftModel] = []
+    remove_shifts: List[str] = []
+    update_shifts: List[ShiftUpdateModel] = []
+    blackouts: List[BlackoutModel] = []
+
+class ScenarioModel(BaseModel):
+    name: str
+    constraints: Dict = {}  # merged over the base constraints
+    business_rules: Dict = {}  # merged over the base business rules
+    changes: Optional[SchedulePatchModel] = None  # roster / shift changes, as for /patch
+
+class TrafficPointModel(BaseModel):
+    timestamp: str  # interval start, local YYYY-MM-DDTHH:MM
+    volume: float = Field(..., ge=0)  # traffic in the interval
+
+class TrafficBatchModel(BaseModel):
+    department: DepartmentModel
+    region: str = "NA"
+    interval_minutes: int = Field(60, ge=1, le=1440)
+    points: List[TrafficPointModel] = Field(..., max_length=100000)
+
+class StaffingRequestModel(BaseModel):
+    shifts: List[ShiftModel] = []
+    dataset_id: Optional[str] = None  # uploaded shifts, used when the list above is empty
+    demand: DemandModelSpec = DemandModelSpec()
+
+class ScenariosRequestModel(BaseModel):
+    base: ScheduleRequestModel
+    scenarios: List[ScenarioModel] = Field(..., min_length=1, max_length=16)
+    include_base: bool = True  # solve the unchanged base too and compare against it
+    include_schedules: bool = False  # full ScheduleResponse per scenario
+
+# Demo traffic (ad impressions / support contacts) per shift on a weekday; weekends see a fraction.
+# Only attached with demandStaffing: above 5,000,000 a shift counts as high-traffic in the risk assessment
+DEMO_TRAFFIC = {
+    (DepartmentModel.AD_OPS, ShiftTypeModel.MORNING_SHIFT): 4500000,
+    (DepartmentModel.AD_OPS, ShiftTypeModel.STANDARD_SHIFT): 6000000,
+    (DepartmentModel.AD_OPS, ShiftTypeModel.AFTERNOON_SHIFT): 5000000,
+    (DepartmentModel.SUPPORT, ShiftTypeModel.STANDARD_SHIFT): 2000000,
+}
+DEMO_WEEKEND_TRAFFIC = 0.4
+
+# Staffing model for demo schedules generated with demandStaffing
+DEMO_DEMAND_MODEL = DemandModel(traffic_per_agent=250000)
 
 def generate_demo_data(num_employees=50, num_days=30, start_date="2025-11-01", employee_distribution=None):
     """Generate realistic workforce and shift data with customizable parameters"""
     
-    print(f"Generating demo data with: {num_employees} employees, {num_days} days, distribution: {employee_distribution}")
+    log.debug("generating_demo_data", extra={"num_employees": num_employees, "num_days": num_days,
+                                             "employee_distribution": employee_distribution})
     
     # Default employee distribution if not provided
     if employee_distribution is None:
@@ -170,8 +349,6 @@ def generate_demo_data(num_employees=50, num_days=30, start_date="2025-11-01", e
     eng_count = max(0, min(eng_count, 15))
     support_count = max(0, min(support_count, 15))
     
-    print(f"Department counts - AdOps: {ad_ops_count}, Eng: {eng_count}, Support: {support_count}")
-    
     # Select employees from each department
     ad_ops_employees = [emp for emp in all_possible_employees if emp["department"] == DepartmentModel.AD_OPS][:ad_ops_count]
     eng_employees = [emp for emp in all_possible_employees if emp["department"] == DepartmentModel.ENGINEERING][:eng_count]
@@ -183,7 +360,6 @@ def generate_demo_data(num_employees=50, num_days=30, start_date="2025-11-01", e
     # If we don't have enough employees due to distribution constraints, fill from available pool
     if len(employees) < num_employees:
         needed = num_employees - len(employees)
-        print(f"Need {needed} more employees to reach requested {num_employees}")
         
         # Get all employees not yet selected, sorted by department priority
         available_employees = [emp for emp in all_possible_employees if emp not in employees]
@@ -277,12 +453,8 @@ def generate_demo_data(num_employees=50, num_days=30, start_date="2025-11-01", e
         })
         shift_id += 1
     
-    print(f"Generated {len(employees)} employees and {len(shifts)} shifts for {num_days} days")
-    print(f"Date range: {dates[0]} to {dates[-1]}")
-    print(f"Final department distribution: "
-          f"AdOps: {len([e for e in employees if e['department'] == DepartmentModel.AD_OPS])}, "
-          f"Eng: {len([e for e in employees if e['department'] == DepartmentModel.ENGINEERING])}, "
-          f"Support: {len([e for e in employees if e['department'] == DepartmentModel.SUPPORT])}")
+    log.debug("generated_demo_data", extra={"employees": len(employees), "shifts": len(shifts),
+                                            "start_date": dates[0], "end_date": dates[-1]})
     
     return {
         "employees": employees,
@@ -307,73 +479,348 @@ def generate_demo_data(num_employees=50, num_days=30, start_date="2025-11-01", e
         }
     }
 
+def _validate_schedule_request(request: ScheduleRequestModel):
+    """Check cross-field rules pydantic cannot express on its own"""
+    errors = []
+    
+    dates = {}
+    for field in ("start_date", "end_date"):
+        try:
+            dates[field] = datetime.strptime(getattr(request, field), "%Y-%m-%d")
+        except ValueError:
+            errors.append(f"{field} must be a YYYY-MM-DD date")
+    if len(dates) == 2 and dates["start_date"] > dates["end_date"]:
+        errors.append("start_date must not be after end_date")
+    
+    seen_employees = set()
+    for emp in request.employees:
+        if emp.id in seen_employees:
+            errors.append(f"Duplicate employee id {emp.id}")
+        seen_employees.add(emp.id)
+    
+    seen_shifts = set()
+    for shift in request.shifts:
+        if shift.id in seen_shifts:
+            errors.append(f"Duplicate shift id {shift.id}")
+        seen_shifts.add(shift.id)
+        try:
+            datetime.strptime(shift.date, "%Y-%m-%d")
+        except ValueError:
+            errors.append(f"Shift {shift.id} date must be a YYYY-MM-DD date")
+        if shift.min_employees < 0 or shift.max_employees < shift.min_employees:
+            errors.append(f"Shift {shift.id} needs 0 <= min_employees <= max_employees")
+    
+    if request.optimizer == "rolling":
+        try:
+            load_optimizer("rolling")(**request.optimizer_options())
+        except ValueError as e:
+            errors.append(str(e))
+    
+    if request.profile is not None and not profiler_available(request.profile):
+        errors.append(f"profile={request.profile} needs {request.profile} installed on the server")
+    
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+def to_employee(emp: EmployeeModel) -> Employee:
+    preferred_shift = ShiftType(emp.preferred_shift.value) if emp.preferred_shift else None
+    return Employee(
+        id=emp.id,
+        name=emp.name,
+        department=Department(emp.department.value),
+        skill_level=SkillLevel(emp.skill_level.value),
+        skills=set(emp.skills),
+        max_hours_per_week=emp.max_hours_per_week,
+        cost_per_hour=emp.cost_per_hour,
+        preferred_shift=preferred_shift,
+        timezone=emp.timezone,
+        is_remote=emp.is_remote,
+        certifications=set(emp.certifications),
+        supported_regions=set(emp.supported_regions),
+        on_call_capacity=emp.on_call_capacity
+    )
+
+def to_shift(shift: ShiftModel) -> Shift:
+    return Shift(
+        id=shift.id,
+        date=shift.date,
+        shift_type=ShiftType(shift.shift_type.value),
+        department=Department(shift.department.value),
+        required_skill_level=SkillLevel(shift.required_skill_level.value),
+        required_skills=set(shift.required_skills),
+        min_employees=shift.min_employees,
+        max_employees=shift.max_employees,
+        region=shift.region,
+        priority=shift.priority,
+        expected_traffic=shift.expected_traffic
+    )
+
+def build_schedule_request(request: ScheduleRequestModel) -> ScheduleRequest:
+    """Validate the API request model and convert it into the internal ScheduleRequest"""
+    _validate_schedule_request(request)
+    
+    employees = [to_employee(emp) for emp in request.employees]
+    shifts = [to_shift(shift) for shift in request.shifts]
+    if request.dataset_id is not None:
+        dataset = datasets.get(request.dataset_id)
+        if dataset is None:
+            raise HTTPException(status_code=404, detail=f"Unknown dataset {request.dataset_id}")
+        # Dataset rows are validated once at upload and shared, never copied
+        employees = employees or dataset.employees
+        shifts = shifts or dataset.shifts
+    
+    if request.demand is not None and request.business_rules.get("traffic_based_staffing", True):
+        shifts, _ = staff_shifts(shifts, request.demand.demand_model(), traffic)
+    
+    return ScheduleRequest(
+        start_date=request.start_date,
+        end_date=request.end_date,
+        employees=employees,
+        shifts=shifts,
+        constraints=request.constraints,
+        business_rules=request.business_rules,
+        blackouts={emp_id: set(dates) for emp_id, dates in request.blackouts.items()}
+    )
+
+def apply_schedule_patch(base: ScheduleRequest, patch: SchedulePatchModel):
+    """Apply a roster delta to a stored request.
+
+    Returns the new ScheduleRequest and the ids of shifts whose requirements
+    changed; shifts that lose assignees are detected by the repair itself.
+    """
+    errors = []
+    removed_employees = set(patch.remove_employees)
+    employees = [e for e in base.employees if e.id not in removed_employees]
+    known_employees = {e.id for e in employees}
+    for emp in patch.add_employees:
+        if emp.id in known_employees:
+            errors.append(f"Employee {emp.id} already exists")
+        known_employees.add(emp.id)
+        employees.append(to_employee(emp))
+    
+    removed_shifts = set(patch.remove_shifts)
+    updates = {u.id: u for u in patch.update_shifts}
+    affected = set(updates)
+    shifts = []
+    for shift in base.shifts:
+        if shift.id in removed_shifts:
+            continue
+        update = updates.pop(shift.id, None)
+        if update is not None:
+            changes = update.model_dump(exclude_unset=True, exclude={"id"})
+            if "required_skill_level" in changes:
+                changes["required_skill_level"] = SkillLevel(changes["required_skill_level"].value)
+            if "required_skills" in changes:
+                changes["required_skills"] = set(changes["required_skills"])
+            shift = dataclasses.replace(shift, **changes)
+            if shift.min_employees < 0 or shift.max_employees < shift.min_employees:
+                errors.append(f"Shift {shift.id} needs 0 <= min_employees <= max_employees")
+        shifts.append(shift)
+    errors.extend(f"Unknown shift {shift_id}" for shift_id in updates)
+    
+    known_shifts = {s.id for s in shifts}
+    for shift in patch.add_shifts:
+        if shift.id in known_shifts:
+            errors.append(f"Shift {shift.id} already exists")
+        known_shifts.add(shift.id)
+        shifts.append(to_shift(shift))
+        affected.add(shift.id)
+    
+    blackouts = {emp_id: set(dates) for emp_id, dates in base.blackouts.items() if emp_id in known_employees}
+    for blackout in patch.blackouts:
+        if blackout.employee_id not in known_employees:
+            errors.append(f"Unknown employee {blackout.employee_id}")
+        blackouts.setdefault(blackout.employee_id, set()).update(blackout.dates)
+    
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+    
+    dates = sorted(s.date for s in shifts)
+    patched = ScheduleRequest(
+        start_date=min([base.start_date] + dates[:1]),
+        end_date=max([base.end_date] + dates[-1:]),
+        employees=employees,
+        shifts=shifts,
+        constraints=base.constraints,
+        business_rules=base.business_rules,
+        blackouts=blackouts
+    )
+    return patched, affected
+
+async def solve_cached(schedule_request, response: Response, phase=1, optimizer="gradual", options=None,
+                       cache_control=None, profile=None):
+    """Solve on the worker pool unless an identical solve is cached; sets X-Cache
+    
+    Profiled solves always run, and their result is not cached. Raises
+    503 when the job queue is full.
+    """
+    key = request_key(schedule_request, optimizer, phase, options)
+    bypass = profile is not None or (cache_control is not None and "no-cache" in cache_control.lower())
+    result = None if bypass else cache.get(key)
+    if result is not None:
+        response.headers["X-Cache"] = "HIT"
+        return result
+    
+    try:
+        result = await jobs.run(solve_schedule, schedule_request, phase, None, optimizer, options, profile)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Scheduler is busy: {e}")
+    solve_metrics.observe(result.metrics.get("perf"))
+    if profile is None:
+        cache.put(key, result)
+    response.headers["X-Cache"] = "BYPASS" if bypass else "MISS"
+    return result
+
+def _parse_uploads(employees: Optional[UploadFile], shifts: Optional[UploadFile]):
+    parsed, sources = {"employees": [], "shifts": []}, {}
+    for name, upload, parse in (("employees", employees, parse_employees), ("shifts", shifts, parse_shifts)):
+        if upload is None:
+            continue
+        started = time.perf_counter()
+        fmt = detect_format(upload.filename, upload.content_type)
+        parsed[name] = parse(upload.file, fmt)
+        sources[name] = {
+            "filename": upload.filename,
+            "format": fmt,
+            "rows": len(parsed[name]),
+            "parse_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    return parsed["employees"], parsed["shifts"], sources
+
+@app.post("/api/datasets", status_code=201)
+async def upload_dataset(employees: Optional[UploadFile] = File(None), shifts: Optional[UploadFile] = File(None)):
+    """Upload a roster and/or shift list (CSV, NDJSON or Parquet) once and reuse it by dataset_id
+    
+    Set-valued CSV columns (skills, certifications, supported_regions,
+    required_skills) are separated by ';' or '|'.
+    """
+    if employees is None and shifts is None:
+        raise HTTPException(status_code=422, detail=["Upload an employees and/or shifts file"])
+    try:
+        parsed_employees, parsed_shifts, sources = await run_in_threadpool(_parse_uploads, employees, shifts)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=e.errors)
+    except DatasetError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    
+    dataset = datasets.save(parsed_employees, parsed_shifts, sources)
+    log.info("dataset_stored", extra={"dataset_id": dataset.id, "employees": len(parsed_employees),
+                                      "shifts": len(parsed_shifts)})
+    return dataset.summary()
+
+@app.get("/api/datasets/{dataset_id}")
+async def get_dataset(dataset_id: str):
+    dataset = datasets.get(dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset {dataset_id}")
+    return dataset.summary()
+
+def _store_traffic(rows):
+    touched = traffic.add(rows)
+    log.info("traffic_stored", extra={"points": len(rows), "series": len(touched)})
+    return {"points": len(rows), "series": [{"department": d.value, "region": r} for d, r in sorted(
+        touched, key=lambda key: (key[0].value, key[1]))]}
+
+@app.post("/api/demand/traffic")
+async def add_traffic(batch: TrafficBatchModel):
+    """Add or replace traffic points of one department / region series
+    
+    Send a series in one go or stream it as many batches; a point for an
+    interval that is already stored replaces it.
+    """
+    rows, errors = [], []
+    department = Department(batch.department.value)
+    for n, point in enumerate(batch.points):
+        try:
+            rows.append({"department": department, "region": batch.region, "timestamp": epoch_minute(point.timestamp),
+                         "volume": point.volume, "interval_minutes": batch.interval_minutes})
+        except ValueError:
+            errors.append(f"points[{n}].timestamp must be a local ISO timestamp (YYYY-MM-DDTHH:MM), "
+                          f"got {point.timestamp!r}")
+    if errors:
+        raise HTTPException(status_code=422, detail=errors[:50])
+    return await run_in_threadpool(_store_traffic, rows)
+
+@app.post("/api/demand/traffic/upload")
+async def upload_traffic(file: UploadFile = File(...)):
+    """Upload traffic series (CSV, NDJSON or Parquet) with department, region,
+    timestamp, volume and interval_minutes columns"""
+    try:
+        fmt = detect_format(file.filename, file.content_type)
+        rows = await run_in_threadpool(parse_traffic, file.file, fmt)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=e.errors)
+    except DatasetError as e:
+        raise HTTPException(status_code=422, detail=e.errors)
+    return await run_in_threadpool(_store_traffic, rows)
+
+@app.get("/api/demand/traffic")
+async def list_traffic():
+    """Stored series with their span, total and peak hourly volume"""
+    return {"series": await run_in_threadpool(traffic.summary)}
+
+@app.delete("/api/demand/traffic")
+async def clear_traffic():
+    traffic.clear()
+    return {"series": []}
+
+@app.post("/api/demand/staffing")
+async def compute_staffing(request: StaffingRequestModel):
+    """Required headcount per shift from the stored traffic, without solving
+    
+    Rows carry the computed min/max_employees, the bounds they replace
+    and where the demand came from ("series", "expected_traffic", or none).
+    """
+    shifts = [to_shift(shift) for shift in request.shifts]
+    if not shifts and request.dataset_id is not None:
+        dataset = datasets.get(request.dataset_id)
+        if dataset is None:
+            raise HTTPException(status_code=404, detail=f"Unknown dataset {request.dataset_id}")
+        shifts = dataset.shifts
+    
+    started = time.perf_counter()
+    _, rows = await run_in_threadpool(staff_shifts, shifts, request.demand.demand_model(), traffic)
+    staffed = [row for row in rows if row["source"] is not None]
+    return {
+        "shifts": rows,
+        "summary": {
+            "shifts": len(rows),
+            "staffed_from_demand": len(staffed),
+            "min_employees_before": sum(row["previous"]["min_employees"] for row in staffed),
+            "min_employees_after": sum(row["min_employees"] for row in staffed),
+            "changed": sum(row["min_employees"] != row["previous"]["min_employees"] for row in staffed),
+        },
+        "cache": demand_cache_stats(),
+        "elapsed_ms": elapsed_ms(started),
+    }
+
 @app.post("/api/schedule/generate", response_model=ScheduleResponse)
-async def generate_schedule(request: ScheduleRequestModel):
+async def generate_schedule(request: ScheduleRequestModel, response: Response,
+                            cache_control: Optional[str] = Header(None)):
+    started = time.perf_counter()
     try:
+        # Validation, dataset lookup and demand staffing are CPU work too
+        schedule_request = await run_in_threadpool(build_schedule_request, request)
         
-        # Test the optimizer first
-        #optimizer = SimpleOptimizer()
-        optimizer = GradualOptimizer()
-        #optimizer = Optimizer()
-        
-        response = optimizer.optimize(request, phase=4)
-        
-        print(f"Optimizer created, methods: {[method for method in dir(optimizer) if not method.startswith('_')]}")
-        # Convert to internal models
-        employees = []
-        for emp in request.employees:
-            preferred_shift = ShiftType(emp.preferred_shift.value) if emp.preferred_shift else None
-            employees.append(Employee(
-                id=emp.id,
-                name=emp.name,
-                department=Department(emp.department.value),
-                skill_level=SkillLevel(emp.skill_level.value),
-                skills=set(emp.skills),
-                max_hours_per_week=emp.max_hours_per_week,
-                cost_per_hour=emp.cost_per_hour,
-                preferred_shift=preferred_shift,
-                timezone=emp.timezone,
-                is_remote=emp.is_remote,
-                certifications=set(emp.certifications),
-                supported_regions=set(emp.supported_regions),
-                on_call_capacity=emp.on_call_capacity
-            ))
-        
-        shifts = []
-        for shift in request.shifts:
-            shifts.append(Shift(
-                id=shift.id,
-                date=shift.date,
-                shift_type=ShiftType(shift.shift_type.value),
-                department=Department(shift.department.value),
-                required_skill_level=SkillLevel(shift.required_skill_level.value),
-                required_skills=set(shift.required_skills),
-                min_employees=shift.min_employees,
-                max_employees=shift.max_employees,
-                region=shift.region,
-                priority=shift.priority,
-                expected_traffic=shift.expected_traffic
-            ))
-        
-        schedule_request = ScheduleRequest(
-            start_date=request.start_date,
-            end_date=request.end_date,
-            employees=employees,
-            shifts=shifts,
-            constraints=request.constraints,
-            business_rules=request.business_rules
-        )
-        
-        print(f"Running optimization with {len(employees)} employees and {len(shifts)} shifts")
-        result = optimizer.optimize(schedule_request)
-        print("Optimization completed successfully")
+        result = await solve_cached(schedule_request, response, request.phase, request.optimizer,
+                                    request.optimizer_options(), cache_control, request.profile)
+        await run_in_threadpool(schedules.save, schedule_request, result)
+        log.info("schedule_generated", extra={
+            "optimizer": request.optimizer,
+            "phase": request.phase,
+            "employees": len(schedule_request.employees),
+            "shifts": len(schedule_request.shifts),
+            "cache": response.headers.get("X-Cache"),
+            "coverage_score": result.coverage_score,
+            "elapsed_ms": elapsed_ms(started),
+        })
         return result
     
-        
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print("❌ CRITICAL ERROR in generate_schedule:")
-        traceback.print_exc()
+        log.exception("schedule_generate_failed", extra={"optimizer": request.optimizer,
+                                                         "elapsed_ms": elapsed_ms(started)})
         # Return a valid response structure even on error
         return ScheduleResponse(
             assignments={},
@@ -384,30 +831,398 @@ async def generate_schedule(request: ScheduleRequestModel):
         )
     
 
+@app.post("/api/schedule/jobs", status_code=202)
+async def create_schedule_job(request: ScheduleRequestModel):
+    """Queue an optimization and return its job id immediately"""
+    try:
+        # submit() may wait for the startup warm-up before the pool exists
+        job = await run_in_threadpool(jobs.submit, await run_in_threadpool(build_schedule_request, request),
+                                      request.phase, request.optimizer, request.optimizer_options(), request.profile)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Scheduler is busy: {e}")
+    return job.to_dict()
+
+@app.get("/api/schedule/jobs/{job_id}")
+async def get_schedule_job(job_id: str):
+    """Return status, progress and, once finished, the ScheduleResponse"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@app.post("/api/schedule/stream")
+async def stream_schedule(request: ScheduleRequestModel, http_request: Request):
+    """Stream a schedule as Server-Sent Events while it is being solved
+    
+    A greedy schedule is sent first, then one "schedule" event per solver
+    stage (each GradualOptimizer phase up to `phase`, or the selected
+    optimizer), each carrying the assignment delta against the previous
+    event. The rolling optimizer also sends a "commit" event with the
+    assignments of every window's committed days as soon as they are
+    fixed. A final "done" event has the stored schedule id. Closing the
+    connection stops the remaining stages.
+    """
+    schedule_request = await run_in_threadpool(build_schedule_request, request)
+    options = request.optimizer_options()
+    key = request_key(schedule_request, request.optimizer, request.phase, options)
+    
+    cached = cache.get(key)
+    if cached is not None:
+        stages = [("cache", None, ())]
+    else:
+        # Refuse up front rather than after the stream has started; each stage still queues for a worker
+        try:
+            jobs.check_capacity()
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=f"Scheduler is busy: {e}")
+        stages = [("greedy", quick_schedule, (schedule_request,))]
+        if request.optimizer == "gradual":
+            stages += [(f"phase_{p}", solve_schedule, (schedule_request, p))
+                       for p in range(1, request.phase + 1)]
+        elif request.optimizer == "rolling":
+            stages.append(("rolling", load_optimizer("rolling")(**options), (schedule_request, request.phase)))
+        else:
+            stages.append((request.optimizer, solve_schedule,
+                           (schedule_request, request.phase, None, request.optimizer, options)))
+    
+    async def events():
+        started = time.perf_counter()
+        sent = {}
+        result = None
+        for stage, fn, args in stages:
+            if await http_request.is_disconnected():
+                log.info("schedule_stream_cancelled", extra={"stage": stage})
+                return
+            try:
+                if stage == "rolling":
+                    # Windows run one at a time in a thread so each commit is sent as it lands
+                    windows = fn.iter_windows(*args)
+                    while (commit := await run_in_threadpool(next, windows, None)) is not None:
+                        yield _sse("commit", {**commit, "elapsed_ms": elapsed_ms(started)})
+                        if await http_request.is_disconnected():
+                            log.info("schedule_stream_cancelled", extra={"stage": stage, "window": commit["window"]})
+                            return
+                    result = await run_in_threadpool(fn.finish, *args)
+                else:
+                    result = cached if fn is None else await jobs.run(fn, *args)
+            except Exception as e:
+                yield _sse("error", {"stage": stage, "error": str(e)})
+                return
+            if fn is not None:
+                solve_metrics.observe(result.metrics.get("perf"))
+            yield _sse("schedule", {
+                "stage": stage,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "coverage_score": result.coverage_score,
+                "total_cost": result.total_cost,
+                "delta": assignment_delta(sent, result.assignments),
+                "metrics": result.metrics,
+                "risk_assessment": result.risk_assessment,
+            })
+            sent = result.assignments
+        
+        if cached is None:
+            cache.put(key, result)
+        stored = await run_in_threadpool(schedules.save, schedule_request, result)
+        yield _sse("done", {
+            "schedule_id": stored.id,
+            "schedule_version": stored.version,
+            "coverage_score": result.coverage_score,
+            "total_cost": result.total_cost,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _scenario_row(name, result, baseline=None):
+    row = {
+        "scenario": name,
+        "schedule_id": result.metrics.get("schedule_id"),
+        "total_cost": round(result.total_cost, 2),
+        "coverage_score": round(result.coverage_score, 1),
+        "risk_score": result.risk_assessment.get("risk_score"),
+        "understaffed_shifts_count": result.metrics.get("understaffed_shifts_count"),
+        "idle_employees_count": result.metrics.get("idle_employees_count"),
+        "solution_type": result.metrics.get("solution_type"),
+        "solve_ms": (result.metrics.get("perf") or {}).get("total_ms"),
+    }
+    if baseline is not None:
+        row["cost_delta"] = round(result.total_cost - baseline.total_cost, 2)
+        row["coverage_delta"] = round(result.coverage_score - baseline.coverage_score, 1)
+    return row
+
+@app.post("/api/schedule/scenarios")
+async def solve_scenarios(request: ScenariosRequestModel):
+    """Solve K variants of one problem concurrently and return a comparison table
+    
+    Every scenario is the base problem with its constraints and business
+    rules merged over the base ones and, optionally, roster / shift changes.
+    The base problem is compiled once and handed to the job workers once;
+    each scenario task only carries its overrides, and scenarios that
+    keep the roster and eligibility rules reuse the compiled base.
+    Scenarios count against the job queue (503 if they do not fit). Rows
+    are compared against the base (or the first scenario when
+    include_base is off) and every result is stored, so its
+    schedule_id works with /evaluate and /patch.
+    """
+    names = [s.name for s in request.scenarios]
+    if request.include_base:
+        names.insert(0, "base")
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=422, detail=["Scenario names must be unique (\"base\" is reserved)"])
+    
+    started = time.perf_counter()
+    base = await run_in_threadpool(build_schedule_request, request.base)
+    options = request.base.optimizer_options()
+    requests = [base] if request.include_base else []
+    for scenario in request.scenarios:
+        constraints = {**base.constraints, **scenario.constraints}
+        rules = {**base.business_rules, **scenario.business_rules}
+        variant = base
+        if scenario.changes is not None:
+            variant, _ = apply_schedule_patch(base, scenario.changes)
+        requests.append(scenario_request(variant, constraints, rules))
+    
+    compiled = await run_in_threadpool(CompiledProblem, base)
+    base_ref = await run_in_threadpool(share_base, base, compiled)
+    try:
+        calls = [(base_ref, scenario_overrides(base, scenario_req), request.base.optimizer,
+                  request.base.phase, options) for scenario_req in requests]
+        results = await jobs.run_all(solve_scenario, calls)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Scheduler is busy: {e}")
+    finally:
+        release_base(base_ref)
+    
+    solved = {}
+    for name, scenario_req, result in zip(names, requests, results):
+        if not isinstance(result, Exception):
+            solve_metrics.observe(result.metrics.get("perf"))
+            await run_in_threadpool(schedules.save, scenario_req, result)
+            solved[name] = result
+    baseline = solved.get(names[0])
+    rows = [
+        {"scenario": name, "error": str(result)} if isinstance(result, Exception)
+        else _scenario_row(name, result, baseline)
+        for name, result in zip(names, results)
+    ]
+    
+    log.info("scenarios_solved", extra={"scenarios": len(requests), "failed": len(requests) - len(solved),
+                                        "employees": len(base.employees), "shifts": len(base.shifts),
+                                        "elapsed_ms": elapsed_ms(started)})
+    response = {"comparison": rows, "elapsed_ms": elapsed_ms(started)}
+    if request.include_schedules:
+        response["schedules"] = solved
+    return response
+
+async def _stored_schedule(schedule_id, version=None):
+    # May read and unpickle the version from SQLite
+    stored = await run_in_threadpool(schedules.get, schedule_id, version)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown schedule {schedule_id}")
+    return stored
+
+@app.post("/api/schedule/{schedule_id}/patch", response_model=ScheduleResponse)
+async def patch_schedule(schedule_id: str, patch: SchedulePatchModel):
+    """Repair a stored schedule after a small roster change instead of re-solving it"""
+    stored = await _stored_schedule(schedule_id)
+    
+    schedule_request, affected = apply_schedule_patch(stored.request, patch)
+    result = await run_in_threadpool(
+        RepairOptimizer().repair, schedule_request, stored.response.assignments, affected)
+    await run_in_threadpool(schedules.save, schedule_request, result, schedule_id)
+    return result
+
+@app.get("/api/schedule/{schedule_id}")
+async def get_schedule(schedule_id: str, request: Request,
+                       version: Optional[int] = Query(None, ge=1),
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       days: Optional[int] = Query(None, ge=1, le=366),
+                       layout: Literal["compact", "full"] = "compact",
+                       include_roster: bool = True,
+                       include_metrics: bool = False):
+    """One date range of a stored schedule, latest version by default
+    
+    Pages are whole days: pass `days` (or `end_date`) and follow
+    page.next_start_date. The compact layout sends shift columns and
+    staff as positions in the roster id table (`employees`), which later
+    pages can skip with include_roster=false. Responses carry an ETag
+    and are sent as msgpack for an Accept of application/msgpack and
+    gzipped when the client accepts it.
+    """
+    stored = await _stored_schedule(schedule_id, version)
+    etag = schedule_etag(stored)
+    if not_modified(request, etag):
+        return encoded_response(request, None, etag)
+    try:
+        page = await run_in_threadpool(schedule_page, stored, start_date, end_date, days, layout,
+                                       include_roster, include_metrics)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=[f"Dates must be YYYY-MM-DD: {e}"])
+    return encoded_response(request, page, etag)
+
+@app.get("/api/schedule/{schedule_id}/versions")
+async def list_schedule_versions(schedule_id: str):
+    """Every stored version of a schedule with its cost and coverage"""
+    versions = await run_in_threadpool(schedules.versions, schedule_id)
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Unknown schedule {schedule_id}")
+    return {"schedule_id": schedule_id, "versions": versions}
+
+@app.get("/api/schedule/{schedule_id}/diff")
+async def diff_schedule_versions(schedule_id: str,
+                                 from_version: int = Query(..., ge=1),
+                                 to_version: Optional[int] = Query(None, ge=1),
+                                 employee_id: Optional[str] = None,
+                                 start_date: Optional[str] = None,
+                                 end_date: Optional[str] = None):
+    """Assignments added / removed and cost and coverage movement between two versions
+    
+    `to_version` defaults to the latest. Narrow it to one employee and/or
+    a date range (YYYY-MM-DD, inclusive) to read only those assignments.
+    """
+    diff = await run_in_threadpool(schedules.diff, schedule_id, from_version, to_version,
+                                   employee_id, start_date, end_date)
+    if diff is None:
+        raise HTTPException(status_code=404, detail=f"Unknown schedule {schedule_id} or version")
+    return diff
+
+@app.get("/api/schedule/{schedule_id}/employee/{employee_id}")
+async def get_employee_rota(schedule_id: str, employee_id: str, request: Request,
+                            version: Optional[int] = Query(None, ge=1),
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None,
+                            days: Optional[int] = Query(None, ge=1, le=366)):
+    """One employee's shifts in a stored schedule with hours and cost per week"""
+    stored = await _stored_schedule(schedule_id, version)
+    etag = schedule_etag(stored)
+    if not_modified(request, etag):
+        return encoded_response(request, None, etag)
+    try:
+        rota = await run_in_threadpool(employee_rota, stored, employee_id, start_date, end_date, days)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=[f"Dates must be YYYY-MM-DD: {e}"])
+    if rota is None:
+        raise HTTPException(status_code=404, detail=f"Unknown employee {employee_id} in schedule {schedule_id}")
+    return encoded_response(request, rota, etag)
+
+def _evaluate_candidates(schedule_request, candidates, details):
+    return BatchEvaluator(CompiledProblem(schedule_request)).evaluate(candidates, details)
+
+@app.post("/api/schedule/evaluate")
+async def evaluate_schedules(request: EvaluateRequestModel):
+    """Score candidate assignment maps against a stored schedule's problem
+    
+    Each candidate gets total_cost, coverage_score, rule violation counts
+    and a risk_assessment, in the order given.
+    """
+    stored = await _stored_schedule(request.schedule_id, request.version)
+    
+    started = time.perf_counter()
+    results = await run_in_threadpool(
+        _evaluate_candidates, stored.request, request.candidates, request.include_details)
+    log.info("schedules_evaluated", extra={"schedule_id": stored.id, "candidates": len(results),
+                                           "elapsed_ms": elapsed_ms(started)})
+    return {
+        "schedule_id": stored.id,
+        "schedule_version": stored.version,
+        "candidates": results,
+        "evaluate_ms": elapsed_ms(started),
+    }
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the schedule result cache"""
+    return cache.stats()
+
+@app.delete("/api/cache")
+async def clear_cache():
+    cache.clear()
+    return cache.stats()
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Solve durations, per-phase time and optimizer counters in Prometheus text format"""
+    stats = cache.stats()
+    body = solve_metrics.render({
+        "scheduler_cache_hits_total": ("counter", "Schedule result cache hits", stats["hits"]),
+        "scheduler_cache_misses_total": ("counter", "Schedule result cache misses", stats["misses"]),
+        "scheduler_cache_entries": ("gauge", "Schedules held in the result cache", stats["entries"]),
+    })
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+# Filled in by the startup warm-up; /api/ready answers 503 until "ready" is set
+warmup_status = {"ready": False}
+
+async def _warm_up():
+    started = time.perf_counter()
+    workers, api_ms = [], None
+    try:
+        # This process first: with fork-started workers they then inherit the loaded modules
+        api_ms = await run_in_threadpool(jobs.warm_up_local)
+        workers = await run_in_threadpool(jobs.start)
+    except Exception:
+        log.exception("startup_warmup_failed")
+    warmup_status.update(ready=True, api_ms=api_ms, workers=workers, elapsed_ms=elapsed_ms(started))
+    log.info("ready", extra={"workers": len(workers), "elapsed_ms": warmup_status["elapsed_ms"]})
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Warm up in the background so /api/health answers at once while /api/ready waits"""
+    app.state.warmup_task = asyncio.create_task(_warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    jobs.shutdown()
+    shutdown_logging()
+
 @app.get("/api/health")
 async def health():
     return {"status": "healthy", "service": "Workforce Scheduler"}
 
+@app.get("/api/ready")
+async def ready(response: Response):
+    """Readiness: 503 until every worker has loaded the solvers and run a warm-up solve"""
+    if not warmup_status["ready"]:
+        response.status_code = 503
+        return {"status": "warming_up"}
+    return {"status": "ready", **warmup_status}
+
 @app.get("/")
 async def root():
     return {"message": "Workforce Scheduler API"}
     
 @app.get("/api/test-optimizer")
-async def test_optimizer():
+async def test_optimizer(optimizer: str = "gradual"):
+    """Load an optimizer by name (?optimizer=gradual|fallback|milp|...) and list its methods"""
     try:
+        optimizer_class = await run_in_threadpool(load_optimizer, optimizer)
         
-        #optimizer = SimpleOptimizer
-        optimizer = GradualOptimizer
-        #optimizer = Optimizer
-        
-        print("Optimizer methods:", [m for m in dir(optimizer) if not m.startswith('_')])
-        return {"status": "Optimizer loaded successfully", "methods": [m for m in dir(optimizer) if not m.startswith('_')]}
+        return {"status": "Optimizer loaded successfully", "optimizer": optimizer,
+                "methods": [m for m in dir(optimizer_class) if not m.startswith('_')]}
     except Exception as e:
-        return {"error": str(e)}
+        return {"error": str(e), "optimizers": list(OPTIMIZERS)}
     
     
+def _staff_demo_shifts(demo_shifts):
+    """Attach demo traffic and set shift bounds from demand, in place"""
+    for shift in demo_shifts:
+        volume = DEMO_TRAFFIC.get((shift["department"], shift["shift_type"]))
+        if volume:
+            shift["expected_traffic"] = int(volume * (DEMO_WEEKEND_TRAFFIC if shift["is_weekend"] else 1))
+    shifts = [to_shift(ShiftModel(**shift)) for shift in demo_shifts]
+    _, rows = staff_shifts(shifts, DEMO_DEMAND_MODEL, traffic)
+    for shift, row in zip(demo_shifts, rows):
+        shift.update(min_employees=row["min_employees"], max_employees=row["max_employees"],
+                     expected_traffic=row["expected_traffic"])
+
 @app.post("/api/generate-demo-schedule")
-async def generate_demo_schedule(config: dict):
+async def generate_demo_schedule(config: dict, response: Response, cache_control: Optional[str] = Header(None)):
     """Generate demo schedule with customizable parameters"""
     try:
         # Extract configuration from request
@@ -420,6 +1235,10 @@ async def generate_demo_schedule(config: dict):
             'support': 0.3
         })
         load_only = config.get('loadOnly', False)  # New flag for data loading only
+        # Clients that page the stored schedule (GET /api/schedule/{id}) can skip the input echo
+        include_input_data = config.get('includeInputData', True)
+        # Size shifts from their expected_traffic (or uploaded traffic) instead of the fixed bounds
+        demand_staffing = config.get('demandStaffing', False)
         
         # Validate inputs
         if num_employees < 1 or num_employees > 50:
@@ -434,9 +1253,7 @@ async def generate_demo_schedule(config: dict):
                 detail="Number of days must be between 1 and 30"
             )
         
-        print(f"Generating demo data with {num_employees} employees for {num_days} days starting {start_date}")
-        print(f"Employee distribution: {employee_distribution}")
-        print(f"Load only mode: {load_only}")
+        started = time.perf_counter()
         
         # Generate demo data with user parameters
         demo_data = generate_demo_data(
@@ -445,6 +1262,9 @@ async def generate_demo_schedule(config: dict):
             start_date=start_date,
             employee_distribution=employee_distribution
         )
+        if demand_staffing:
+            _staff_demo_shifts(demo_data["shifts"])
+            demo_data["config"]["demand_staffing"] = True
         
         # If we're only loading data (not generating schedule), return early
         if load_only:
@@ -457,41 +1277,9 @@ async def generate_demo_schedule(config: dict):
                 "schedule": None
             }
         
-        # Convert to internal models for optimization
-        employees = []
-        for emp in demo_data["employees"]:
-            preferred_shift = ShiftType(emp["preferred_shift"].value) if emp.get("preferred_shift") else None
-            employees.append(Employee(
-                id=emp["id"],
-                name=emp["name"],
-                department=Department(emp["department"].value),
-                skill_level=SkillLevel(emp["skill_level"].value),
-                skills=set(emp["skills"]),
-                max_hours_per_week=emp["max_hours_per_week"],
-                cost_per_hour=emp["cost_per_hour"],
-                preferred_shift=preferred_shift,
-                timezone=emp["timezone"],
-                is_remote=emp["is_remote"],
-                certifications=set(emp.get("certifications", [])),
-                supported_regions=set(emp.get("supported_regions", [])),
-                on_call_capacity=emp.get("on_call_capacity", False)
-            ))
-        
-        shifts = []
-        for shift in demo_data["shifts"]:
-            shifts.append(Shift(
-                id=shift["id"],
-                date=shift["date"],
-                shift_type=ShiftType(shift["shift_type"].value),
-                department=Department(shift["department"].value),
-                required_skill_level=SkillLevel(shift["required_skill_level"].value),
-                required_skills=set(shift.get("required_skills", [])),
-                min_employees=shift["min_employees"],
-                max_employees=shift["max_employees"],
-                region=shift.get("region", "NA"),
-                priority=shift.get("priority", 1),
-                expected_traffic=shift.get("expected_traffic", 0)
-            ))
+        # Convert to internal models through the same path as API requests
+        employees = [to_employee(EmployeeModel(**emp)) for emp in demo_data["employees"]]
+        shifts = [to_shift(ShiftModel(**shift)) for shift in demo_data["shifts"]]
         
         # Convert to dictionaries instead of using the classes directly
         constraints_dict = {
@@ -520,13 +1308,16 @@ async def generate_demo_schedule(config: dict):
             business_rules=business_rules_dict
         )
         
-        print(f"Running optimization with {len(employees)} employees and {len(shifts)} shifts")
-        
         # Run optimization
-        optimizer = GradualOptimizer()
-        result = optimizer.optimize(schedule_request)
-        
-        print("Demo schedule optimization completed successfully")
+        result = await solve_cached(schedule_request, response, cache_control=cache_control)
+        await run_in_threadpool(schedules.save, schedule_request, result)
+        log.info("demo_schedule_generated", extra={
+            "employees": len(employees),
+            "shifts": len(shifts),
+            "num_days": num_days,
+            "cache": response.headers.get("X-Cache"),
+            "elapsed_ms": elapsed_ms(started),
+        })
 
         schedule_dict = {
             "assignments": result.assignments,
@@ -537,19 +1328,21 @@ async def generate_demo_schedule(config: dict):
         }
         
         # Return combined result with demo configuration info
-        return {
+        combined = {
             "schedule": schedule_dict,
             "demo_config": demo_data.get("config", {}),
-            "input_data": {
+        }
+        if include_input_data:
+            combined["input_data"] = {
                 "employees": demo_data["employees"],
                 "shifts": demo_data["shifts"]
             }
-        }
+        return combined
         
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print("Error in generate_demo_schedule:")
-        traceback.print_exc()
+        log.exception("demo_schedule_failed")
         raise HTTPException(
             status_code=500, 
             detail=f"Failed to generate demo schedule: {str(e)}"
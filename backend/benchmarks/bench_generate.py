@@ -0,0 +1,69 @@
+"""Regression benchmark for POST /api/schedule/generate.
+
+Asserts that every request triggers exactly one optimizer solve and
+reports request latency. Requests are sent with Cache-Control: no-cache
+so the result cache does not answer repeats, and solves made by the
+startup warm-up are not counted. Run from the backend directory:
+
+    python benchmarks/bench_generate.py --requests 10 --employees 20 --days 7
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+import app as app_module
+from jobs import JobManager
+from optimizers.GradualOptimizer import GradualOptimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    # Solve in-process so the optimizer calls can be counted
+    app_module.jobs = JobManager(max_workers=1, use_processes=False)
+    solves = []
+    original_optimize = GradualOptimizer.optimize
+
+    def counting_optimize(self, *a, **kw):
+        solves.append(1)
+        return original_optimize(self, *a, **kw)
+
+    GradualOptimizer.optimize = counting_optimize
+
+    demo = app_module.generate_demo_data(num_employees=args.employees, num_days=args.days)
+    body = jsonable_encoder({
+        "start_date": demo["config"]["date_range"]["start"],
+        "end_date": demo["config"]["date_range"]["end"],
+        "employees": demo["employees"],
+        "shifts": demo["shifts"],
+    })
+
+    latencies = []
+    with TestClient(app_module.app) as client:
+        while client.get("/api/ready").status_code != 200:
+            time.sleep(0.05)
+        solves.clear()
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            response = client.post("/api/schedule/generate", json=body, headers={"Cache-Control": "no-cache"})
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    assert len(solves) == args.requests, f"expected {args.requests} solves, got {len(solves)}"
+    print(f"requests={args.requests} solves={len(solves)} "
+          f"p50={statistics.median(latencies) * 1000:.1f}ms max={max(latencies) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
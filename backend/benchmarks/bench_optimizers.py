@@ -0,0 +1,133 @@
+"""Scaling benchmark: every registered optimizer across a size grid.
+
+Each (optimizer, size) run happens in its own child process so peak RSS
+is per run, and a run that exceeds --timeout is killed and recorded as
+such. Results are written as JSON for comparison across commits; the
+exit status is non-zero if any run crashed. Run from the backend
+directory:
+
+    python benchmarks/bench_optimizers.py --sizes 20x7 50x28 200x28 --output bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_synthetic_request
+from jobs import OPTIMIZERS, load_optimizer
+
+DEFAULT_SIZES = ["20x7", "50x28", "200x28", "1000x28", "1000x91", "10000x365"]
+
+
+def _peak_rss_mb(who):
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_one(optimizer, num_employees, num_days, seed, options, results):
+    # Keep solver chatter out of the JSON report on stdout
+    os.dup2(os.open(os.devnull, os.O_WRONLY), 1)
+    request = generate_synthetic_request(num_employees=num_employees, num_days=num_days, seed=seed)
+    started = time.perf_counter()
+    response = load_optimizer(optimizer)(**options).optimize(request, phase=4)
+    wall = time.perf_counter() - started
+    results.put({
+        "status": "ok",
+        "wall_seconds": round(wall, 3),
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        # CBC and decomposition workers run as child processes
+        "children_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "shifts": len(request.shifts),
+        "coverage_score": round(response.coverage_score, 2),
+        "total_cost": round(response.total_cost, 2),
+        "solution_type": response.metrics.get("solution_type"),
+    })
+
+
+def run(optimizer, num_employees, num_days, seed=0, options=None, timeout=600):
+    """Benchmark one optimizer on one size in a fresh process"""
+    results = multiprocessing.Queue()
+    child = multiprocessing.Process(
+        target=_run_one, args=(optimizer, num_employees, num_days, seed, options or {}, results))
+    started = time.perf_counter()
+    child.start()
+    child.join(timeout)
+    record = {"optimizer": optimizer, "employees": num_employees, "days": num_days, "seed": seed}
+    if child.is_alive():
+        child.kill()
+        child.join()
+        record.update(status="timeout", wall_seconds=round(time.perf_counter() - started, 3))
+    elif child.exitcode != 0 or results.empty():
+        record.update(status="error", exitcode=child.exitcode)
+    else:
+        record.update(results.get())
+    return record
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="EMPLOYEESxDAYS")
+    parser.add_argument("--optimizers", nargs="+", default=sorted(OPTIMIZERS), choices=sorted(OPTIMIZERS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds per run")
+    parser.add_argument("--time-limit", type=float, default=None, help="solver time limit (milp/decomposed)")
+    parser.add_argument("--output", help="JSON file to write (default: stdout)")
+    parser.add_argument("--keep-going", action="store_true",
+                        help="keep running larger sizes after an optimizer times out")
+    args = parser.parse_args()
+
+    results = []
+    for optimizer in args.optimizers:
+        options = {}
+        if args.time_limit is not None and optimizer in ("milp", "decomposed"):
+            options["time_limit"] = args.time_limit
+        if optimizer == "decomposed":
+            # Runs are child processes, which decompose on one core by default
+            options["max_workers"] = os.cpu_count() or 1
+        for size in args.sizes:
+            num_employees, num_days = (int(n) for n in size.lower().split("x"))
+            record = run(optimizer, num_employees, num_days, args.seed, options, args.timeout)
+            results.append(record)
+            print(f"{optimizer:>12} {size:>10} {record['status']:>8} "
+                  f"{record.get('wall_seconds', '-'):>9}s rss={record.get('peak_rss_mb', '-')}MB "
+                  f"coverage={record.get('coverage_score', '-')} cost={record.get('total_cost', '-')}",
+                  file=sys.stderr)
+            if record["status"] != "ok" and not args.keep_going:
+                break  # Larger sizes will not do better
+
+    report = {
+        "commit": _git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "timeout_seconds": args.timeout,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    # Timeouts are results; a crashed run means the benchmark itself is broken
+    if any(record["status"] == "error" for record in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Seeded synthetic workloads for load testing the optimizers.
+
+Unlike generate_demo_data this has no size cap and no fixed employee
+templates: every attribute is drawn from a configurable distribution with
+a seeded RNG, so the same arguments always give the same request.
+
+    from benchmarks.synthetic import generate_synthetic_request
+    request = generate_synthetic_request(num_employees=10000, num_days=365, seed=7)
+"""
+import random
+from datetime import datetime, timedelta
+
+from models import (Employee, Shift, ScheduleRequest, Department, SkillLevel, ShiftType,
+                    SKILL_LEVEL_RANK)
+
+DEFAULT_DEPARTMENT_MIX = {
+    Department.AD_OPS: 0.4,
+    Department.ENGINEERING: 0.3,
+    Department.SUPPORT: 0.3,
+}
+
+DEFAULT_SKILL_LEVEL_MIX = {
+    SkillLevel.JUNIOR: 0.3,
+    SkillLevel.MID: 0.35,
+    SkillLevel.SENIOR: 0.25,
+    SkillLevel.LEAD: 0.1,
+}
+
+# Primary region of an employee / region of a shift
+DEFAULT_REGION_MIX = {"NA": 0.7, "EU": 0.2, "APAC": 0.1}
+
+DEFAULT_PREFERENCE_MIX = {
+    ShiftType.MORNING_SHIFT: 0.3,
+    ShiftType.STANDARD_SHIFT: 0.4,
+    ShiftType.AFTERNOON_SHIFT: 0.2,
+    None: 0.1,
+}
+
+DEPARTMENT_SKILLS = {
+    Department.AD_OPS: ["programmatic", "rtb", "optimization", "analytics", "reporting"],
+    Department.ENGINEERING: ["python", "java", "aws", "kafka", "react", "troubleshooting"],
+    Department.SALES: ["negotiation", "crm", "reporting", "analytics"],
+    Department.ACCOUNT_MANAGEMENT: ["client_communication", "crm", "reporting"],
+    Department.SUPPORT: ["troubleshooting", "client_communication", "documentation", "reporting"],
+}
+
+# Shift types each department staffs every day
+DEPARTMENT_SHIFT_TYPES = {
+    Department.AD_OPS: [ShiftType.MORNING_SHIFT, ShiftType.STANDARD_SHIFT, ShiftType.AFTERNOON_SHIFT],
+    Department.ENGINEERING: [ShiftType.STANDARD_SHIFT, ShiftType.ON_CALL],
+    Department.SALES: [ShiftType.STANDARD_SHIFT],
+    Department.ACCOUNT_MANAGEMENT: [ShiftType.STANDARD_SHIFT],
+    Department.SUPPORT: [ShiftType.MORNING_SHIFT, ShiftType.STANDARD_SHIFT, ShiftType.NIGHT_SHIFT],
+}
+
+BASE_COST = {SkillLevel.JUNIOR: 28.0, SkillLevel.MID: 42.0, SkillLevel.SENIOR: 58.0, SkillLevel.LEAD: 75.0}
+
+
+def _weighted(rng, mix):
+    choices = list(mix)
+    return rng.choices(choices, weights=[mix[c] for c in choices])[0]
+
+
+def _counts(total, mix):
+    """Split `total` by the weights in `mix`, largest remainders first"""
+    weight = sum(mix.values())
+    exact = {key: total * share / weight for key, share in mix.items()}
+    counts = {key: int(value) for key, value in exact.items()}
+    for key in sorted(exact, key=lambda k: counts[k] - exact[k])[:total - sum(counts.values())]:
+        counts[key] += 1
+    return counts
+
+
+def generate_synthetic_request(num_employees=100, num_days=28, seed=0, start_date="2025-11-03",
+                               department_mix=None, skill_level_mix=None, region_mix=None,
+                               preference_mix=None, skill_probability=0.7, second_region_probability=0.3,
+                               on_call_probability=0.5, utilization=0.6, weekend_factor=0.6,
+                               constraints=None, business_rules=None) -> ScheduleRequest:
+    """Build a reproducible ScheduleRequest of any size.
+
+    Staffing is sized from the head count: each department's shifts ask for
+    roughly `utilization` of the shifts its employees can work (five days a
+    week), so instances stay feasible-ish as they grow. Weekend shifts need
+    `weekend_factor` as many people.
+    """
+    rng = random.Random(seed)
+    department_mix = department_mix or DEFAULT_DEPARTMENT_MIX
+    skill_level_mix = skill_level_mix or DEFAULT_SKILL_LEVEL_MIX
+    region_mix = region_mix or DEFAULT_REGION_MIX
+    preference_mix = preference_mix or DEFAULT_PREFERENCE_MIX
+    regions = list(region_mix)
+
+    employees = []
+    headcount = _counts(num_employees, department_mix)
+    for department, count in headcount.items():
+        skills = DEPARTMENT_SKILLS[department]
+        for i in range(count):
+            level = _weighted(rng, skill_level_mix)
+            primary = _weighted(rng, region_mix)
+            supported = {primary}
+            if len(regions) > 1 and rng.random() < second_region_probability:
+                supported.add(rng.choice([r for r in regions if r != primary]))
+            employees.append(Employee(
+                id=f"{department.value}_{i + 1}",
+                name=f"{department.value.title()}_Employee_{i + 1}",
+                department=department,
+                skill_level=level,
+                # The first skill is the department's core skill and everyone has it
+                skills={skills[0]} | {s for s in skills[1:] if rng.random() < skill_probability},
+                max_hours_per_week=rng.choice([32, 40, 40, 40]),
+                cost_per_hour=round(BASE_COST[level] * rng.uniform(0.85, 1.15), 2),
+                preferred_shift=_weighted(rng, preference_mix),
+                is_remote=rng.random() < 0.8,
+                supported_regions=supported,
+                on_call_capacity=SKILL_LEVEL_RANK[level] >= 1 and rng.random() < on_call_probability,
+            ))
+
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    shifts = []
+    for day in range(num_days):
+        date = start + timedelta(days=day)
+        date_str = date.strftime("%Y-%m-%d")
+        is_weekend = date.weekday() >= 5
+        for department, count in headcount.items():
+            if count == 0:
+                continue
+            shift_types = DEPARTMENT_SHIFT_TYPES[department]
+            daily_people = count * 5 / 7 * utilization * (weekend_factor if is_weekend else 1)
+            per_shift = max(1, int(daily_people / len(shift_types)))
+            for shift_type in shift_types:
+                on_call = shift_type == ShiftType.ON_CALL
+                # One shift per region, staffed in proportion to the region mix
+                staffing = {regions[0]: 1} if on_call else _counts(per_shift, region_mix)
+                for region, people in staffing.items():
+                    if people == 0:
+                        continue
+                    minimum = max(1, int(people * rng.uniform(0.8, 1.0)))
+                    shifts.append(Shift(
+                        id=f"shift_{len(shifts) + 1}",
+                        date=date_str,
+                        shift_type=shift_type,
+                        department=department,
+                        required_skill_level=SkillLevel.SENIOR if on_call else rng.choice(
+                            [SkillLevel.JUNIOR, SkillLevel.MID, SkillLevel.MID]),
+                        required_skills={DEPARTMENT_SKILLS[department][0]},
+                        min_employees=minimum,
+                        max_employees=minimum + max(1, minimum // 2),
+                        region=region,
+                        priority=4 if on_call else (1 if is_weekend else 2),
+                        expected_traffic=int(rng.lognormvariate(14, 1)),
+                    ))
+
+    return ScheduleRequest(
+        start_date=start_date,
+        end_date=(start + timedelta(days=max(num_days - 1, 0))).strftime("%Y-%m-%d"),
+        employees=employees,
+        shifts=shifts,
+        constraints=constraints or {
+            "max_overtime": 10,
+            "min_rest_hours": 11,
+            "max_consecutive_shifts": 5,
+            "require_qualifications": True,
+            "enforce_department_matching": True,
+        },
+        business_rules=business_rules or {
+            "require_senior_cover": True,
+            "traffic_based_staffing": True,
+            "respect_shift_preferences": True,
+            "minimize_costs": True,
+            "balance_workload": True,
+        },
+    )
@@ -0,0 +1,154 @@
+import dataclasses
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Optional
+
+from models import ScheduleRequest, ScheduleResponse, ScheduleConstraints, BusinessRules
+
+# Bump when optimizer behaviour changes so old disk entries stop matching
+CACHE_VERSION = 2
+
+# Filled in per store.save() call or describe a single solve, so never cached
+_UNCACHED_METRICS = ("schedule_id", "schedule_version", "perf")
+
+
+def _normalize(value):
+    """JSON-ready form with enums as values and sets sorted"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(_normalize(k)): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if dataclasses.is_dataclass(value):
+        return {f.name: _normalize(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    return value
+
+
+def _canonical_request(request: ScheduleRequest):
+    canonical = _normalize(request)
+    canonical["constraints"] = {**ScheduleConstraints().model_dump(), **canonical["constraints"]}
+    canonical["business_rules"] = {**BusinessRules().model_dump(), **canonical["business_rules"]}
+    return canonical
+
+
+def _sha256(payload) -> str:
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def request_key(request: ScheduleRequest, optimizer="gradual", phase=1, options=None) -> str:
+    """Canonical sha256 of a request and how it is to be solved.
+
+    Constraints and business rules are filled with their defaults, so
+    leaving a setting out and sending its default value hash the same.
+    Employee and shift order is kept because it can break ties between
+    equally good schedules.
+    """
+    return _sha256({
+        "version": CACHE_VERSION,
+        "request": _canonical_request(request),
+        "optimizer": optimizer,
+        "phase": phase,
+        "options": _normalize(options or {}),
+    })
+
+
+def problem_key(request: ScheduleRequest) -> str:
+    """Canonical sha256 of a request alone, whatever it is solved with"""
+    return _sha256(_canonical_request(request))
+
+
+class ResultCache:
+    """LRU cache of solved schedules by request_key, optionally backed by SQLite.
+
+    Memory holds up to `max_entries` responses; with `path` set every entry
+    is also written to disk and survives restarts. Responses are handed out
+    as shallow copies with their own metrics dict, since saving a schedule
+    stamps its id into the metrics.
+    """
+
+    def __init__(self, max_entries=256, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, response BLOB, created_at REAL)")
+            self._db.commit()
+
+    def get(self, key) -> Optional[ScheduleResponse]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(response)
+
+            if self._db is not None:
+                row = self._db.execute("SELECT response FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    response = pickle.loads(row[0])
+                    self._remember(key, response)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return self._copy(response)
+
+            self.misses += 1
+            return None
+
+    def put(self, key, response: ScheduleResponse):
+        response = self._copy(response)
+        for name in _UNCACHED_METRICS:
+            response.metrics.pop(name, None)
+        with self._lock:
+            self._remember(key, response)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_path": self.path,
+            }
+
+    def _remember(self, key, response):
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _copy(response):
+        return dataclasses.replace(response, metrics=dict(response.metrics))
@@ -0,0 +1,335 @@
+import csv
+import io
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from demand import epoch_minute
+from models import Employee, Shift, Department, SkillLevel, ShiftType
+
+# Rows validated per batch; also the Parquet read batch size
+CHUNK_ROWS = 5000
+
+# Stop collecting errors after this many, the upload is rejected anyway
+MAX_ERRORS = 50
+
+class DatasetError(ValueError):
+    """Raised when an uploaded file cannot be read or has invalid rows"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors[:3]))
+        self.errors = errors
+
+
+class UnsupportedFormat(DatasetError):
+    """Raised for unknown formats, or Parquet without pyarrow installed"""
+
+
+@dataclass
+class Dataset:
+    id: str
+    employees: List[Employee] = field(default_factory=list)
+    shifts: List[Shift] = field(default_factory=list)
+    created_at: float = 0.0
+    sources: Dict = field(default_factory=dict)
+
+    def summary(self):
+        return {
+            "dataset_id": self.id,
+            "employees": len(self.employees),
+            "shifts": len(self.shifts),
+            "created_at": self.created_at,
+            "sources": self.sources,
+        }
+
+
+def detect_format(filename, content_type=None):
+    """csv / ndjson / parquet from the file extension, falling back to the content type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if name.endswith(".parquet"):
+        return "parquet"
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    if "parquet" in content_type:
+        return "parquet"
+    raise UnsupportedFormat([f"Cannot tell the format of {filename!r}; use .csv, .ndjson or .parquet"])
+
+
+def _iter_chunks(file, fmt):
+    """Yield lists of (line number, row dict) without reading the whole file"""
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise UnsupportedFormat(["Parquet uploads need pyarrow installed on the server"])
+        line = 1
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=CHUNK_ROWS):
+            rows = batch.to_pylist()
+            yield list(enumerate(rows, start=line))
+            line += len(rows)
+        return
+
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        rows = ((reader.line_num, row) for row in reader)
+    else:
+        rows = ((n, line) for n, line in enumerate(text, start=1) if line.strip())
+    chunk = []
+    try:
+        for line, row in rows:
+            if fmt == "ndjson":
+                try:
+                    row = json.loads(row)
+                except ValueError as e:
+                    row = e
+            chunk.append((line, row))
+            if len(chunk) >= CHUNK_ROWS:
+                yield chunk
+                chunk = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise DatasetError([f"Cannot read {fmt} file: {e}"])
+    if chunk:
+        yield chunk
+    text.detach()
+
+
+# Column parsers. CSV gives strings; NDJSON and Parquet give native types.
+
+def _text(value, default=None):
+    if value is None or value == "":
+        if default is None:
+            raise ValueError("is required")
+        return default
+    return str(value).strip()
+
+
+def _number(kind, value, default=None):
+    if value is None or value == "":
+        if default is None:
+            raise ValueError("is required")
+        return default
+    error = ValueError(f"must be {'an integer' if kind is int else 'a number'}, got {value!r}")
+    # int() would take True as 1 and truncate 2.5 to 2
+    if isinstance(value, bool) or (kind is int and isinstance(value, float) and not value.is_integer()):
+        raise error
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise error
+
+
+def _flag(value, default):
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "y"):
+        return True
+    if text in ("false", "0", "no", "n"):
+        return False
+    raise ValueError(f"must be true or false, got {value!r}")
+
+
+def _values(value, default=()):
+    """Set-valued column: a list, or a string separated by ';' or '|'"""
+    if value is None or value == "":
+        return set(default)
+    if isinstance(value, (list, tuple, set)):
+        return {str(v).strip() for v in value if str(v).strip()}
+    return {v.strip() for v in str(value).replace("|", ";").split(";") if v.strip()}
+
+
+def _enum(enum, value, required=True):
+    if value is None or value == "":
+        if required:
+            raise ValueError("is required")
+        return None
+    try:
+        return enum(str(value).strip())
+    except ValueError:
+        raise ValueError(f"must be one of {', '.join(e.value for e in enum)}, got {value!r}")
+
+
+def _date(value):
+    value = _text(value)
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"must be a YYYY-MM-DD date, got {value!r}")
+    return value
+
+
+def _timestamp(value):
+    value = _text(value)
+    try:
+        return epoch_minute(value)
+    except ValueError:
+        raise ValueError(f"must be a local ISO timestamp (YYYY-MM-DDTHH:MM) without a UTC offset, got {value!r}")
+
+
+def _volume(value):
+    volume = _number(float, value)
+    if volume < 0:
+        raise ValueError(f"must not be negative, got {value!r}")
+    return volume
+
+
+def _interval(value):
+    minutes = _number(int, value, 60)
+    if not 1 <= minutes <= 1440:
+        raise ValueError(f"must be between 1 and 1440 minutes, got {value!r}")
+    return minutes
+
+
+# Column -> parser for each row type; missing optional columns use the API defaults
+EMPLOYEE_COLUMNS = {
+    "id": _text,
+    "name": _text,
+    "department": lambda v: _enum(Department, v),
+    "skill_level": lambda v: _enum(SkillLevel, v),
+    "skills": _values,
+    "max_hours_per_week": lambda v: _number(int, v, 40),
+    "cost_per_hour": lambda v: _number(float, v, 26.44),
+    "preferred_shift": lambda v: _enum(ShiftType, v, required=False),
+    "timezone": lambda v: _text(v, "EST"),
+    "is_remote": lambda v: _flag(v, True),
+    "certifications": _values,
+    "supported_regions": lambda v: _values(v, ("NA",)),
+    "on_call_capacity": lambda v: _flag(v, False),
+}
+
+SHIFT_COLUMNS = {
+    "id": _text,
+    "date": _date,
+    "shift_type": lambda v: _enum(ShiftType, v),
+    "department": lambda v: _enum(Department, v),
+    "required_skill_level": lambda v: _enum(SkillLevel, v),
+    "required_skills": _values,
+    "min_employees": lambda v: _number(int, v),
+    "max_employees": lambda v: _number(int, v),
+    "region": lambda v: _text(v, "NA"),
+    "priority": lambda v: _number(int, v, 1),
+    "expected_traffic": lambda v: _number(int, v, 0),
+}
+
+TRAFFIC_COLUMNS = {
+    "department": lambda v: _enum(Department, v),
+    "region": lambda v: _text(v, "NA"),
+    "timestamp": _timestamp,
+    "volume": _volume,
+    "interval_minutes": _interval,
+}
+
+
+def _parse_row(columns, row):
+    if not isinstance(row, dict):
+        raise ValueError(f"is not an object ({row})")
+    values = {}
+    for column, parse in columns.items():
+        try:
+            values[column] = parse(row.get(column))
+        except ValueError as e:
+            raise ValueError(f"{column} {e}")
+    return values
+
+
+def parse_employees(file, fmt):
+    """Stream-parse and validate an employee roster"""
+    employees, errors, seen = [], [], set()
+    for chunk in _iter_chunks(file, fmt):
+        for line, row in chunk:
+            try:
+                values = _parse_row(EMPLOYEE_COLUMNS, row)
+                if values["id"] in seen:
+                    raise ValueError(f"duplicate employee id {values['id']}")
+                seen.add(values["id"])
+                employees.append(Employee(**values))
+            except ValueError as e:
+                errors.append(f"employees row {line}: {e}")
+        if len(errors) >= MAX_ERRORS:
+            break
+    if errors:
+        raise DatasetError(errors[:MAX_ERRORS])
+    return employees
+
+
+def parse_shifts(file, fmt):
+    """Stream-parse and validate shift templates"""
+    shifts, errors, seen = [], [], set()
+    for chunk in _iter_chunks(file, fmt):
+        for line, row in chunk:
+            try:
+                values = _parse_row(SHIFT_COLUMNS, row)
+                if values["id"] in seen:
+                    raise ValueError(f"duplicate shift id {values['id']}")
+                if values["min_employees"] < 0 or values["max_employees"] < values["min_employees"]:
+                    raise ValueError("needs 0 <= min_employees <= max_employees")
+                seen.add(values["id"])
+                shifts.append(Shift(**values))
+            except ValueError as e:
+                errors.append(f"shifts row {line}: {e}")
+        if len(errors) >= MAX_ERRORS:
+            break
+    if errors:
+        raise DatasetError(errors[:MAX_ERRORS])
+    return shifts
+
+
+def parse_traffic(file, fmt):
+    """Stream-parse a traffic series: volume per interval by department, region and start time"""
+    points, errors = [], []
+    for chunk in _iter_chunks(file, fmt):
+        for line, row in chunk:
+            try:
+                points.append(_parse_row(TRAFFIC_COLUMNS, row))
+            except ValueError as e:
+                errors.append(f"traffic row {line}: {e}")
+        if len(errors) >= MAX_ERRORS:
+            break
+    if errors:
+        raise DatasetError(errors[:MAX_ERRORS])
+    return points
+
+
+class DatasetStore:
+    """Validated rosters and shift lists by dataset id, evicted least-recently-used"""
+
+    def __init__(self, max_datasets=50):
+        self.max_datasets = max_datasets
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, employees, shifts, sources=None) -> Dataset:
+        dataset = Dataset(
+            id=uuid.uuid4().hex,
+            employees=employees,
+            shifts=shifts,
+            created_at=time.time(),
+            sources=sources or {},
+        )
+        with self._lock:
+            self._datasets[dataset.id] = dataset
+            while len(self._datasets) > self.max_datasets:
+                self._datasets.popitem(last=False)
+        return dataset
+
+    def get(self, dataset_id) -> Optional[Dataset]:
+        with self._lock:
+            dataset = self._datasets.get(dataset_id)
+            if dataset is not None:
+                self._datasets.move_to_end(dataset_id)
+            return dataset
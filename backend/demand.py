@@ -0,0 +1,303 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from models import SHIFT_TIMES, Shift
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Distinct hourly loads remembered per DemandModel; a month of shift
+# templates repeats the same few hundred
+MAX_CACHED_LOADS = 65536
+
+# DemandModels with cached loads, least recently used dropped first
+MAX_CACHED_MODELS = 16
+
+
+def epoch_minute(timestamp: str) -> int:
+    """Minutes since 1970-01-01 of a local ISO timestamp (no UTC offset)"""
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is not None:
+        raise ValueError(f"must be a local time without a UTC offset, got {timestamp!r}")
+    return int((moment - _EPOCH).total_seconds() // 60)
+
+
+def _shift_window(shift: Shift) -> Tuple[int, int]:
+    """(first hour, hours) of a shift, hours counted from the epoch"""
+    start, end = SHIFT_TIMES.get(shift.shift_type, (9, 17))
+    day = (date.fromisoformat(shift.date).toordinal() - _EPOCH.toordinal()) * 24
+    return day + start, (end if end > start else end + 24) - start
+
+
+@dataclass(frozen=True)
+class DemandModel:
+    """How traffic per hour becomes required headcount.
+
+    "ratio" staffs one person per `traffic_per_agent` units of traffic an
+    hour. "erlang_c" treats traffic as contacts of `handle_seconds` each
+    and staffs the fewest people that answer `service_level` of them
+    within `answer_seconds` while busy at most `max_occupancy` of the
+    time. Either is grossed up for `shrinkage` (breaks, training) and
+    floored at `min_staff`; max_employees is the headcount plus `headroom`.
+    """
+    method: str = "ratio"
+    traffic_per_agent: float = 1000000.0
+    handle_seconds: float = 300.0
+    service_level: float = 0.8
+    answer_seconds: float = 20.0
+    max_occupancy: float = 0.85
+    shrinkage: float = 0.0
+    min_staff: int = 1
+    headroom: int = 1
+    max_agents: int = 500
+
+
+# DemandModel -> {hourly load: agents}
+_agents_cache: Dict[DemandModel, Dict[float, int]] = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def erlang_c_agents(loads, handle_seconds, service_level, answer_seconds, max_occupancy, max_agents):
+    """Fewest agents meeting the service level for each offered load (erlangs)
+
+    Runs the Erlang B recursion for all loads at once, one agent count
+    at a time, and keeps the first count that meets both targets. Loads
+    needing more than `max_agents` get max_agents.
+    """
+    loads = np.asarray(loads, dtype=np.float64)
+    agents = np.where(loads > 0, max_agents, 0).astype(np.int64)
+    pending = loads > 0
+    blocking = np.ones_like(loads)
+    for n in range(1, max_agents + 1):
+        if not pending.any():
+            break
+        blocking = loads * blocking / (n + loads * blocking)
+        stable = pending & (loads < n) & (loads / n <= max_occupancy)
+        if not stable.any():
+            continue
+        a, b = loads[stable], blocking[stable]
+        waiting = n * b / (n - a * (1 - b))
+        met = 1 - waiting * np.exp(-(n - a) * answer_seconds / handle_seconds) >= service_level
+        done = np.flatnonzero(stable)[met]
+        agents[done] = n
+        pending[done] = False
+    return agents
+
+
+def _required_agents(model: DemandModel, volumes):
+    """Headcount per hourly traffic volume, without the min_staff floor"""
+    if model.method == "erlang_c":
+        agents = erlang_c_agents(volumes * model.handle_seconds / 3600, model.handle_seconds,
+                                 model.service_level, model.answer_seconds, model.max_occupancy,
+                                 model.max_agents)
+    else:
+        agents = np.ceil(volumes / model.traffic_per_agent - 1e-9)
+    if model.shrinkage:
+        agents = np.ceil(agents / (1 - model.shrinkage) - 1e-9)
+    return np.minimum(agents, model.max_agents).astype(np.int64)
+
+
+def agents_for(model: DemandModel, volumes):
+    """Required headcount for an array of hourly volumes, memoised per model
+
+    Only loads this model has not seen are computed, so restaffing a
+    month of repeating shift templates is mostly dictionary lookups.
+    """
+    volumes = np.round(np.asarray(volumes, dtype=np.float64), 2)
+    distinct, inverse = np.unique(volumes, return_inverse=True)
+    with _cache_lock:
+        known = _agents_cache.setdefault(model, {})
+        _agents_cache.move_to_end(model)
+        found = [known.get(v) for v in distinct.tolist()]
+    missing = [i for i, agents in enumerate(found) if agents is None]
+    if missing:
+        computed = _required_agents(model, distinct[missing]).tolist()
+        with _cache_lock:
+            if len(known) + len(missing) > MAX_CACHED_LOADS:
+                known.clear()
+            for i, agents in zip(missing, computed):
+                known[float(distinct[i])] = found[i] = agents
+            while len(_agents_cache) > MAX_CACHED_MODELS:
+                _agents_cache.popitem(last=False)
+    with _cache_lock:
+        _cache_stats["hits"] += len(distinct) - len(missing)
+        _cache_stats["misses"] += len(missing)
+    return np.array(found, dtype=np.int64)[inverse]
+
+
+def cache_stats():
+    with _cache_lock:
+        return {**_cache_stats, "models": len(_agents_cache),
+                "loads": sum(len(loads) for loads in _agents_cache.values())}
+
+
+class TrafficStore:
+    """Traffic time series per (department, region), filled by uploads or streamed batches.
+
+    Points are volumes per interval keyed by the interval's start, so
+    re-sending an interval replaces it and batches can arrive in any
+    order. Series are folded into hourly volumes on first use after a
+    change; intervals longer than an hour are spread evenly over it.
+    """
+
+    def __init__(self):
+        self._points = {}  # (department, region) -> {start minute: (volume, interval minutes)}
+        self._hourly = {}  # (department, region) -> (sorted hours, volumes)
+        self._lock = threading.Lock()
+
+    def add(self, rows):
+        """Merge points into their series; returns the series touched.
+
+        Rows are dicts with department, region, timestamp (epoch minute of
+        the interval start), volume and interval_minutes, as parse_traffic
+        returns them.
+        """
+        touched = set()
+        with self._lock:
+            for row in rows:
+                key = (row["department"], row["region"])
+                self._points.setdefault(key, {})[row["timestamp"]] = (row["volume"], row["interval_minutes"])
+                touched.add(key)
+            for key in touched:
+                self._hourly.pop(key, None)
+        return touched
+
+    def clear(self):
+        with self._lock:
+            self._points.clear()
+            self._hourly.clear()
+
+    def summary(self):
+        with self._lock:
+            keys = list(self._points)
+        series = []
+        for department, region in keys:
+            hours, volumes = self.hourly(department, region)
+            series.append({
+                "department": department.value,
+                "region": region,
+                "points": len(self._points.get((department, region), ())),
+                "first_hour": _hour_iso(hours[0]) if len(hours) else None,
+                "last_hour": _hour_iso(hours[-1]) if len(hours) else None,
+                "total_volume": round(float(volumes.sum()), 2),
+                "peak_hourly_volume": round(float(volumes.max()), 2) if len(volumes) else 0,
+            })
+        return series
+
+    def hourly(self, department, region):
+        """(sorted epoch hours, volume per hour) of one series; empty arrays if unknown"""
+        key = (department, region)
+        with self._lock:
+            cached = self._hourly.get(key)
+            if cached is None:
+                cached = _fold_hourly(self._points.get(key, {}))
+                if key in self._points:
+                    self._hourly[key] = cached
+            return cached
+
+
+def _fold_hourly(points):
+    hours, volumes = [], []
+    for start, (volume, interval) in points.items():
+        if interval <= 60:
+            hours.append(start // 60)
+            volumes.append(volume)
+        else:
+            first, last = start // 60, (start + interval - 1) // 60
+            hours.extend(range(first, last + 1))
+            volumes.extend([volume / (last - first + 1)] * (last - first + 1))
+    distinct, inverse = np.unique(np.array(hours, dtype=np.int64), return_inverse=True)
+    totals = np.zeros(len(distinct), dtype=np.float64)
+    np.add.at(totals, inverse, np.array(volumes, dtype=np.float64))
+    return distinct, totals
+
+
+def _hour_iso(hour):
+    return (_EPOCH + timedelta(hours=int(hour))).isoformat()
+
+
+def staff_shifts(shifts: List[Shift], model: DemandModel, traffic: TrafficStore):
+    """Shifts with min/max_employees set from demand, and one report row per shift
+
+    A shift's demand comes from its department / region series when that
+    covers any of its hours. Several shifts of a series open at the same
+    hour (morning and day, say) split that hour's headcount between them,
+    and a shift is staffed for its busiest hour. Shifts without series
+    data fall back to their own expected_traffic spread over their hours;
+    shifts with neither keep their bounds. Series-staffed shifts get the
+    traffic they serve as expected_traffic.
+    """
+    n = len(shifts)
+    windows = np.array([_shift_window(s) for s in shifts], dtype=np.int64).reshape(n, 2)
+    starts, lengths = windows[:, 0], windows[:, 1]
+    offsets = np.arange(int(lengths.max()) if n else 0)
+    cells = starts[:, None] + offsets[None, :]    # shifts x hours, epoch hours
+    inside = offsets[None, :] < lengths[:, None]
+    volumes = np.zeros(cells.shape, dtype=np.float64)
+    from_series = np.zeros(n, dtype=bool)
+
+    groups = {}
+    for i, shift in enumerate(shifts):
+        groups.setdefault((shift.department, shift.region), []).append(i)
+    group = np.zeros(n, dtype=np.int64)
+    for code, ((department, region), members) in enumerate(groups.items()):
+        members = np.array(members, dtype=np.intp)
+        group[members] = code
+        hours, totals = traffic.hourly(department, region)
+        if not len(hours):
+            continue
+        pos = np.searchsorted(hours, cells[members]).clip(max=len(hours) - 1)
+        found = (hours[pos] == cells[members]) & inside[members]
+        volumes[members] = np.where(found, totals[pos], 0.0)
+        from_series[members] = found.any(axis=1)
+
+    expected = np.array([s.expected_traffic for s in shifts], dtype=np.float64)
+    from_expected = ~from_series & (expected > 0)
+    volumes[from_expected] = (expected[from_expected] / lengths[from_expected])[:, None]
+    volumes[~inside] = 0.0
+
+    # Shifts sharing a series hour split its headcount
+    share = np.ones(cells.shape, dtype=np.int64)
+    shared = inside & from_series[:, None]
+    if shared.any():
+        _, slot, counts = np.unique(group[:, None].repeat(cells.shape[1], axis=1)[shared] * (1 << 32)
+                                    + cells[shared], return_inverse=True, return_counts=True)
+        share[shared] = counts[slot.ravel()]
+
+    staffed = inside & (from_series | from_expected)[:, None]
+    required = np.zeros(cells.shape, dtype=np.int64)
+    if staffed.any():
+        required[staffed] = -(-agents_for(model, volumes[staffed]) // share[staffed])
+    required = required.max(axis=1, initial=0)
+    peak = volumes.max(axis=1, initial=0.0)
+    served = (volumes / share).sum(axis=1)
+
+    staffed_shifts, rows = [], []
+    for i, shift in enumerate(shifts):
+        source = "series" if from_series[i] else "expected_traffic" if from_expected[i] else None
+        row = {
+            "shift_id": shift.id,
+            "date": shift.date,
+            "shift_type": shift.shift_type.value,
+            "department": shift.department.value,
+            "region": shift.region,
+            "source": source,
+            "previous": {"min_employees": shift.min_employees, "max_employees": shift.max_employees},
+        }
+        if source is not None:
+            minimum = max(model.min_staff, int(required[i]))
+            changes = {"min_employees": minimum, "max_employees": minimum + model.headroom}
+            if source == "series":
+                changes["expected_traffic"] = int(round(served[i]))
+            shift = replace(shift, **changes)
+            row.update(peak_hourly_volume=round(float(peak[i]), 2), required=int(required[i]))
+        row.update(expected_traffic=shift.expected_traffic, min_employees=shift.min_employees,
+                   max_employees=shift.max_employees)
+        staffed_shifts.append(shift)
+        rows.append(row)
+    return staffed_shifts, rows
@@ -0,0 +1,380 @@
+import asyncio
+import importlib
+import os
+import queue
+import threading
+import time
+import uuid
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+import perf
+from logs import configure_logging, get_logger
+from models import Department, Employee, ScheduleRequest, ScheduleResponse, Shift, ShiftType, SkillLevel
+
+log = get_logger("jobs")
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when too many jobs are waiting for a worker"""
+
+
+@dataclass
+class Job:
+    id: str
+    status: JobStatus = JobStatus.QUEUED
+    progress: float = 0.0
+    stage: str = "queued"
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[ScheduleResponse] = None
+    error: Optional[str] = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "progress": round(self.progress, 3),
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+# Set in every worker by _init_worker; progress updates travel back to the
+# parent process through it.
+_progress_queue = None
+
+# Per optimizer warm-up time of this worker, set by _init_worker
+_warmup_ms = None
+
+
+def _init_worker(progress_queue, warmup=()):
+    global _progress_queue, _warmup_ms
+    _progress_queue = progress_queue
+    configure_logging()
+    if warmup:
+        _warmup_ms = warm_up(warmup)
+
+
+def _worker_ready():
+    """Pool task that returns once this worker has started (and warmed up)"""
+    return {"pid": os.getpid(), "warmup_ms": _warmup_ms}
+
+
+def _report_progress(job_id):
+    def report(fraction, stage):
+        if _progress_queue is not None and job_id is not None:
+            _progress_queue.put((job_id, fraction, stage))
+    return report
+
+
+# Optimizer name -> "module:class". Modules are imported by load_optimizer on
+# first use, so a process only pays for (and PuLP only loads with) the
+# solvers it actually runs.
+OPTIMIZERS = {
+    "gradual": "optimizers.GradualOptimizer:GradualOptimizer",
+    "fallback": "optimizers.FallbackOptimizer:FallbackOptimizer",
+    "milp": "optimizers.MilpOptimizer:MilpOptimizer",
+    "decomposed": "optimizers.DecomposedOptimizer:DecomposedOptimizer",
+    "local_search": "optimizers.LocalSearchOptimizer:LocalSearchOptimizer",
+    "rolling": "optimizers.RollingHorizonOptimizer:RollingHorizonOptimizer",
+}
+
+_loaded_optimizers = {}
+
+
+def load_optimizer(name):
+    """The optimizer class registered as `name`, imported on first use"""
+    cls = _loaded_optimizers.get(name)
+    if cls is None:
+        if name not in OPTIMIZERS:
+            raise ValueError(f"Unknown optimizer {name!r}; expected one of {', '.join(OPTIMIZERS)}")
+        module, _, attr = OPTIMIZERS[name].partition(":")
+        cls = _loaded_optimizers[name] = getattr(importlib.import_module(module), attr)
+    return cls
+
+
+def solve_schedule(schedule_request: ScheduleRequest, phase=1, job_id=None, optimizer="gradual",
+                   options=None, profile=None, compiled=None) -> ScheduleResponse:
+    """Worker entry point: run one optimization and return the response
+
+    `options` are passed to the optimizer constructor (e.g. time_limit and
+    mip_gap for "milp", "decomposed" and "rolling", time_budget_ms for
+    "local_search", window_days and overlap_days for "rolling").
+    Phase timings and counters are returned in metrics["perf"], with a
+    profiler report there too when `profile` names one. A CompiledProblem
+    for `schedule_request` may be passed in to skip recompiling it.
+    """
+    instance = load_optimizer(optimizer)(**(options or {}))
+    with perf.recording(profile) as recorder:
+        response = instance.optimize(schedule_request, phase=phase, progress=_report_progress(job_id),
+                                     compiled=compiled)
+    response.metrics["perf"] = {"optimizer": optimizer, **recorder.to_dict()}
+    return response
+
+
+def quick_schedule(schedule_request: ScheduleRequest) -> ScheduleResponse:
+    """Worker entry point: greedy schedule in milliseconds, no solver"""
+    with perf.recording() as recorder:
+        response = load_optimizer("fallback")().greedy(schedule_request)
+    response.metrics["perf"] = {"optimizer": "greedy", **recorder.to_dict()}
+    return response
+
+
+def _warmup_request() -> ScheduleRequest:
+    """Two employees and three shifts over two days: the smallest problem that
+    still goes through compilation, model building and a CBC solve"""
+    employees = [
+        Employee(id=f"warmup_{i}", name=f"Warm-up {i}", department=Department.SUPPORT,
+                 skill_level=SkillLevel.SENIOR, skills=set())
+        for i in range(2)
+    ]
+    shifts = [
+        Shift(id=f"warmup_{date}_{shift_type.value}", date=date, shift_type=shift_type,
+              department=Department.SUPPORT, required_skill_level=SkillLevel.JUNIOR,
+              required_skills=set(), min_employees=1, max_employees=1)
+        for date, shift_type in (("2025-01-06", ShiftType.MORNING_SHIFT), ("2025-01-06", ShiftType.NIGHT_SHIFT),
+                                 ("2025-01-07", ShiftType.MORNING_SHIFT))
+    ]
+    return ScheduleRequest(start_date="2025-01-06", end_date="2025-01-07", employees=employees, shifts=shifts,
+                           constraints={}, business_rules={})
+
+
+def warm_up(optimizers=("greedy", "gradual", "milp")):
+    """Import the named optimizers (and PuLP / CBC with them) and solve a tiny
+    canned problem with each, so the first real solve in this process pays for
+    neither. Returns milliseconds per optimizer; failures are logged, not raised.
+    """
+    timings = {}
+    request = _warmup_request()
+    for name in optimizers:
+        started = time.perf_counter()
+        try:
+            if name == "greedy":
+                quick_schedule(request)
+            else:
+                solve_schedule(request, optimizer=name)
+        except Exception:
+            log.exception("warmup_failed", extra={"optimizer": name})
+            continue
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    log.info("warmed_up", extra={"pid": os.getpid(), "warmup_ms": timings})
+    return timings
+
+
+class JobManager:
+    """Runs CPU-bound solves in a bounded worker pool.
+
+    Solves never run on the event loop: endpoints either await `run()` or
+    `submit()` a background job and poll it by id.
+    """
+
+    def __init__(self, max_workers=None, max_pending=32, max_finished=500, use_processes=True, warmup=None):
+        self.max_workers = max_workers or int(os.environ.get("SCHEDULER_MAX_WORKERS", min(4, os.cpu_count() or 1)))
+        # Optimizers every worker warms up before its first job; SCHEDULER_WARMUP="" turns it off
+        if warmup is None:
+            warmup = [name for name in os.environ.get("SCHEDULER_WARMUP", "greedy,gradual,milp").split(",") if name]
+        self.warmup = tuple(warmup)
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.use_processes = use_processes
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._running = 0  # run() / run_all() calls in flight, counted against max_pending
+        self._executor = None
+        # Held while the pool forks its workers and while this process warms up;
+        # a worker forked mid-import would wait forever on the import lock
+        self._executor_lock = threading.Lock()
+        self._ready = []  # _worker_ready() futures of the current pool
+        self._progress_queue = None
+        self._progress_thread = None
+        self._requests = {}
+        # Called as on_complete(job, schedule_request) when a job succeeds
+        self.on_complete = None
+
+    def _get_executor(self):
+        """The worker pool, created on first use.
+
+        A fork-started pool forks all its workers on its first submit, so
+        that submit (one readiness probe per worker) happens here under
+        _executor_lock, never while warm_up_local() is importing.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._progress_queue = multiprocessing.Queue()
+                    executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=_init_worker,
+                        initargs=(self._progress_queue, self.warmup),
+                    )
+                else:
+                    self._progress_queue = queue.Queue()
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=_init_worker,
+                        initargs=(self._progress_queue, self.warmup),
+                    )
+                self._progress_thread = threading.Thread(target=self._drain_progress, daemon=True)
+                self._progress_thread.start()
+                self._ready = [executor.submit(_worker_ready) for _ in range(self.max_workers)]
+                self._executor = executor
+            return self._executor
+
+    async def _get_executor_async(self):
+        # Creating the pool can wait for warm_up_local(); do that off the event loop
+        if self._executor is not None:
+            return self._executor
+        return await asyncio.get_running_loop().run_in_executor(None, self._get_executor)
+
+    def _drain_progress(self):
+        progress_queue = self._progress_queue
+        while True:
+            item = progress_queue.get()
+            if item is None:
+                return
+            job_id, fraction, stage = item
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status in (JobStatus.COMPLETED, JobStatus.FAILED):
+                    continue
+                if job.status == JobStatus.QUEUED:
+                    job.status = JobStatus.RUNNING
+                    job.started_at = time.time()
+                job.progress = max(job.progress, fraction)
+                job.stage = stage
+
+    def warm_up_local(self):
+        """warm_up() this process; no worker is forked until it is done"""
+        with self._executor_lock:
+            return warm_up(self.warmup)
+
+    def start(self):
+        """Start every worker now and wait until each has warmed up.
+
+        Workers are otherwise started by the first jobs, which would then
+        wait for the imports and the warm-up solve. Returns the pid and
+        warm-up timings of each worker.
+        """
+        self._get_executor()
+        return [future.result() for future in self._ready]
+
+    def _pending(self):
+        return self._running + sum(1 for j in self._jobs.values() if j.status in (JobStatus.QUEUED, JobStatus.RUNNING))
+
+    def _reserve(self, count):
+        """Count `count` calls as in flight, or raise JobQueueFull if they do not fit"""
+        with self._lock:
+            pending = self._pending()
+            if pending + count > self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+            self._running += count
+
+    def check_capacity(self):
+        """Raise JobQueueFull if another call would not fit in the queue right now"""
+        with self._lock:
+            pending = self._pending()
+        if pending >= self.max_pending:
+            raise JobQueueFull(f"{pending} jobs already pending")
+
+    async def run(self, fn, *args):
+        """Await `fn(*args)` on the worker pool without blocking the event loop
+
+        Raises JobQueueFull if max_pending calls and jobs are already waiting.
+        """
+        loop = asyncio.get_running_loop()
+        self._reserve(1)
+        try:
+            return await loop.run_in_executor(await self._get_executor_async(), fn, *args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run_all(self, fn, arg_lists):
+        """Await `fn(*args)` for every args in `arg_lists` on the worker pool
+
+        Results (or the exceptions raised) come back in order. Raises
+        JobQueueFull, running none of them, if they do not all fit in
+        the queue.
+        """
+        count = len(arg_lists)
+        self._reserve(count)
+        try:
+            loop = asyncio.get_running_loop()
+            executor = await self._get_executor_async()
+            return await asyncio.gather(*(loop.run_in_executor(executor, fn, *args) for args in arg_lists),
+                                        return_exceptions=True)
+        finally:
+            with self._lock:
+                self._running -= count
+
+    def submit(self, schedule_request: ScheduleRequest, phase=1, optimizer="gradual", options=None,
+               profile=None) -> Job:
+        with self._lock:
+            pending = self._pending()
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs already pending")
+            job = Job(id=uuid.uuid4().hex, created_at=time.time())
+            self._jobs[job.id] = job
+            self._requests[job.id] = schedule_request
+            self._evict_finished()
+
+        future = self._get_executor().submit(solve_schedule, schedule_request, phase, job.id, optimizer, options,
+                                             profile)
+        future.add_done_callback(lambda f: self._finish(job.id, f))
+        return job
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            schedule_request = self._requests.pop(job_id, None)
+            if job is None:
+                return
+            job.finished_at = time.time()
+            if job.started_at is None:
+                job.started_at = job.finished_at
+            error = future.exception()
+            if error is not None:
+                job.status = JobStatus.FAILED
+                job.stage = "failed"
+                job.error = str(error)
+            else:
+                job.status = JobStatus.COMPLETED
+                job.stage = "completed"
+                job.progress = 1.0
+                job.result = future.result()
+        if job.status == JobStatus.COMPLETED and self.on_complete is not None:
+            self.on_complete(job, schedule_request)
+
+    def _evict_finished(self):
+        finished = [j for j in self._jobs.values() if j.status in (JobStatus.COMPLETED, JobStatus.FAILED)]
+        if len(finished) <= self.max_finished:
+            return
+        finished.sort(key=lambda j: j.finished_at or 0)
+        for job in finished[:len(finished) - self.max_finished]:
+            del self._jobs[job.id]
+
+    def get(self, job_id) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._progress_queue.put(None)
+            self._executor = None
@@ -0,0 +1,109 @@
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# Request id of the HTTP request being handled, stamped on every record
+request_id = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord attributes that are not `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_lock = threading.Lock()
+_configured_pid = None
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, event, request id and any `extra` fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        rid = getattr(record, "request_id", None)
+        if rid is not None:
+            entry["request_id"] = rid
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _RequestIdHandler(logging.handlers.QueueHandler):
+    """Queue handler that captures the request id before the record changes threads
+
+    Unlike the stock QueueHandler it leaves formatting to the listener, only
+    rendering the message and traceback while the arguments are still current.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level=None, stream=None):
+    """Route the "scheduler" loggers through a queue to a JSON stream handler.
+
+    Callers only pay for enqueueing a record; formatting and the write to
+    `stream` (stdout by default) happen on a listener thread. The level comes
+    from SCHEDULER_LOG_LEVEL (default INFO), so disabled levels cost one
+    comparison. Safe to call again in a forked worker process, which gets its
+    own queue and listener.
+    """
+    global _configured_pid, _listener
+    with _lock:
+        if _configured_pid == os.getpid():
+            return
+        level = level or os.environ.get("SCHEDULER_LOG_LEVEL", "INFO")
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter())
+
+        records = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(records, output, respect_handler_level=False)
+        listener.start()
+        _listener = listener
+
+        logger = logging.getLogger("scheduler")
+        logger.handlers = [_RequestIdHandler(records)]
+        logger.setLevel(level.upper() if isinstance(level, str) else level)
+        logger.propagate = False
+        _configured_pid = os.getpid()
+
+
+def shutdown_logging():
+    """Flush queued records; call on shutdown"""
+    global _configured_pid, _listener
+    with _lock:
+        if _listener is not None and _configured_pid == os.getpid():
+            _listener.stop()
+        _listener = None
+        _configured_pid = None
+
+
+def get_logger(name):
+    return logging.getLogger(f"scheduler.{name}")
+
+
+def elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -1 +1 @@
-from dataclasses import dataclassfrom typing import List, Dict, Setfrom enum import Enumfrom pydantic import BaseModelfrom datetime import datetime, timedeltaclass Department(Enum):    AD_OPS = "ad_operations"    ENGINEERING = "engineering"    SALES = "sales"    ACCOUNT_MANAGEMENT = "account_management"    SUPPORT = "support"class SkillLevel(Enum):    JUNIOR = "junior"    MID = "mid"    SENIOR = "senior"    LEAD = "lead"class ShiftType(Enum):    MORNING_SHIFT = "morning"  # 6AM-2PM    AFTERNOON_SHIFT = "swing"  # 2PM-10PM    NIGHT_SHIFT = "night"  # 10PM-6AM    STANDARD_SHIFT = "day" # 9AM-5PM    ON_CALL = "on_call"    class ScheduleConstraints(BaseModel):    max_overtime: int = 10    min_rest_hours: int = 11    max_consecutive_shifts: int = 5    require_qualifications: bool = True    enforce_department_matching: bool = Trueclass BusinessRules(BaseModel):    require_senior_cover: bool = True    traffic_based_staffing: bool = True    respect_shift_preferences: bool = True    minimize_costs: bool = True    balance_workload: bool = True@dataclassclass Employee:    id: str    name: str    department: Department    skill_level: SkillLevel    skills: Set[str]    max_hours_per_week: int = 40    cost_per_hour: float = 22.80    preferred_shift: ShiftType = None    timezone: str = "EST"    is_remote: bool = True        # PubMatic specific attributes    certifications: Set[str] = None    supported_regions: Set[str] = None    on_call_capacity: bool = False        def __post_init__(self):        if self.certifications is None:            self.certifications = set()        if self.supported_regions is None:            self.supported_regions = {"NA"} @dataclassclass AdTrafficForecast:    date: str    hour: int    expected_impressions: int      region: str    traffic_tier: str  @dataclassclass Shift:    id: str    date: str    shift_type: ShiftType    department: Department    required_skill_level: SkillLevel    required_skills: Set[str]    min_employees: int    max_employees: int    region: str = "NA"    priority: int = 1  # 1-5, with 5 being highest        # Derived from traffic forecasts    expected_traffic: int = 0@dataclassclass ScheduleRequest():    start_date: str    end_date: str    employees: List[Employee]    shifts: List[Shift]    constraints: Dict    business_rules: Dict@dataclassclass ScheduleResponse:    assignments: Dict[str, List[str]]    metrics: Dict    total_cost: float    coverage_score: float    risk_assessment: Dict    
\ No newline at end of file
+import sysfrom dataclasses import dataclass, fieldfrom typing import List, Dict, Set, FrozenSet, Iterablefrom enum import Enumfrom pydantic import BaseModelfrom datetime import datetime, timedeltaimport numpy as npclass Department(Enum):    AD_OPS = "ad_operations"    ENGINEERING = "engineering"    SALES = "sales"    ACCOUNT_MANAGEMENT = "account_management"    SUPPORT = "support"class SkillLevel(Enum):    JUNIOR = "junior"    MID = "mid"    SENIOR = "senior"    LEAD = "lead"class ShiftType(Enum):    MORNING_SHIFT = "morning"  # 6AM-2PM    AFTERNOON_SHIFT = "swing"  # 2PM-10PM    NIGHT_SHIFT = "night"  # 10PM-6AM    STANDARD_SHIFT = "day" # 9AM-5PM    ON_CALL = "on_call"# Ordering used for "at least this skill level" checksSKILL_LEVEL_RANK = {    SkillLevel.JUNIOR: 0,    SkillLevel.MID: 1,    SkillLevel.SENIOR: 2,    SkillLevel.LEAD: 3}# Paid hours per shift typeSHIFT_HOURS = {    ShiftType.MORNING_SHIFT: 8,    ShiftType.STANDARD_SHIFT: 8,    ShiftType.AFTERNOON_SHIFT: 8,    ShiftType.NIGHT_SHIFT: 8,    ShiftType.ON_CALL: 24}# (start hour, end hour) per shift type; an end before the start runs past midnightSHIFT_TIMES = {    ShiftType.MORNING_SHIFT: (6, 14),    ShiftType.STANDARD_SHIFT: (9, 17),    ShiftType.AFTERNOON_SHIFT: (14, 22),    ShiftType.NIGHT_SHIFT: (22, 6),    ShiftType.ON_CALL: (0, 24)}    # Canonical frozensets of skills / regions / certifications. Rosters reuse a# handful of combinations, so thousands of employees share a few set objects._INTERNED_SETS = {}_MAX_INTERNED_SETS = 65536def intern_set(values: Iterable[str]) -> FrozenSet[str]:    """Shared frozenset of interned strings equal to `values`"""    key = frozenset(values)    interned = _INTERNED_SETS.get(key)    if interned is not None:        return interned    key = frozenset(sys.intern(v) if isinstance(v, str) else v for v in key)    if len(_INTERNED_SETS) < _MAX_INTERNED_SETS:        _INTERNED_SETS[key] = key    return key    class ScheduleConstraints(BaseModel):    max_overtime: int = 10    min_rest_hours: int = 11    max_consecutive_shifts: int = 5    require_qualifications: bool = True    enforce_department_matching: bool = Trueclass BusinessRules(BaseModel):    require_senior_cover: bool = True    traffic_based_staffing: bool = True    respect_shift_preferences: bool = True    minimize_costs: bool = True    balance_workload: bool = True@dataclass(slots=True)class Employee:    id: str    name: str    department: Department    skill_level: SkillLevel    skills: FrozenSet[str]    max_hours_per_week: int = 40    cost_per_hour: float = 22.80    preferred_shift: ShiftType = None    timezone: str = "EST"    is_remote: bool = True        # PubMatic specific attributes    certifications: FrozenSet[str] = None    supported_regions: FrozenSet[str] = None    on_call_capacity: bool = False        def __post_init__(self):        self.skills = intern_set(self.skills)        self.certifications = intern_set(self.certifications or ())        self.supported_regions = intern_set(("NA",) if self.supported_regions is None else self.supported_regions)@dataclassclass AdTrafficForecast:    date: str    hour: int    expected_impressions: int      region: str    traffic_tier: str  @dataclass(slots=True)class Shift:    id: str    date: str    shift_type: ShiftType    department: Department    required_skill_level: SkillLevel    required_skills: FrozenSet[str]    min_employees: int    max_employees: int    region: str = "NA"    priority: int = 1  # 1-5, with 5 being highest        # Derived from traffic forecasts    expected_traffic: int = 0        def __post_init__(self):        self.required_skills = intern_set(self.required_skills)        self.date = sys.intern(self.date)        self.region = sys.intern(self.region)@dataclass(slots=True)class ScheduleRequest():    start_date: str    end_date: str    employees: List[Employee]    shifts: List[Shift]    constraints: Dict    business_rules: Dict    # employee id -> dates (YYYY-MM-DD) the employee cannot work    blackouts: Dict[str, Set[str]] = None    def __post_init__(self):        if self.blackouts is None:            self.blackouts = {}@dataclass(slots=True)class ScheduleResponse:    assignments: Dict[str, List[str]]    metrics: Dict    total_cost: float    coverage_score: float    risk_assessment: Dict    @dataclass(slots=True)class TableCodes:    """Value -> integer codes shared by an EmployeeTable and a ShiftTable"""    departments: Dict = field(default_factory=dict)    skills: Dict = field(default_factory=dict)    regions: Dict = field(default_factory=dict)    def code(self, kind, value):        codes = getattr(self, kind)        return codes.setdefault(value, len(codes))    def mask(self, kind, sets):        """Encode string sets as rows of a multi-word uint64 bitmask        Each distinct set is encoded once; with interned sets that is a        handful of rows however many employees share them.        """        codes = getattr(self, kind)        distinct = {}        rows = np.array([distinct.setdefault(frozenset(values), len(distinct)) for values in sets], dtype=np.intp)        bits = [[codes.setdefault(v, len(codes)) for v in values] for values in distinct]        words = max(1, (len(codes) + 63) // 64)        masks = np.zeros((len(bits), words), dtype=np.uint64)        for row, row_bits in enumerate(bits):            for bit in row_bits:                masks[row, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)        return masks[rows]def _widen(masks, words):    if masks.shape[1] >= words:        return masks    widened = np.zeros((masks.shape[0], words), dtype=np.uint64)    widened[:, :masks.shape[1]] = masks    return widenedclass EmployeeTable:    """Columnar view of a list of Employees, one array per attribute.    Row i is employees[i]. Skills and regions are bitmasks over `codes`,    so building a ShiftTable with the same codes makes qualification    checks plain array operations.    """    __slots__ = ("ids", "department", "level", "cost", "max_hours", "on_call", "skills", "regions")    def __init__(self, employees: List[Employee], codes: TableCodes):        self.ids = [e.id for e in employees]        self.department = np.array([codes.code("departments", e.department) for e in employees], dtype=np.int16)        self.level = np.array([SKILL_LEVEL_RANK[e.skill_level] for e in employees], dtype=np.int8)        self.cost = np.array([e.cost_per_hour for e in employees], dtype=np.float64)        self.max_hours = np.array([e.max_hours_per_week for e in employees], dtype=np.float64)        self.on_call = np.array([bool(e.on_call_capacity) for e in employees], dtype=bool)        self.skills = codes.mask("skills", [e.skills for e in employees])        self.regions = codes.mask("regions", [e.supported_regions or () for e in employees])    def __len__(self):        return len(self.ids)    def widen(self, shifts: "ShiftTable"):        """Pad the bitmasks after `shifts` added codes of its own"""        self.skills = _widen(self.skills, shifts.skills.shape[1])        self.regions = _widen(self.regions, shifts.regions.shape[1])class ShiftTable:    """Columnar view of a list of Shifts, one array per attribute"""    __slots__ = ("ids", "dates", "department", "level", "hours", "min_employees", "max_employees",                 "priority", "on_call", "skills", "regions")    def __init__(self, shifts: List[Shift], codes: TableCodes):        self.ids = [s.id for s in shifts]        self.dates = [s.date for s in shifts]        self.department = np.array([codes.code("departments", s.department) for s in shifts], dtype=np.int16)        self.level = np.array([SKILL_LEVEL_RANK[s.required_skill_level] for s in shifts], dtype=np.int8)        self.hours = np.array([SHIFT_HOURS.get(s.shift_type, 8) for s in shifts], dtype=np.float64)        self.min_employees = np.array([s.min_employees for s in shifts], dtype=np.int32)        self.max_employees = np.array([s.max_employees for s in shifts], dtype=np.int32)        self.priority = np.array([s.priority for s in shifts], dtype=np.int16)        self.on_call = np.array([s.shift_type == ShiftType.ON_CALL for s in shifts], dtype=bool)        self.skills = codes.mask("skills", [s.required_skills for s in shifts])        self.regions = codes.mask("regions", [(s.region,) for s in shifts])    def __len__(self):        return len(self.ids)
\ No newline at end of file
@@ -1 +1 @@
-from models import Department, SkillLevel, ShiftTypefrom datetime import datetime, timedeltaclass BaseOptimizer():        def _shifts_violate_24h_separation(self, shift1, shift2, shift_times):        """Check if two shifts violate 24-hour separation rule"""                date1 = datetime.strptime(shift1.date, "%Y-%m-%d")        date2 = datetime.strptime(shift2.date, "%Y-%m-%d")                start1, end1 = shift_times[shift1.shift_type]        start2, end2 = shift_times[shift2.shift_type]                abs_start1 = date1 + timedelta(hours=start1)        abs_end1 = date1 + timedelta(hours=end1 if end1 >= start1 else end1 + 24)                abs_start2 = date2 + timedelta(hours=start2)        abs_end2 = date2 + timedelta(hours=end2 if end2 >= start2 else end2 + 24)                time_between_shifts = min(            abs((abs_start2 - abs_end1).total_seconds() / 3600),  # Gap between end1 and start2            abs((abs_start1 - abs_end2).total_seconds() / 3600)   # Gap between end2 and start1        )        return time_between_shifts < 24            def _is_qualified(self, employee, shift):        """Simple qualification check"""        if employee.department != shift.department:            return shift.priority >= 4          return True        def _get_shift_hours(self, shift_type):        """Get hours for each shift type"""        hours_map = {            ShiftType.MORNING_SHIFT: 8,            ShiftType.STANDARD_SHIFT: 8,            ShiftType.AFTERNOON_SHIFT: 8,            ShiftType.NIGHT_SHIFT: 8,            ShiftType.ON_CALL: 24        }        return hours_map.get(shift_type, 8)
\ No newline at end of file
+from models import Department, SkillLevel, ShiftType, ScheduleResponse, SKILL_LEVEL_RANK, SHIFT_HOURSfrom datetime import datetime, timedeltaclass BaseOptimizer():        def _shifts_violate_24h_separation(self, shift1, shift2, shift_times):        """Check if two shifts violate 24-hour separation rule"""                date1 = datetime.strptime(shift1.date, "%Y-%m-%d")        date2 = datetime.strptime(shift2.date, "%Y-%m-%d")                start1, end1 = shift_times[shift1.shift_type]        start2, end2 = shift_times[shift2.shift_type]                abs_start1 = date1 + timedelta(hours=start1)        abs_end1 = date1 + timedelta(hours=end1 if end1 >= start1 else end1 + 24)                abs_start2 = date2 + timedelta(hours=start2)        abs_end2 = date2 + timedelta(hours=end2 if end2 >= start2 else end2 + 24)                time_between_shifts = min(            abs((abs_start2 - abs_end1).total_seconds() / 3600),  # Gap between end1 and start2            abs((abs_start1 - abs_end2).total_seconds() / 3600)   # Gap between end2 and start1        )        return time_between_shifts < 24            def _is_qualified(self, employee, shift, constraints=None):        """Qualification check for a single pair.        Mirrors CompiledProblem.eligible, which should be preferred when        checking many pairs.        """        constraints = constraints or {}        if constraints.get("enforce_department_matching", True) and employee.department != shift.department:            if shift.priority < 4:                return False        if constraints.get("require_qualifications", True):            if SKILL_LEVEL_RANK[employee.skill_level] < SKILL_LEVEL_RANK[shift.required_skill_level]:                return False            if not set(shift.required_skills) <= set(employee.skills):                return False            if shift.region not in employee.supported_regions:                return False            if shift.shift_type == ShiftType.ON_CALL and not employee.on_call_capacity:                return False        return True        def _get_shift_hours(self, shift_type):        """Get hours for each shift type"""        return SHIFT_HOURS.get(shift_type, 8)    def _build_comprehensive_response(self, request, assignments, phase, solution_type):        """Build comprehensive response with analytics and risk assessment from a shift -> employee ids map"""                total_cost = 0        coverage_score = 0        total_shifts = len(request.shifts)        employee_hours = {emp.id: 0 for emp in request.employees}        employee_assignments = {emp.id: [] for emp in request.employees}        department_distribution = {}        skill_utilization = {}        senior_lead_count = 0        total_assignments_for_ratio = 0        understaffed_shifts = []        overlap_violations = 0        employee_daily_shifts = {emp.id: {} for emp in request.employees}        employees_by_id = {emp.id: emp for emp in request.employees}        for shift in request.shifts:            assigned_emps = assignments.get(shift.id, [])            shift_hours = self._get_shift_hours(shift.shift_type)            assigned_count = len(assigned_emps)                        for emp_id in assigned_emps:                employee = employees_by_id.get(emp_id)                if employee:                    total_cost += employee.cost_per_hour * shift_hours                    employee_hours[emp_id] += shift_hours                    employee_assignments[emp_id].append(shift.id)                                        dept = employee.department                    department_distribution[dept] = department_distribution.get(dept, 0) + 1                                        skill_level = employee.skill_level if hasattr(employee, 'skill_level') else 'regular'                    skill_utilization[skill_level] = skill_utilization.get(skill_level, 0) + 1                                        if hasattr(employee, 'skill_level') and employee.skill_level in ['senior', 'lead']:                        senior_lead_count += 1                    total_assignments_for_ratio += 1                    if shift.date not in employee_daily_shifts[employee.id]:                        employee_daily_shifts[employee.id][shift.date] = []                    employee_daily_shifts[employee.id][shift.date].append(shift)                        if assigned_count < shift.min_employees:                understaffed_shifts.append({                    "shift_id": shift.id,                    "date": shift.date,                    "department": shift.department,                    "required": shift.min_employees,                    "assigned": assigned_count,                    "shift_type": shift.shift_type.value                })                        if assigned_count >= shift.min_employees:                coverage_score += 1        for employee in request.employees:            for date, shifts_on_date in employee_daily_shifts[employee.id].items():                if len(shifts_on_date) > 1:                    overlap_violations += 1        coverage_rate = (coverage_score / total_shifts * 100) if total_shifts else 0                idle_employees = sum(1 for emp in request.employees if employee_hours[emp.id] == 0)        underutilized_employees = sum(1 for emp in request.employees if 0 < employee_hours[emp.id] < 8)        fully_utilized_employees = sum(1 for emp in request.employees if 8 <= employee_hours[emp.id] <= emp.max_hours_per_week)        overtime_employees = sum(1 for emp in request.employees if employee_hours[emp.id] > emp.max_hours_per_week)                senior_lead_ratio = (senior_lead_count / total_assignments_for_ratio * 100) if total_assignments_for_ratio > 0 else 0                high_traffic_risks = []        for shift in request.shifts:            if (shift.priority >= 8 or                 shift.department in ['operations', 'traffic'] or                (hasattr(shift, 'expected_traffic') and getattr(shift, 'expected_traffic', 0) > 5000000)):                assigned_count = len(assignments.get(shift.id, []))                if assigned_count < shift.min_employees:                    high_traffic_risks.append(shift.id)                            understaffed_risk = len(understaffed_shifts) * 15        idle_risk = idle_employees * 8        overlap_risk = overlap_violations * 25        overtime_risk = overtime_employees * 20        high_traffic_risk = len(high_traffic_risks) * 30        total_risk_score = min(understaffed_risk + idle_risk + overlap_risk + overtime_risk + high_traffic_risk, 100)                recommendations = []        if solution_type == "relaxed":            recommendations.append("Using relaxed constraints solution (some constraints were violated)")        elif solution_type == "best_effort":            recommendations.append("Using best-effort assignment (optimization failed)")                    if understaffed_shifts:            recommendations.append(f"{len(understaffed_shifts)} shifts are understaffed")        if high_traffic_risks:            recommendations.append(f"{len(high_traffic_risks)} high-traffic shifts need attention")        if idle_employees > 0:            recommendations.append(f"{idle_employees} employees are idle")        if underutilized_employees > 0:            recommendations.append(f"{underutilized_employees} employees are underutilized")        if overlap_violations > 0:            recommendations.append(f"{overlap_violations} overlap violations detected")        if overtime_employees > 0:            recommendations.append(f"{overtime_employees} employees are over capacity")                    if solution_type == "best_effort":            recommendations.append("High-priority shifts were staffed first")            recommendations.append("Consider adding more employees or reducing shift requirements")        metrics = {            "total_shifts_scheduled": sum(len(emps) for emps in assignments.values()),            "total_labor_cost": round(total_cost, 2),            "coverage_rate": round(coverage_rate, 1),            "assigned_shifts_count": sum(len(emps) for emps in assignments.values()),            "understaffed_shifts_count": len(understaffed_shifts),            "idle_employees_count": idle_employees,            "underutilized_employees_count": underutilized_employees,            "fully_utilized_employees_count": fully_utilized_employees,            "overtime_employees_count": overtime_employees,            "overlap_violations": overlap_violations,            "optimization_phase": phase,            "senior_lead_ratio": round(senior_lead_ratio, 1),            "department_distribution": department_distribution,            "skill_utilization": skill_utilization,            "total_employees": len(request.employees),            "utilized_employees": len(request.employees) - idle_employees,            "average_hours_per_employee": round(sum(employee_hours.values()) / len(request.employees), 1) if request.employees else 0,            "utilization_rate": round(((len(request.employees) - idle_employees) / len(request.employees)) * 100, 1) if request.employees else 0,            "solution_type": solution_type,            "is_optimal": False,            "is_partial": True,        }                risk_assessment = {            "understaffed_shifts": understaffed_shifts,            "high_traffic_risks": high_traffic_risks,            "risk_score": total_risk_score,            "risk_breakdown": {                "understaffed_risk": understaffed_risk,                "idle_risk": idle_risk,                "overlap_risk": overlap_risk,                "overtime_risk": overtime_risk,                "high_traffic_risk": high_traffic_risk            },            "recommendations": recommendations,            "critical_issues": {                "understaffed_critical": len([s for s in understaffed_shifts if s.get('priority', 0) >= 8]),                "high_traffic_understaffed": len(high_traffic_risks),                "severe_overlaps": overlap_violations            },            "solution_type": solution_type        }                return ScheduleResponse(            assignments=assignments,            metrics=metrics,            total_cost=total_cost,            coverage_score=coverage_rate,            risk_assessment=risk_assessment        )
\ No newline at end of file
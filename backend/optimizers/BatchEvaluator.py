@@ -0,0 +1,181 @@
+import numpy as np
+
+from optimizers.CompiledProblem import CompiledProblem
+
+
+class BatchEvaluator:
+    """Scores many candidate schedules for one problem at once.
+
+    Candidates are shift id -> employee ids maps. They are packed into a
+    (candidates x employees x shifts) boolean tensor, a chunk at a time, and
+    cost, coverage and every rule are computed with array operations over
+    the whole chunk. The risk assessment uses the same weights as
+    BaseOptimizer._build_comprehensive_response, so scores are comparable
+    with solver output.
+    """
+
+    # Tensor cells per chunk; bounds memory whatever the number of candidates
+    MAX_CELLS = 1 << 25
+
+    def __init__(self, compiled: CompiledProblem):
+        self.compiled = c = compiled
+        constraints = c.constraints
+        self.n_emp, self.n_shift = len(c.employees), len(c.shifts)
+
+        self.pair_cost = (c.emp_cost[:, None] * c.shift_hours[None, :]).astype(np.float32)
+        self.week_hours = np.zeros((self.n_shift, len(c.weeks)), dtype=np.float32)
+        self.week_hours[np.arange(self.n_shift), c.shift_week] = c.shift_hours
+        self.on_day = np.zeros((self.n_shift, len(c.dates)), dtype=np.float32)
+        self.on_day[np.arange(self.n_shift), c.shift_day] = 1
+
+        # Calendar position of every date, for consecutive-day windows across gaps
+        first = c.day_ordinal[0] if len(c.dates) else 0
+        self.day_calendar = (c.day_ordinal - first).astype(np.intp)
+        self.calendar_days = int(self.day_calendar[-1]) + 1 if len(c.dates) else 0
+        self.max_consecutive = constraints.get("max_consecutive_shifts", 5)
+        self.rest_pairs = c.rest_pairs(constraints.get("min_rest_hours", 11))
+
+        self.high_traffic = (c.shift_priority >= 8) | np.array(
+            [s.expected_traffic > 5000000 for s in c.shifts], dtype=bool)
+
+    def pack(self, candidates):
+        """(len(candidates) x employees x shifts) assignment tensor and unknown-id counts"""
+        c = self.compiled
+        tensor = np.zeros((len(candidates), self.n_emp, self.n_shift), dtype=bool)
+        unknown = np.zeros(len(candidates), dtype=np.int64)
+        for n, assignments in enumerate(candidates):
+            for shift_id, employee_ids in assignments.items():
+                s_idx = c.shift_index.get(shift_id)
+                if s_idx is None:
+                    unknown[n] += len(employee_ids)
+                    continue
+                for emp_id in employee_ids:
+                    e_idx = c.employee_index.get(emp_id)
+                    if e_idx is None:
+                        unknown[n] += 1
+                    else:
+                        tensor[n, e_idx, s_idx] = True
+        return tensor, unknown
+
+    def evaluate(self, candidates, details=True):
+        """Score every candidate; returns one dict per candidate, in order"""
+        per_candidate = max(1, self.n_emp * max(self.n_shift, len(self.rest_pairs[0]), self.calendar_days))
+        chunk = max(1, self.MAX_CELLS // per_candidate)
+        results = []
+        for begin in range(0, len(candidates), chunk):
+            part = candidates[begin:begin + chunk]
+            tensor, unknown = self.pack(part)
+            scores = self.score(tensor)
+            scores["unknown_assignments"] = unknown
+            results.extend(self._results(scores, len(part), details))
+        return results
+
+    def score(self, tensor):
+        """Per-candidate arrays of cost, coverage and rule violations for a packed tensor"""
+        c = self.compiled
+        n = tensor.shape[0]
+        x = tensor.astype(np.float32)
+        staffed = tensor.sum(axis=1)                    # candidates x shifts
+        hours = x @ c.shift_hours.astype(np.float32)    # candidates x employees
+        week_hours = x @ self.week_hours                # candidates x employees x weeks
+        day_counts = x @ self.on_day                    # candidates x employees x days
+
+        scores = {
+            "total_cost": np.einsum("nes,es->n", x, self.pair_cost, optimize=True).astype(np.float64),
+            "staffed": staffed,
+            "assigned_shifts": staffed.sum(axis=1),
+            "covered_shifts": (staffed >= c.shift_min).sum(axis=1),
+            "understaffed": staffed < c.shift_min,
+            "overstaffed_shifts": (staffed > c.shift_max).sum(axis=1),
+            "ineligible_assignments": (tensor & ~c.eligible).sum(axis=(1, 2)),
+            "overlap_violations": (day_counts > 1).sum(axis=(1, 2)),
+            "weekly_hours_violations": (week_hours > c.emp_max_hours[None, :, None] + 1e-6).sum(axis=(1, 2)),
+            "idle_employees": (hours == 0).sum(axis=1),
+            "underutilized_employees": ((hours > 0) & (hours < 8)).sum(axis=1),
+            "overtime_employees": (hours > c.emp_max_hours).sum(axis=1),
+        }
+
+        earlier, later = self.rest_pairs
+        if len(earlier):
+            scores["rest_violations"] = (tensor[:, :, earlier] & tensor[:, :, later]).sum(axis=(1, 2))
+        else:
+            scores["rest_violations"] = np.zeros(n, dtype=np.int64)
+
+        window = (self.max_consecutive or 0) + 1
+        if self.max_consecutive and self.calendar_days >= window:
+            calendar = np.zeros((n, self.n_emp, self.calendar_days + 1), dtype=np.int32)
+            calendar[:, :, self.day_calendar + 1] = day_counts > 0
+            worked = np.cumsum(calendar, axis=2)
+            scores["consecutive_violations"] = (worked[:, :, window:] - worked[:, :, :-window] >= window).sum(axis=(1, 2))
+        else:
+            scores["consecutive_violations"] = np.zeros(n, dtype=np.int64)
+        return scores
+
+    def _results(self, scores, n, details):
+        c = self.compiled
+        total_shifts = self.n_shift
+        results = []
+        for i in range(n):
+            understaffed = np.flatnonzero(scores["understaffed"][i])
+            high_traffic = [c.shifts[s].id for s in understaffed if self.high_traffic[s]]
+            idle = int(scores["idle_employees"][i])
+            underutilized = int(scores["underutilized_employees"][i])
+            overtime = int(scores["overtime_employees"][i])
+            overlaps = int(scores["overlap_violations"][i])
+
+            breakdown = {
+                "understaffed_risk": len(understaffed) * 15,
+                "idle_risk": idle * 8,
+                "overlap_risk": overlaps * 25,
+                "overtime_risk": overtime * 20,
+                "high_traffic_risk": len(high_traffic) * 30,
+            }
+            recommendations = []
+            if len(understaffed):
+                recommendations.append(f"{len(understaffed)} shifts are understaffed")
+            if high_traffic:
+                recommendations.append(f"{len(high_traffic)} high-traffic shifts need attention")
+            if idle:
+                recommendations.append(f"{idle} employees are idle")
+            if underutilized:
+                recommendations.append(f"{underutilized} employees are underutilized")
+            if overlaps:
+                recommendations.append(f"{overlaps} overlap violations detected")
+            if overtime:
+                recommendations.append(f"{overtime} employees are over capacity")
+
+            risk_assessment = {
+                "high_traffic_risks": high_traffic,
+                "risk_score": min(sum(breakdown.values()), 100),
+                "risk_breakdown": breakdown,
+                "recommendations": recommendations,
+                "critical_issues": {
+                    "understaffed_critical": 0,
+                    "high_traffic_understaffed": len(high_traffic),
+                    "severe_overlaps": overlaps,
+                },
+            }
+            if details:
+                risk_assessment["understaffed_shifts"] = [{
+                    "shift_id": c.shifts[s].id,
+                    "date": c.shifts[s].date,
+                    "department": c.shifts[s].department,
+                    "required": int(c.shift_min[s]),
+                    "assigned": int(scores["staffed"][i, s]),
+                    "shift_type": c.shifts[s].shift_type.value,
+                } for s in understaffed]
+
+            results.append({
+                "total_cost": round(float(scores["total_cost"][i]), 2),
+                "coverage_score": round(scores["covered_shifts"][i] / total_shifts * 100, 1) if total_shifts else 0,
+                "assigned_shifts_count": int(scores["assigned_shifts"][i]),
+                "understaffed_shifts_count": len(understaffed),
+                "violations": {
+                    name: int(scores[name][i]) for name in (
+                        "ineligible_assignments", "overstaffed_shifts", "overlap_violations",
+                        "weekly_hours_violations", "rest_violations", "consecutive_violations",
+                        "unknown_assignments")
+                },
+                "risk_assessment": risk_assessment,
+            })
+        return results
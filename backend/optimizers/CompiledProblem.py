@@ -0,0 +1,164 @@
+import numpy as np
+from datetime import datetime
+
+from models import ScheduleRequest, SHIFT_TIMES, TableCodes, EmployeeTable, ShiftTable
+
+
+class CompiledProblem:
+    """Integer-indexed, array-backed view of a ScheduleRequest.
+
+    Employees and shifts are numbered by their position in the request.
+    The per-attribute arrays come from an EmployeeTable and a ShiftTable
+    (exposed as emp_* / shift_*), so qualification checks become vectorized
+    mask tests, and `eligible[e, s]` answers "may employee e work shift s"
+    without touching the model objects again.
+    """
+
+    def __init__(self, request: ScheduleRequest):
+        self.request = request
+        self.employees = request.employees
+        self.shifts = request.shifts
+        self.constraints = request.constraints or {}
+
+        self.employee_index = {e.id: i for i, e in enumerate(self.employees)}
+        self.shift_index = {s.id: i for i, s in enumerate(self.shifts)}
+
+        self._compile_employees()
+        self._compile_shifts()
+        self.eligible = self._compile_eligibility()
+
+        # Per-shift / per-employee candidate lists over the eligibility matrix
+        self.shift_candidates = [np.flatnonzero(col) for col in self.eligible.T]
+        self.employee_candidates = [np.flatnonzero(row) for row in self.eligible]
+        self._rest_pairs = {}  # min_rest_hours -> rest_pairs() result
+
+    def _compile_employees(self):
+        self.codes = TableCodes()
+        self.department_codes = self.codes.departments
+        self.skill_codes = self.codes.skills
+        self.region_codes = self.codes.regions
+        self.employee_table = EmployeeTable(self.employees, self.codes)
+
+    def _compile_shifts(self):
+        shifts = self.shifts
+        table = self.shift_table = ShiftTable(shifts, self.codes)
+        self.shift_department = table.department
+        self.shift_level = table.level
+        self.shift_hours = table.hours
+        self.shift_min = table.min_employees
+        self.shift_max = table.max_employees
+        self.shift_priority = table.priority
+        self.shift_on_call = table.on_call
+        self.shift_skills = table.skills
+        self.shift_regions = table.regions
+
+        # Shift encoding may have introduced new skills/regions; widen employee masks to match
+        employees = self.employee_table
+        employees.widen(table)
+        self.emp_department = employees.department
+        self.emp_level = employees.level
+        self.emp_cost = employees.cost
+        self.emp_max_hours = employees.max_hours
+        self.emp_on_call = employees.on_call
+        self.emp_skills = employees.skills
+        self.emp_regions = employees.regions
+
+        self.dates = sorted({s.date for s in shifts})
+        date_codes = {d: i for i, d in enumerate(self.dates)}
+        self.shift_day = np.array([date_codes[s.date] for s in shifts], dtype=np.int32)
+        parsed = [datetime.strptime(d, "%Y-%m-%d") for d in self.dates]
+        self.day_ordinal = np.array([d.toordinal() for d in parsed], dtype=np.int64)
+        weeks = [d.isocalendar()[:2] for d in parsed]
+        self.weeks = sorted(set(weeks))
+        week_codes = {w: i for i, w in enumerate(self.weeks)}
+        self.day_week = np.array([week_codes[w] for w in weeks], dtype=np.int32)
+        self.shift_week = self.day_week[self.shift_day] if len(shifts) else np.zeros(0, dtype=np.int32)
+
+        # Absolute start/end in hours since midnight of the first date
+        times = [SHIFT_TIMES.get(s.shift_type, (9, 17)) for s in shifts]
+        first_day = self.day_ordinal[0] if len(parsed) else 0
+        day_offset = (self.day_ordinal[self.shift_day] - first_day) * 24 if len(shifts) else np.zeros(0)
+        start = np.array([t[0] for t in times], dtype=np.float64)
+        end = np.array([t[1] if t[1] >= t[0] else t[1] + 24 for t in times], dtype=np.float64)
+        self.shift_start = day_offset + start
+        self.shift_end = day_offset + end
+
+    def _compile_eligibility(self):
+        """Build the (employees x shifts) boolean eligibility matrix.
+
+        Shifts that share the same requirements are evaluated once, so the
+        mask work scales with the number of distinct shift templates rather
+        than the number of shifts.
+        """
+        n_emp, n_shift = len(self.employees), len(self.shifts)
+        if n_emp == 0 or n_shift == 0:
+            return np.zeros((n_emp, n_shift), dtype=bool)
+
+        enforce_department = self.constraints.get("enforce_department_matching", True)
+        require_qualifications = self.constraints.get("require_qualifications", True)
+
+        template_keys = np.column_stack([
+            self.shift_department, self.shift_level, self.shift_priority >= 4, self.shift_on_call,
+            self.shift_skills.view(np.int64), self.shift_regions.view(np.int64),
+        ])
+        _, first_shift, shift_template = np.unique(
+            template_keys, axis=0, return_index=True, return_inverse=True)
+        shift_template = shift_template.reshape(-1)
+
+        template_eligible = np.ones((n_emp, len(first_shift)), dtype=bool)
+        t = first_shift
+        if enforce_department:
+            same_department = self.emp_department[:, None] == self.shift_department[None, t]
+            template_eligible &= same_department | (self.shift_priority[None, t] >= 4)
+        if require_qualifications:
+            template_eligible &= self.emp_level[:, None] >= self.shift_level[None, t]
+            for word in range(self.shift_skills.shape[1]):
+                missing = self.shift_skills[None, t, word] & ~self.emp_skills[:, None, word]
+                template_eligible &= missing == 0
+            for word in range(self.shift_regions.shape[1]):
+                covered = self.shift_regions[None, t, word] & self.emp_regions[:, None, word]
+                template_eligible &= covered == self.shift_regions[None, t, word]
+            template_eligible &= self.emp_on_call[:, None] | ~self.shift_on_call[None, t]
+
+        eligible = template_eligible[:, shift_template]
+
+        # Availability blackouts are per employee and date, not per template
+        date_codes = {d: i for i, d in enumerate(self.dates)}
+        for emp_id, dates in (getattr(self.request, "blackouts", None) or {}).items():
+            e_idx = self.employee_index.get(emp_id)
+            days = [date_codes[d] for d in dates if d in date_codes]
+            if e_idx is not None and days:
+                eligible[e_idx, np.isin(self.shift_day, days)] = False
+
+        return eligible
+
+    def candidate_mask(self, enforce_qualifications=True):
+        """Pairs an optimizer should create decision variables for"""
+        if enforce_qualifications:
+            return self.eligible
+        return np.ones_like(self.eligible)
+
+    def rest_pairs(self, min_rest_hours):
+        """(earlier, later) shift idx arrays of pairs on different days with less
+        than min_rest_hours between the end of one and the start of the other.
+
+        Found with one sweep over the shifts sorted by start, and kept per
+        min_rest_hours so the solvers and the evaluator share it.
+        """
+        pairs = self._rest_pairs.get(min_rest_hours)
+        if pairs is not None:
+            return pairs
+        earlier, later = [], []
+        if min_rest_hours and len(self.shifts):
+            order = np.argsort(self.shift_start, kind="stable")
+            starts = self.shift_start[order]
+            for a in range(len(self.shifts)):
+                lo = np.searchsorted(starts, self.shift_start[a], side="left")
+                hi = np.searchsorted(starts, self.shift_end[a] + min_rest_hours, side="left")
+                following = order[lo:hi]
+                following = following[self.shift_day[following] > self.shift_day[a]]
+                earlier.extend([a] * len(following))
+                later.extend(following.tolist())
+        pairs = (np.array(earlier, dtype=np.intp), np.array(later, dtype=np.intp))
+        self._rest_pairs[min_rest_hours] = pairs
+        return pairs
@@ -0,0 +1,259 @@
+import inspect
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import perf
+from optimizers.BaseOptimizer import BaseOptimizer
+from optimizers.CompiledProblem import CompiledProblem
+from optimizers.EmployeeTimeline import EmployeeTimeline
+from models import ScheduleRequest, ScheduleResponse
+
+
+def _inner_class(name):
+    if name == "milp":
+        from optimizers.MilpOptimizer import MilpOptimizer
+        return MilpOptimizer
+    if name == "gradual":
+        from optimizers.GradualOptimizer import GradualOptimizer
+        return GradualOptimizer
+    raise ValueError(f"Unknown inner optimizer {name!r}; expected milp or gradual")
+
+
+def _inner_optimizer(name, options):
+    return _inner_class(name)(**options)
+
+
+def _default_workers():
+    """SCHEDULER_DECOMPOSE_WORKERS, else one per CPU in a top-level process
+    and 1 in a child process such as a JobManager worker, which already
+    shares the CPUs with its siblings
+    """
+    configured = os.environ.get("SCHEDULER_DECOMPOSE_WORKERS")
+    if configured:
+        return int(configured)
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _solve_part(sub_request, inner, phase, options):
+    """Pool entry point: solve one sub-problem and time it
+
+    Its phases and counters are returned in metrics["perf"] so the parent
+    can add them to its own recorder.
+    """
+    started = time.perf_counter()
+    with perf.recording() as recorder:
+        response = _inner_optimizer(inner, options).optimize(sub_request, phase=phase)
+    response.metrics["perf"] = recorder.to_dict()
+    return response, time.perf_counter() - started
+
+
+class DecomposedOptimizer(BaseOptimizer):
+    """Splits a request into independent sub-problems and solves them in parallel.
+
+    Employees and shifts are grouped into connected components of the
+    eligibility graph (with department matching on, each department is its
+    own component unless a priority >= 4 shift opens it to the others), and
+    every component is cut again by ISO week, which is the only thing
+    `max_hours_per_week` couples. The pieces are solved on a process pool
+    with the `inner` optimizer and merged; rest-hour and consecutive-day
+    rules that span week boundaries are then enforced by a boundary-fix
+    pass that drops the offending assignments and repairs those shifts.
+
+    `inner_options` go to the inner optimizer's constructor; those it does
+    not take (mip_gap for "gradual") are ignored. Solves on
+    the JobManager pool run in its worker processes, so each of those
+    solves sub-problems one at a time unless SCHEDULER_DECOMPOSE_WORKERS
+    is set; a full pool then runs up to SCHEDULER_MAX_WORKERS x
+    SCHEDULER_DECOMPOSE_WORKERS solver processes, which should stay
+    within the CPU count.
+    """
+
+    def __init__(self, inner="milp", max_workers=None, split_weeks=True, **inner_options):
+        accepted = inspect.signature(_inner_class(inner).__init__).parameters
+        self.inner = inner
+        self.max_workers = max_workers or _default_workers()
+        self.split_weeks = split_weeks
+        self.inner_options = {name: value for name, value in inner_options.items() if name in accepted}
+
+    def optimize(self, request: ScheduleRequest, phase=4, progress=None, compiled=None) -> ScheduleResponse:
+        report = progress or (lambda fraction, stage: None)
+        started = time.perf_counter()
+        report(0.05, "decomposing")
+        with perf.phase("decomposed.split"):
+            self.compiled = compiled or CompiledProblem(request)
+            parts = self._split(request)
+
+        report(0.1, "solving_subproblems")
+        solving = time.perf_counter()
+        assignments = {shift.id: [] for shift in request.shifts}
+        part_metrics = []
+        for (employees, shifts), (response, seconds) in self._solve_parts(request, parts, phase, report):
+            perf.merge(response.metrics.get("perf"))
+            for shift_id, employee_ids in response.assignments.items():
+                assignments[shift_id] = list(employee_ids)
+            part_metrics.append({
+                "departments": sorted({getattr(s.department, "value", s.department) for s in shifts}),
+                "week": shifts[0].date if shifts else None,
+                "employees": len(employees),
+                "shifts": len(shifts),
+                "solution_type": response.metrics.get("solution_type"),
+                "coverage_rate": response.metrics.get("coverage_rate"),
+                "solve_seconds": round(seconds, 3),
+            })
+        solved = time.perf_counter()
+        perf.add_phase("decomposed.solve", solved - solving)
+
+        report(0.85, "boundary_fix")
+        with perf.phase("decomposed.boundary_fix"):
+            affected = self._drop_boundary_violations(request, assignments)
+            if affected:
+                from optimizers.RepairOptimizer import RepairOptimizer
+                assignments = RepairOptimizer().repair(request, assignments, affected, compiled=self.compiled).assignments
+
+        report(0.95, "building_response")
+        solution_types = {m["solution_type"] for m in part_metrics}
+        if not solution_types or solution_types == {"optimal"}:
+            solution_type = "optimal"
+        elif solution_types & {"relaxed", "best_effort"}:
+            solution_type = "relaxed"
+        else:
+            solution_type = "feasible"
+        response = self._build_comprehensive_response(request, assignments, phase, solution_type)
+        response.metrics.update({
+            "solver": "decomposed",
+            "inner_optimizer": self.inner,
+            "is_optimal": solution_type == "optimal" and not affected,
+            "is_partial": solution_type != "optimal",
+            "subproblem_count": len(parts),
+            "subproblems": part_metrics,
+            "boundary_fixed_shifts": len(affected),
+            "decompose_workers": min(self.max_workers, len(parts)) or 1,
+            "subproblem_seconds_total": round(sum(m["solve_seconds"] for m in part_metrics), 3),
+            "solve_seconds": round(solved - started, 3),
+            "total_seconds": round(time.perf_counter() - started, 3),
+        })
+        return response
+
+    def _split(self, request):
+        """Return [(employees, shifts)] for every independent sub-problem"""
+        compiled = self.compiled
+        n_emp, n_shift = len(request.employees), len(request.shifts)
+
+        # Union-find over employee nodes [0, n_emp) and shift nodes [n_emp, n_emp + n_shift)
+        parent = list(range(n_emp + n_shift))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for e_idx, candidates in enumerate(compiled.employee_candidates):
+            root = find(e_idx)
+            for s_idx in candidates:
+                other = find(n_emp + int(s_idx))
+                if other != root:
+                    parent[other] = root
+
+        components = {}
+        for s_idx in range(n_shift):
+            if len(compiled.shift_candidates[s_idx]):
+                components.setdefault(find(n_emp + s_idx), ([], []))[1].append(s_idx)
+        for e_idx in range(n_emp):
+            root = find(e_idx)
+            if root in components:
+                components[root][0].append(e_idx)
+
+        # Shifts nobody may work stay unassigned and are not solved
+        parts = []
+        for emp_idxs, shift_idxs in components.values():
+            if self.split_weeks:
+                by_week = {}
+                for s_idx in shift_idxs:
+                    by_week.setdefault(compiled.shift_week[s_idx], []).append(s_idx)
+                groups = [by_week[w] for w in sorted(by_week)]
+            else:
+                groups = [shift_idxs]
+            for group in groups:
+                parts.append((
+                    [request.employees[e] for e in emp_idxs],
+                    [request.shifts[s] for s in group],
+                ))
+        # Largest first so the pool's tail is short
+        parts.sort(key=lambda part: -len(part[0]) * len(part[1]))
+        return parts
+
+    def _sub_request(self, request, employees, shifts):
+        employee_ids = {e.id for e in employees}
+        dates = sorted({s.date for s in shifts})
+        return ScheduleRequest(
+            start_date=dates[0] if dates else request.start_date,
+            end_date=dates[-1] if dates else request.end_date,
+            employees=employees,
+            shifts=shifts,
+            constraints=request.constraints,
+            business_rules=request.business_rules,
+            blackouts={e: d for e, d in (request.blackouts or {}).items() if e in employee_ids},
+        )
+
+    def _solve_parts(self, request, parts, phase, report):
+        """Yield ((employees, shifts), (response, seconds)) as sub-problems finish"""
+        sub_requests = [self._sub_request(request, employees, shifts) for employees, shifts in parts]
+        workers = min(self.max_workers, len(parts))
+        if workers <= 1:
+            for i, sub_request in enumerate(sub_requests):
+                yield parts[i], _solve_part(sub_request, self.inner, phase, self.inner_options)
+                report(0.1 + 0.75 * (i + 1) / len(parts), "solving_subproblems")
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_solve_part, sub_request, self.inner, phase, self.inner_options): i
+                for i, sub_request in enumerate(sub_requests)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                yield parts[futures[future]], future.result()
+                report(0.1 + 0.75 * done / len(parts), "solving_subproblems")
+
+    def _drop_boundary_violations(self, request, assignments):
+        """Unassign the later shift of every cross-part rest or consecutive-day violation.
+
+        Each employee's shifts are replayed in start order into an
+        EmployeeTimeline; a shift it refuses is dropped. Weekly hours are
+        allowed max_overtime on top, as in the MILP, since parts never
+        split a week. Returns the ids of the shifts that lost an employee.
+        """
+        compiled = self.compiled
+        constraints = request.constraints or {}
+        timeline = EmployeeTimeline(
+            compiled, constraints.get("min_rest_hours", 11), constraints.get("max_consecutive_shifts", 5),
+            max_overtime=constraints.get("max_overtime", 10))
+
+        employee_shifts = [[] for _ in request.employees]
+        for shift_id, employee_ids in assignments.items():
+            s_idx = compiled.shift_index[shift_id]
+            for emp_id in employee_ids:
+                employee_shifts[compiled.employee_index[emp_id]].append(s_idx)
+
+        affected = set()
+        for e_idx, shift_idxs in enumerate(employee_shifts):
+            if len(shift_idxs) < 2:
+                continue
+            shift_idxs.sort(key=lambda s: compiled.shift_start[s])
+            dropped = set()
+            for s_idx in shift_idxs:
+                if timeline.can_take(e_idx, s_idx):
+                    timeline.assign(e_idx, s_idx)
+                else:
+                    dropped.add(s_idx)
+
+            emp_id = request.employees[e_idx].id
+            for s_idx in dropped:
+                shift_id = request.shifts[s_idx].id
+                assignments[shift_id] = [e for e in assignments[shift_id] if e != emp_id]
+                affected.add(shift_id)
+        return sorted(affected)
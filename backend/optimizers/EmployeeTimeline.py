@@ -0,0 +1,118 @@
+from bisect import bisect_left, insort
+
+from optimizers.CompiledProblem import CompiledProblem
+
+
+class EmployeeTimeline:
+    """Incremental per-employee labour-rule state for one CompiledProblem.
+
+    For every employee it holds the hours worked per ISO week, the number
+    of shifts per calendar day and the assigned shifts as a start-sorted
+    list of (start, end, shift) intervals. can_take() answers "may employee
+    e also work shift s" from these alone:
+
+    - weekly hours and one-shift-per-day are dictionary lookups,
+    - min_rest_hours bisects the interval list and looks at the few shifts
+      that can end or start within the rest period around s,
+    - max_consecutive_shifts walks at most max_consecutive days each way.
+
+    assign() and unassign() keep the state in step, so a check never
+    rescans an employee's schedule.
+
+    max_hours_per_week applies per ISO week, as in MilpOptimizer.
+    GradualOptimizer and the fallback schedules cap the whole horizon at
+    it instead, which is stricter on multi-week problems.
+    """
+
+    def __init__(self, compiled: CompiledProblem, min_rest_hours=11, max_consecutive=5, max_overtime=0):
+        self.compiled = compiled
+        self.min_rest_hours = min_rest_hours or 0
+        self.max_consecutive = max_consecutive or 0
+
+        # Plain lists: scalar reads from numpy arrays are slow in the hot path
+        self.start = [float(t) for t in compiled.shift_start]
+        self.end = [float(t) for t in compiled.shift_end]
+        self.hours = [float(h) for h in compiled.shift_hours]
+        self.week = [int(w) for w in compiled.shift_week]
+        self.day = [int(compiled.day_ordinal[d]) for d in compiled.shift_day]
+        self.max_hours = [float(h) + max_overtime for h in compiled.emp_max_hours]
+        # No shift is longer than this, so no interval starting earlier can reach into a rest window
+        self.max_duration = max((e - s for s, e in zip(self.start, self.end)), default=0.0)
+
+        n_emp = len(compiled.employees)
+        self._week_hours = [dict() for _ in range(n_emp)]  # employee -> {week: hours}
+        self._day_count = [dict() for _ in range(n_emp)]   # employee -> {day ordinal: shifts}
+        self._intervals = [[] for _ in range(n_emp)]       # employee -> sorted [(start, end, shift)]
+        self._shifts = [set() for _ in range(n_emp)]       # employee -> shift idxs
+
+    def assign(self, e_idx, s_idx):
+        week, day = self.week[s_idx], self.day[s_idx]
+        self._week_hours[e_idx][week] = self._week_hours[e_idx].get(week, 0.0) + self.hours[s_idx]
+        self._day_count[e_idx][day] = self._day_count[e_idx].get(day, 0) + 1
+        insort(self._intervals[e_idx], (self.start[s_idx], self.end[s_idx], s_idx))
+        self._shifts[e_idx].add(s_idx)
+
+    def unassign(self, e_idx, s_idx):
+        week, day = self.week[s_idx], self.day[s_idx]
+        self._week_hours[e_idx][week] -= self.hours[s_idx]
+        days = self._day_count[e_idx]
+        days[day] -= 1
+        if not days[day]:
+            del days[day]
+        intervals = self._intervals[e_idx]
+        del intervals[bisect_left(intervals, (self.start[s_idx], self.end[s_idx], s_idx))]
+        self._shifts[e_idx].discard(s_idx)
+
+    def week_hours(self, e_idx, week):
+        return self._week_hours[e_idx].get(week, 0.0)
+
+    def shifts(self, e_idx):
+        """Shift idxs currently assigned to e_idx; do not modify"""
+        return self._shifts[e_idx]
+
+    def can_take(self, e_idx, s_idx, ignoring=None):
+        """Hours, one-shift-per-day, rest and consecutive-day checks for adding s_idx to e_idx
+
+        `ignoring` is one of e_idx's shifts to treat as unassigned, for moves.
+        Eligibility is not checked here; see CompiledProblem.eligible.
+        """
+        week, day = self.week[s_idx], self.day[s_idx]
+        ignored_day = self.day[ignoring] if ignoring is not None else None
+
+        hours = self._week_hours[e_idx].get(week, 0.0) + self.hours[s_idx]
+        if ignoring is not None and self.week[ignoring] == week:
+            hours -= self.hours[ignoring]
+        if hours > self.max_hours[e_idx] + 1e-9:
+            return False
+
+        days = self._day_count[e_idx]
+        if days.get(day, 0) - (ignored_day == day) > 0:
+            return False
+
+        if self.min_rest_hours:
+            start, end = self.start[s_idx], self.end[s_idx]
+            intervals = self._intervals[e_idx]
+            i = bisect_left(intervals, (start - self.min_rest_hours - self.max_duration,))
+            while i < len(intervals):
+                other_start, other_end, other = intervals[i]
+                if other_start >= end + self.min_rest_hours:
+                    break
+                i += 1
+                if other == ignoring:
+                    continue
+                if max(start - other_end, other_start - end) < self.min_rest_hours:
+                    return False
+
+        if self.max_consecutive:
+            def worked(d):
+                return days.get(d, 0) - (ignored_day == d) > 0
+
+            run = 1
+            while run <= self.max_consecutive and worked(day - run):
+                run += 1
+            after = 1
+            while run + after - 1 <= self.max_consecutive and worked(day + after):
+                after += 1
+            if run + after - 1 > self.max_consecutive:
+                return False
+        return True
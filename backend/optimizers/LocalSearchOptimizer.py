@@ -0,0 +1,229 @@
+import random
+import time
+
+import perf
+from optimizers.RepairOptimizer import RepairOptimizer
+from models import ScheduleRequest, ScheduleResponse
+
+
+class LocalSearchOptimizer(RepairOptimizer):
+    """Anytime improvement of an existing schedule within a time budget.
+
+    Starts from `initial_assignments` (by default a greedy schedule), minus
+    any assignment that breaks a rule, and keeps applying random add / drop
+    / move / replace / swap moves that do not make the objective worse. The objective is labour cost, plus a
+    priority-weighted penalty per missing employee, plus `balance_weight`
+    times the sum of squared hours per employee. Every move is scored from
+    the employees and shifts it touches only, and must pass the same hours,
+    one-shift-per-day, rest and consecutive-day checks as a repair.
+    """
+
+    MOVES = ("add", "drop", "move", "replace", "swap")
+
+    def __init__(self, time_budget_ms=1000, seed=0, coverage_weight=None, balance_weight=0.05):
+        self.time_budget_ms = time_budget_ms
+        self.seed = seed
+        self.coverage_weight = coverage_weight
+        self.balance_weight = balance_weight
+
+    def optimize(self, request: ScheduleRequest, phase=4, progress=None, compiled=None,
+                 initial_assignments=None) -> ScheduleResponse:
+        report = progress or (lambda fraction, stage: None)
+        started = time.perf_counter()
+        self._init_state(request, compiled)
+        compiled = self.compiled
+
+        if initial_assignments is None:
+            report(0.05, "initial_schedule")
+            from optimizers.FallbackOptimizer import FallbackOptimizer
+            initial_assignments = FallbackOptimizer().greedy(request, compiled).assignments
+        setup = time.perf_counter()
+        perf.add_phase("local_search.initial", setup - started)
+
+        # Plain lists: scalar reads from numpy arrays are slow in the inner loop
+        self.cost = [float(c) for c in compiled.emp_cost]
+        self.hours = [float(h) for h in compiled.shift_hours]
+        self.minimum = [int(m) for m in compiled.shift_min]
+        self.maximum = [int(m) for m in compiled.shift_max]
+        coverage_weight = self.coverage_weight
+        if coverage_weight is None:
+            coverage_weight = 10 * max(max(self.cost, default=0) * max(self.hours, default=0), 1.0)
+        self.penalty = [coverage_weight * max(1, int(p)) for p in compiled.shift_priority]
+        self.total_hours = [0.0] * len(request.employees)
+
+        # Assigned (employee, shift) pairs, sampled uniformly. Initial
+        # assignments that break a rule are dropped so every move starts
+        # from, and keeps, a schedule that passes _can_take.
+        self.pairs = []
+        self.pair_pos = {}
+        for shift_id, employee_ids in initial_assignments.items():
+            s_idx = compiled.shift_index.get(shift_id)
+            if s_idx is None:
+                continue
+            for emp_id in employee_ids:
+                e_idx = compiled.employee_index.get(emp_id)
+                if e_idx is not None and self._can_take(e_idx, s_idx):
+                    self._add(e_idx, s_idx)
+        initial_objective = self._objective()
+        perf.add_phase("local_search.setup", time.perf_counter() - setup)
+
+        rng = random.Random(self.seed)
+        deadline = started + self.time_budget_ms / 1000
+        iterations = 0
+        accepted = dict.fromkeys(self.MOVES, 0)
+        moves = {move: getattr(self, f"_try_{move}") for move in self.MOVES}
+        report(0.1, "searching")
+        searching = time.perf_counter()
+        while True:
+            if iterations % 256 == 0:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                report(0.1 + 0.8 * (now - started) / (deadline - started), "searching")
+            iterations += 1
+            move = rng.choice(self.MOVES)
+            if moves[move](rng):
+                accepted[move] += 1
+
+        perf.add_phase("local_search.search", time.perf_counter() - searching)
+        self.candidate_evaluations += iterations
+        self._report_counters()
+
+        report(0.95, "building_response")
+        assignments = {
+            shift.id: [request.employees[e].id for e in sorted(self.assigned[s_idx])]
+            for s_idx, shift in enumerate(request.shifts)
+        }
+        response = self._build_comprehensive_response(request, assignments, phase, "local_search")
+        response.metrics.update({
+            "solver": "local_search",
+            "time_budget_ms": self.time_budget_ms,
+            "search_ms": round((time.perf_counter() - started) * 1000, 1),
+            "iterations": iterations,
+            "accepted_moves": accepted,
+            "initial_objective": round(initial_objective, 2),
+            "objective_value": round(self._objective(), 2),
+        })
+        return response
+
+    # State changes keep pairs, total hours and the RepairOptimizer indexes in step
+
+    def _add(self, e_idx, s_idx):
+        self._assign(e_idx, s_idx)
+        self.total_hours[e_idx] += self.hours[s_idx]
+        self.pair_pos[(e_idx, s_idx)] = len(self.pairs)
+        self.pairs.append((e_idx, s_idx))
+
+    def _remove(self, e_idx, s_idx):
+        self._unassign(e_idx, s_idx)
+        self.total_hours[e_idx] -= self.hours[s_idx]
+        pos = self.pair_pos.pop((e_idx, s_idx))
+        last = self.pairs.pop()
+        if pos < len(self.pairs):
+            self.pairs[pos] = last
+            self.pair_pos[last] = pos
+
+    def _objective(self):
+        cost = sum(self.cost[e] * self.hours[s] for e, s in self.pairs)
+        shortfall = sum(self.penalty[s] * max(0, self.minimum[s] - len(a)) for s, a in enumerate(self.assigned))
+        balance = self.balance_weight * sum(h * h for h in self.total_hours)
+        return cost + shortfall + balance
+
+    # Delta terms, each touching one employee or one shift
+
+    def _balance_delta(self, e_idx, hours):
+        h = self.total_hours[e_idx]
+        return self.balance_weight * ((h + hours) ** 2 - h * h)
+
+    def _coverage_delta(self, s_idx, change):
+        count = len(self.assigned[s_idx])
+        before = max(0, self.minimum[s_idx] - count)
+        after = max(0, self.minimum[s_idx] - count - change)
+        return self.penalty[s_idx] * (after - before)
+
+    # Moves: each returns True if it was applied
+
+    def _try_add(self, rng):
+        s_idx = rng.randrange(len(self.assigned)) if self.assigned else None
+        if s_idx is None or len(self.assigned[s_idx]) >= self.maximum[s_idx]:
+            return False
+        candidates = self.compiled.shift_candidates[s_idx]
+        if not len(candidates):
+            return False
+        e_idx = int(candidates[rng.randrange(len(candidates))])
+        hours = self.hours[s_idx]
+        delta = (self.cost[e_idx] * hours + self._balance_delta(e_idx, hours)
+                 + self._coverage_delta(s_idx, 1))
+        if delta >= 0 or not self._can_take(e_idx, s_idx):
+            return False
+        self._add(e_idx, s_idx)
+        return True
+
+    def _try_drop(self, rng):
+        if not self.pairs:
+            return False
+        e_idx, s_idx = self.pairs[rng.randrange(len(self.pairs))]
+        hours = self.hours[s_idx]
+        delta = (-self.cost[e_idx] * hours + self._balance_delta(e_idx, -hours)
+                 + self._coverage_delta(s_idx, -1))
+        if delta >= 0:
+            return False
+        self._remove(e_idx, s_idx)
+        return True
+
+    def _try_move(self, rng):
+        """Move an employee from one of their shifts to another shift"""
+        if not self.pairs:
+            return False
+        e_idx, s_idx = self.pairs[rng.randrange(len(self.pairs))]
+        candidates = self.compiled.employee_candidates[e_idx]
+        t_idx = int(candidates[rng.randrange(len(candidates))])
+        if t_idx == s_idx or len(self.assigned[t_idx]) >= self.maximum[t_idx]:
+            return False
+        hours_change = self.hours[t_idx] - self.hours[s_idx]
+        delta = (self.cost[e_idx] * hours_change + self._balance_delta(e_idx, hours_change)
+                 + self._coverage_delta(s_idx, -1) + self._coverage_delta(t_idx, 1))
+        if delta > 0 or not self._can_take(e_idx, t_idx, ignoring=s_idx):
+            return False
+        self._remove(e_idx, s_idx)
+        self._add(e_idx, t_idx)
+        return True
+
+    def _try_replace(self, rng):
+        """Give an employee's shift to someone not on it"""
+        if not self.pairs:
+            return False
+        a_idx, s_idx = self.pairs[rng.randrange(len(self.pairs))]
+        candidates = self.compiled.shift_candidates[s_idx]
+        b_idx = int(candidates[rng.randrange(len(candidates))])
+        if b_idx == a_idx:
+            return False
+        hours = self.hours[s_idx]
+        delta = ((self.cost[b_idx] - self.cost[a_idx]) * hours
+                 + self._balance_delta(a_idx, -hours) + self._balance_delta(b_idx, hours))
+        if delta > 0 or not self._can_take(b_idx, s_idx):
+            return False
+        self._remove(a_idx, s_idx)
+        self._add(b_idx, s_idx)
+        return True
+
+    def _try_swap(self, rng):
+        """Two employees exchange their shifts"""
+        if len(self.pairs) < 2:
+            return False
+        a_idx, s_idx = self.pairs[rng.randrange(len(self.pairs))]
+        b_idx, t_idx = self.pairs[rng.randrange(len(self.pairs))]
+        eligible = self.compiled.eligible
+        if (a_idx == b_idx or s_idx == t_idx or not eligible[a_idx, t_idx] or not eligible[b_idx, s_idx]
+                or a_idx in self.assigned[t_idx] or b_idx in self.assigned[s_idx]):
+            return False
+        hours_change = self.hours[t_idx] - self.hours[s_idx]
+        delta = ((self.cost[a_idx] - self.cost[b_idx]) * hours_change
+                 + self._balance_delta(a_idx, hours_change) + self._balance_delta(b_idx, -hours_change))
+        if delta > 0 or not self._can_take(a_idx, t_idx, ignoring=s_idx) or not self._can_take(b_idx, s_idx, ignoring=t_idx):
+            return False
+        self._remove(a_idx, s_idx)
+        self._remove(b_idx, t_idx)
+        self._add(a_idx, t_idx)
+        self._add(b_idx, s_idx)
+        return True
@@ -0,0 +1,291 @@
+import os
+import re
+import tempfile
+import time
+
+import numpy as np
+import pulp
+
+import perf
+from optimizers.BaseOptimizer import BaseOptimizer
+from optimizers.CompiledProblem import CompiledProblem
+from models import ScheduleRequest, ScheduleResponse
+
+
+class MilpOptimizer(BaseOptimizer):
+    """Exact integer program over the full rule set, solved with bundled CBC.
+
+    Minimum staffing is soft (a priority-weighted shortfall costs far more
+    than any labour cost); maximum staffing, qualifications, one shift per
+    day, weekly hours plus overtime, rest hours and consecutive-day limits
+    are hard. The search stops once the relative MIP gap drops below
+    `mip_gap` or `time_limit` seconds into the call. The warm-start solve
+    (at most half the budget) and any fallback solve count against the
+    limit too.
+    """
+
+    def __init__(self, time_limit=60, mip_gap=0.01, warm_start=True, coverage_weight=None):
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.warm_start = warm_start
+        self.coverage_weight = coverage_weight
+        self.problem = None
+
+    def optimize(self, request: ScheduleRequest, phase=4, progress=None, compiled=None,
+                 initial_assignments=None, fixed_assignments=None) -> ScheduleResponse:
+        """Solve to within the gap/time limit.
+
+        `initial_assignments` (shift id -> employee ids) seeds CBC; when it is
+        not given and warm starting is enabled, a GradualOptimizer solution
+        is used. Shifts in `fixed_assignments` keep exactly the given staff
+        (as far as they are eligible) and only constrain the other shifts
+        through the hours, rest and consecutive-day rules.
+        """
+        report = progress or (lambda fraction, stage: None)
+        started = time.perf_counter()
+        if compiled is None:
+            with perf.phase("milp.compile"):
+                compiled = CompiledProblem(request)
+        self.compiled = compiled
+
+        if initial_assignments is None and self.warm_start:
+            report(0.05, "warm_start")
+            from optimizers.GradualOptimizer import GradualOptimizer
+            with perf.phase("milp.warm_start"):
+                warm_limit = self._remaining(started) / 2 if self.time_limit else None
+                initial_assignments = GradualOptimizer(time_limit=warm_limit).optimize(
+                    request, phase=phase, compiled=self.compiled).assignments
+
+        report(0.2, "building_model")
+        with perf.phase("milp.build_model"):
+            self._build_model(request)
+            if fixed_assignments:
+                self._fix_assignments(fixed_assignments)
+            warm_started = bool(initial_assignments) and self._set_initial_values(initial_assignments)
+        perf.count("decision_variables", len(self.x))
+        perf.count("lp_constraints", len(self.problem.constraints))
+
+        report(0.4, "solving")
+        log_file = tempfile.NamedTemporaryFile(prefix="cbc_", suffix=".log", delete=False)
+        log_file.close()
+        try:
+            with perf.phase("milp.solve"):
+                self.problem.solve(pulp.PULP_CBC_CMD(
+                    msg=0,
+                    timeLimit=self._remaining(started),
+                    gapRel=self.mip_gap,
+                    warmStart=warm_started,
+                    logPath=log_file.name,
+                ))
+            with open(log_file.name) as f:
+                solver_log = f.read()
+        finally:
+            os.unlink(log_file.name)
+
+        report(0.9, "building_response")
+        with perf.phase("milp.response"):
+            return self._build_milp_response(request, phase, solver_log, warm_started, started)
+
+    def _remaining(self, started):
+        """Seconds left of time_limit (at least one, as CBC needs some), or None without a limit"""
+        if not self.time_limit:
+            return None
+        return max(1, self.time_limit - (time.perf_counter() - started))
+
+    def _build_model(self, request):
+        compiled = self.compiled
+        constraints = request.constraints or {}
+        rules = request.business_rules or {}
+        self.problem = pulp.LpProblem("milp_schedule", pulp.LpMinimize)
+
+        # Binary assignment variables for eligible pairs only
+        self.x = {}
+        self.employee_vars = [[] for _ in request.employees]
+        self.shift_vars = [[] for _ in request.shifts]
+        for e_idx, s_idx in zip(*np.nonzero(compiled.eligible)):
+            var = pulp.LpVariable(f"x_{e_idx}_{s_idx}", cat="Binary")
+            self.x[(e_idx, s_idx)] = var
+            self.employee_vars[e_idx].append((s_idx, var))
+            self.shift_vars[s_idx].append((e_idx, var))
+
+        # Coverage: hard max, soft min through a shortfall variable
+        self.shortfall = {}
+        for s_idx, shift in enumerate(request.shifts):
+            covered = [(var, 1) for _, var in self.shift_vars[s_idx]]
+            if shift.min_employees > 0:
+                short = pulp.LpVariable(f"short_{s_idx}", lowBound=0, upBound=shift.min_employees)
+                self.shortfall[s_idx] = short
+                self.problem += pulp.LpAffineExpression(covered + [(short, 1)]) >= shift.min_employees, f"min_staff_{s_idx}"
+            if covered:
+                self.problem += pulp.LpAffineExpression(covered) <= shift.max_employees, f"max_staff_{s_idx}"
+
+        # One shift per employee per day
+        for e_idx in range(len(request.employees)):
+            by_day = {}
+            for s_idx, var in self.employee_vars[e_idx]:
+                by_day.setdefault(compiled.shift_day[s_idx], []).append((var, 1))
+            for day, terms in by_day.items():
+                if len(terms) > 1:
+                    self.problem += pulp.LpAffineExpression(terms) <= 1, f"one_per_day_{e_idx}_{day}"
+
+        # Weekly hours, with up to max_overtime paid overtime hours per week
+        max_overtime = constraints.get("max_overtime", 10)
+        self.overtime = {}
+        for e_idx, employee in enumerate(request.employees):
+            by_week = {}
+            for s_idx, var in self.employee_vars[e_idx]:
+                by_week.setdefault(compiled.shift_week[s_idx], []).append((var, compiled.shift_hours[s_idx]))
+            for week, terms in by_week.items():
+                if sum(hours for _, hours in terms) <= employee.max_hours_per_week:
+                    continue
+                if max_overtime > 0:
+                    overtime = pulp.LpVariable(f"overtime_{e_idx}_{week}", lowBound=0, upBound=max_overtime)
+                    self.overtime[(e_idx, week)] = overtime
+                    terms = terms + [(overtime, -1)]
+                self.problem += pulp.LpAffineExpression(terms) <= employee.max_hours_per_week, f"week_hours_{e_idx}_{week}"
+
+        self._add_rest_constraints(request, constraints.get("min_rest_hours", 11))
+        self._add_consecutive_constraints(request, constraints.get("max_consecutive_shifts", 5))
+
+        # Objective: labour cost + overtime premium + priority-weighted shortfall
+        cost_weight = 1.0 if rules.get("minimize_costs", True) else 0.01
+        coverage_weight = self.coverage_weight
+        if coverage_weight is None:
+            max_shift_cost = float((compiled.emp_cost.max() if len(compiled.emp_cost) else 0) *
+                                   (compiled.shift_hours.max() if len(compiled.shift_hours) else 0))
+            coverage_weight = 10 * max(max_shift_cost, 1.0)
+        self.coverage_weight_used = coverage_weight
+
+        terms = []
+        for (e_idx, s_idx), var in self.x.items():
+            terms.append((var, cost_weight * compiled.emp_cost[e_idx] * compiled.shift_hours[s_idx]))
+        for (e_idx, _), var in self.overtime.items():
+            terms.append((var, cost_weight * 0.5 * compiled.emp_cost[e_idx]))
+        for s_idx, var in self.shortfall.items():
+            terms.append((var, coverage_weight * max(1, compiled.shift_priority[s_idx])))
+        self.problem += pulp.LpAffineExpression(terms)
+
+    def _add_rest_constraints(self, request, min_rest_hours):
+        """Forbid shift pairs on different days that leave less than min_rest_hours between them"""
+        compiled = self.compiled
+        if not min_rest_hours or not len(request.shifts):
+            return
+
+        conflicts = {}  # later shift -> {earlier day: [earlier shifts]}
+        for a, b in zip(*compiled.rest_pairs(min_rest_hours)):
+            conflicts.setdefault(b, {}).setdefault(compiled.shift_day[a], []).append(a)
+
+        for b, by_day in conflicts.items():
+            for e_idx, var_b in self.shift_vars[b]:
+                for day, earlier in by_day.items():
+                    terms = [(self.x[(e_idx, a)], 1) for a in earlier if (e_idx, a) in self.x]
+                    if terms:
+                        self.problem += pulp.LpAffineExpression(terms + [(var_b, 1)]) <= 1, f"rest_{e_idx}_{b}_{day}"
+
+    def _add_consecutive_constraints(self, request, max_consecutive):
+        """At most max_consecutive working days in any window of max_consecutive + 1 calendar days"""
+        compiled = self.compiled
+        if not max_consecutive or not len(compiled.dates):
+            return
+
+        for e_idx in range(len(request.employees)):
+            by_ordinal = {}
+            for s_idx, var in self.employee_vars[e_idx]:
+                by_ordinal.setdefault(compiled.day_ordinal[compiled.shift_day[s_idx]], []).append((var, 1))
+            if len(by_ordinal) <= max_consecutive:
+                continue
+            ordinals = sorted(by_ordinal)
+            for first in ordinals:
+                window = [o for o in range(first, first + max_consecutive + 1) if o in by_ordinal]
+                if len(window) > max_consecutive:
+                    terms = [t for o in window for t in by_ordinal[o]]
+                    self.problem += pulp.LpAffineExpression(terms) <= max_consecutive, f"consecutive_{e_idx}_{first}"
+
+    def _fix_assignments(self, fixed_assignments):
+        """Pin every variable of the given shifts to the given staff"""
+        compiled = self.compiled
+        for shift_id, employee_ids in fixed_assignments.items():
+            s_idx = compiled.shift_index.get(shift_id)
+            if s_idx is None:
+                continue
+            staff = {compiled.employee_index.get(emp_id) for emp_id in employee_ids}
+            for e_idx, var in self.shift_vars[s_idx]:
+                value = 1 if e_idx in staff else 0
+                var.lowBound = var.upBound = value
+
+    def _set_initial_values(self, initial_assignments):
+        """Seed CBC with a known schedule; returns False if nothing usable was given"""
+        compiled = self.compiled
+        chosen = set()
+        for shift_id, employee_ids in initial_assignments.items():
+            s_idx = compiled.shift_index.get(shift_id)
+            if s_idx is None:
+                continue
+            for emp_id in employee_ids:
+                e_idx = compiled.employee_index.get(emp_id)
+                if (e_idx, s_idx) in self.x:
+                    chosen.add((e_idx, s_idx))
+        if not chosen:
+            return False
+
+        for key, var in self.x.items():
+            var.setInitialValue(1 if key in chosen else 0)
+        for s_idx, short in self.shortfall.items():
+            covered = sum(1 for e_idx, _ in self.shift_vars[s_idx] if (e_idx, s_idx) in chosen)
+            short.setInitialValue(max(0, self.compiled.shift_min[s_idx] - covered))
+        return True
+
+    def _parse_gap(self, solver_log):
+        """Read objective, best bound and relative gap from the CBC log"""
+        def last_number(label):
+            matches = re.findall(rf"^{label}:\s+(-?[\d.eE+-]+)", solver_log, re.MULTILINE)
+            return float(matches[-1]) if matches else None
+
+        objective = last_number("Objective value")
+        bound = last_number("Lower bound")
+        gap = last_number("Gap")
+        if gap is None and objective is not None and bound is not None:
+            gap = abs(objective - bound) / max(abs(objective), 1e-9)
+        if gap is None and "Optimal solution found" in solver_log:
+            gap = 0.0
+        return objective, bound, gap
+
+    def _build_milp_response(self, request, phase, solver_log, warm_started, started):
+        status = self.problem.status
+        has_solution = self.problem.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+        if not has_solution:
+            from optimizers.FallbackOptimizer import FallbackOptimizer
+            perf.count("fallbacks")
+            response, _ = FallbackOptimizer().optimize_relaxed(
+                request, enforce_qualifications=True, compiled=self.compiled,
+                time_limit=self._remaining(started) or 120)
+            response.metrics["solver"] = "milp"
+            response.metrics["solver_status"] = pulp.LpStatus[status]
+            return response
+
+        assignments = {shift.id: [] for shift in request.shifts}
+        for (e_idx, s_idx), var in self.x.items():
+            if var.varValue is not None and var.varValue > 0.5:
+                assignments[request.shifts[s_idx].id].append(request.employees[e_idx].id)
+
+        is_optimal = self.problem.sol_status == pulp.LpSolutionOptimal
+        response = self._build_comprehensive_response(
+            request, assignments, phase, "optimal" if is_optimal else "feasible")
+
+        objective, bound, gap = self._parse_gap(solver_log)
+        response.metrics.update({
+            "solver": "milp",
+            "solver_status": pulp.LpStatus[status],
+            "is_optimal": is_optimal,
+            "is_partial": not is_optimal,
+            "objective_value": objective if objective is not None else pulp.value(self.problem.objective),
+            "best_bound": bound,
+            "optimality_gap": round(gap, 6) if gap is not None else None,
+            "mip_gap_target": self.mip_gap,
+            "time_limit_seconds": self.time_limit,
+            "solve_seconds": round(time.perf_counter() - started, 3),
+            "warm_started": warm_started,
+            "overtime_hours": round(sum(v.varValue or 0 for v in self.overtime.values()), 2),
+        })
+        response.risk_assessment["solution_type"] = "optimal" if is_optimal else "feasible"
+        return response
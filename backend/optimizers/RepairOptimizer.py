@@ -0,0 +1,134 @@
+import time
+
+import perf
+from optimizers.BaseOptimizer import BaseOptimizer
+from optimizers.CompiledProblem import CompiledProblem
+from optimizers.EmployeeTimeline import EmployeeTimeline
+from models import ScheduleRequest, ScheduleResponse
+
+
+class RepairOptimizer(BaseOptimizer):
+    """Repairs an existing schedule after a small roster change.
+
+    Only the affected shifts are touched: assignments that became invalid
+    are dropped, and understaffed affected shifts are refilled greedily
+    within the hours, rest and consecutive-day rules. If
+    nobody is free, one employee is moved off another shift in the same
+    ISO week, which then gets a free replacement. Every other assignment is
+    kept as it was.
+    """
+
+    def repair(self, request: ScheduleRequest, prior_assignments, affected_shift_ids,
+               compiled=None) -> ScheduleResponse:
+        started = time.perf_counter()
+        self._init_state(request, compiled)
+        compiled = self.compiled
+        affected = {compiled.shift_index[s] for s in affected_shift_ids if s in compiled.shift_index}
+
+        # Keep every prior assignment that is still valid
+        for shift_id, employee_ids in prior_assignments.items():
+            s_idx = compiled.shift_index.get(shift_id)
+            if s_idx is None:
+                continue
+            for emp_id in employee_ids:
+                e_idx = compiled.employee_index.get(emp_id)
+                if e_idx is None or not compiled.eligible[e_idx, s_idx]:
+                    affected.add(s_idx)
+                    continue
+                self._assign(e_idx, s_idx)
+
+        changed = 0
+        for s_idx in sorted(affected, key=lambda i: -compiled.shift_priority[i]):
+            # Trim overstaffed shifts, most expensive first
+            while len(self.assigned[s_idx]) > compiled.shift_max[s_idx]:
+                e_idx = max(self.assigned[s_idx], key=lambda e: compiled.emp_cost[e])
+                self._unassign(e_idx, s_idx)
+                changed += 1
+            while len(self.assigned[s_idx]) < compiled.shift_min[s_idx]:
+                moved = self._fill(s_idx)
+                if moved is None:
+                    break
+                changed += moved
+
+        assignments = {
+            shift.id: [request.employees[e].id for e in sorted(self.assigned[s_idx])]
+            for s_idx, shift in enumerate(request.shifts)
+        }
+        perf.add_phase("repair.repair", time.perf_counter() - started)
+        self._report_counters()
+        response = self._build_comprehensive_response(request, assignments, "repair", "repaired")
+        response.metrics.update({
+            "repaired_shifts": sorted(request.shifts[s].id for s in affected),
+            "changed_assignments": changed,
+            "repair_ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+        return response
+
+    def _init_state(self, request, compiled=None):
+        """Empty schedule state for `request`; assignments are added with _assign"""
+        self.compiled = compiled or CompiledProblem(request)
+        constraints = request.constraints or {}
+        self.timeline = EmployeeTimeline(
+            self.compiled, constraints.get("min_rest_hours", 11), constraints.get("max_consecutive_shifts", 5))
+        self.assigned = [set() for _ in request.shifts]  # shift -> employee idxs
+        self.candidate_evaluations = 0
+        self.constraint_checks = 0
+
+    def _report_counters(self):
+        perf.count("candidate_evaluations", self.candidate_evaluations)
+        perf.count("constraint_checks", self.constraint_checks)
+
+    def _assign(self, e_idx, s_idx):
+        self.assigned[s_idx].add(e_idx)
+        self.timeline.assign(e_idx, s_idx)
+
+    def _unassign(self, e_idx, s_idx):
+        self.assigned[s_idx].discard(e_idx)
+        self.timeline.unassign(e_idx, s_idx)
+
+    def _can_take(self, e_idx, s_idx, ignoring=None):
+        """Eligibility plus the timeline's hours, one-shift-per-day, rest and consecutive-day checks"""
+        self.constraint_checks += 1
+        if not self.compiled.eligible[e_idx, s_idx] or e_idx in self.assigned[s_idx]:
+            return False
+        return self.timeline.can_take(e_idx, s_idx, ignoring)
+
+    def _best_candidate(self, s_idx, exclude=()):
+        compiled = self.compiled
+        best = None
+        self.candidate_evaluations += len(compiled.shift_candidates[s_idx])
+        for e_idx in compiled.shift_candidates[s_idx]:
+            if e_idx in exclude or not self._can_take(e_idx, s_idx):
+                continue
+            key = (self.timeline.week_hours(e_idx, compiled.shift_week[s_idx]), compiled.emp_cost[e_idx])
+            if best is None or key < best[0]:
+                best = (key, e_idx)
+        return None if best is None else best[1]
+
+    def _fill(self, s_idx):
+        """Add one employee to s_idx; returns the number of changed assignments or None"""
+        e_idx = self._best_candidate(s_idx)
+        if e_idx is not None:
+            self._assign(e_idx, s_idx)
+            return 1
+
+        # Move an eligible employee off another shift in the same week and backfill that shift
+        compiled = self.compiled
+        week = compiled.shift_week[s_idx]
+        for e_idx in compiled.shift_candidates[s_idx]:
+            if e_idx in self.assigned[s_idx]:
+                continue
+            for other in sorted(self.timeline.shifts(e_idx)):
+                if compiled.shift_week[other] != week or not self._can_take(e_idx, s_idx, ignoring=other):
+                    continue
+                self._unassign(e_idx, other)
+                replacement = self._best_candidate(other, exclude={e_idx})
+                if replacement is None and len(self.assigned[other]) < compiled.shift_min[other]:
+                    self._assign(e_idx, other)
+                    continue
+                self._assign(e_idx, s_idx)
+                if replacement is not None:
+                    self._assign(replacement, other)
+                    return 3
+                return 2
+        return None
@@ -0,0 +1,178 @@
+import time
+from datetime import datetime
+
+import perf
+from optimizers.BaseOptimizer import BaseOptimizer
+from optimizers.EmployeeTimeline import EmployeeTimeline
+from optimizers.MilpOptimizer import MilpOptimizer
+from models import ScheduleRequest, ScheduleResponse
+
+
+class RollingHorizonOptimizer(BaseOptimizer):
+    """Solves a long planning period window by window.
+
+    Each window covers `window_days` dates and is solved with the
+    MilpOptimizer; its first `window_days - overlap_days` dates are committed
+    and the window slides on to the first uncommitted date, so the overlap
+    is solved again with more of the future in view. Committed shifts from
+    the previous `lookback_days` (at least enough to reach back to Monday,
+    and to cover max_consecutive_shifts) are put into the next window with
+    their staff fixed. The window then sees the hours already worked this
+    ISO week, the current consecutive-day run and the last shift end for
+    min_rest_hours. Each solve stays window-sized, so time grows linearly
+    with the number of days.
+
+    A window whose MILP finds no solution falls back to the relaxed /
+    best-effort schedule, which knows nothing of the fixed shifts; its
+    assignments are replayed against them and any that break the rest,
+    weekly-hour or consecutive-day rules are dropped.
+    """
+
+    def __init__(self, window_days=7, overlap_days=2, time_limit=20, mip_gap=0.01, warm_start=True):
+        if window_days < 1 or not 0 <= overlap_days < window_days:
+            raise ValueError("Need window_days >= 1 and 0 <= overlap_days < window_days")
+        self.window_days = window_days
+        self.overlap_days = overlap_days
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.warm_start = warm_start
+
+    def optimize(self, request: ScheduleRequest, phase=4, progress=None, compiled=None) -> ScheduleResponse:
+        for _ in self.iter_windows(request, phase, progress):
+            pass
+        return self.finish(request, phase)
+
+    def iter_windows(self, request: ScheduleRequest, phase=4, progress=None):
+        """Solve window by window, yielding every commit as it happens.
+
+        Each item is {"window", "dates", "assignments"} for the newly
+        committed dates only; call finish() afterwards for the full response.
+        """
+        report = progress or (lambda fraction, stage: None)
+        self.started = time.perf_counter()
+        constraints = request.constraints or {}
+        lookback_days = max(6, constraints.get("max_consecutive_shifts", 5) or 0)
+
+        by_date = {}
+        for shift in request.shifts:
+            by_date.setdefault(shift.date, []).append(shift)
+        dates = sorted(by_date)
+        ordinal = {d: datetime.strptime(d, "%Y-%m-%d").toordinal() for d in dates}
+
+        self.assignments = {}
+        self.window_metrics = []
+        tentative = {}  # overlap assignments from the previous window, used as a warm start
+        step = self.window_days - self.overlap_days
+        start = 0
+        while start < len(dates):
+            window_started = time.perf_counter()
+            window_dates = dates[start:start + self.window_days]
+            last = start + len(window_dates) >= len(dates)
+            committed_dates = window_dates if last else window_dates[:step]
+
+            first = ordinal[window_dates[0]]
+            context_dates = [d for d in dates[:start] if first - ordinal[d] <= lookback_days]
+            context = [s for d in context_dates for s in by_date[d]]
+            fixed = {s.id: self.assignments.get(s.id, []) for s in context}
+            window_shifts = [s for d in window_dates for s in by_date[d]]
+
+            sub_request = ScheduleRequest(
+                start_date=(context_dates or window_dates)[0],
+                end_date=window_dates[-1],
+                employees=request.employees,
+                shifts=context + window_shifts,
+                constraints=request.constraints,
+                business_rules=request.business_rules,
+                blackouts=request.blackouts,
+            )
+            initial = None
+            if start > 0:
+                initial = {**fixed, **tentative}
+            with perf.phase("rolling.window"):
+                milp = MilpOptimizer(time_limit=self.time_limit, mip_gap=self.mip_gap, warm_start=self.warm_start)
+                response = milp.optimize(sub_request, phase=phase, initial_assignments=initial,
+                                         fixed_assignments=fixed)
+            perf.count("windows")
+            dropped = 0
+            if response.metrics.get("solution_type") not in ("optimal", "feasible"):
+                dropped = self._drop_context_violations(sub_request, milp.compiled, fixed, response.assignments,
+                                                        window_shifts)
+                perf.count("rolling_dropped_assignments", dropped)
+
+            committed = {
+                s.id: list(response.assignments.get(s.id, []))
+                for d in committed_dates for s in by_date[d]
+            }
+            self.assignments.update(committed)
+            tentative = {
+                s.id: list(response.assignments.get(s.id, []))
+                for d in window_dates[len(committed_dates):] for s in by_date[d]
+            }
+            self.window_metrics.append({
+                "dates": [window_dates[0], window_dates[-1]],
+                "committed_days": len(committed_dates),
+                "shifts": len(window_shifts),
+                "context_shifts": len(context),
+                "solution_type": response.metrics.get("solution_type"),
+                "dropped_assignments": dropped,
+                "solve_seconds": round(time.perf_counter() - window_started, 3),
+            })
+
+            start += len(committed_dates)
+            report(0.05 + 0.9 * start / len(dates), "solving_windows")
+            yield {
+                "window": len(self.window_metrics),
+                "dates": committed_dates,
+                "assignments": committed,
+            }
+
+    def _drop_context_violations(self, request, compiled, fixed, assignments, window_shifts):
+        """Unassign window shifts the fixed context rules out; returns how many were dropped.
+
+        The fixed shifts go into an EmployeeTimeline first, then the window
+        assignments in start order; those it refuses are removed from
+        `assignments`. Weekly hours get max_overtime on top, as in the MILP.
+        """
+        constraints = request.constraints or {}
+        timeline = EmployeeTimeline(
+            compiled, constraints.get("min_rest_hours", 11), constraints.get("max_consecutive_shifts", 5),
+            max_overtime=constraints.get("max_overtime", 10))
+        for shift_id, employee_ids in fixed.items():
+            for emp_id in employee_ids:
+                timeline.assign(compiled.employee_index[emp_id], compiled.shift_index[shift_id])
+
+        pairs = [(compiled.shift_index[shift.id], compiled.employee_index[emp_id])
+                 for shift in window_shifts for emp_id in assignments.get(shift.id, [])]
+        pairs.sort(key=lambda pair: compiled.shift_start[pair[0]])
+        dropped = 0
+        for s_idx, e_idx in pairs:
+            if timeline.can_take(e_idx, s_idx):
+                timeline.assign(e_idx, s_idx)
+                continue
+            shift_id = request.shifts[s_idx].id
+            assignments[shift_id] = [e for e in assignments[shift_id] if e != request.employees[e_idx].id]
+            dropped += 1
+        return dropped
+
+    def finish(self, request: ScheduleRequest, phase=4) -> ScheduleResponse:
+        """Full response over every committed window"""
+        assignments = {shift.id: self.assignments.get(shift.id, []) for shift in request.shifts}
+        solution_types = {m["solution_type"] for m in self.window_metrics}
+        if solution_types <= {"optimal"}:
+            solution_type = "optimal"
+        elif solution_types & {"relaxed", "best_effort"}:
+            solution_type = "relaxed"
+        else:
+            solution_type = "feasible"
+        response = self._build_comprehensive_response(request, assignments, phase, solution_type)
+        response.metrics.update({
+            "solver": "rolling",
+            "is_optimal": False,
+            "is_partial": solution_type != "optimal",
+            "window_days": self.window_days,
+            "overlap_days": self.overlap_days,
+            "window_count": len(self.window_metrics),
+            "windows": self.window_metrics,
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+        })
+        return response
@@ -0,0 +1,248 @@
+import contextvars
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Phase timings, counters and profiles for the solve running in this thread
+# or task. Optimizers report through the module functions below, which are
+# no-ops when nothing is recording.
+_current = contextvars.ContextVar("perf_recorder", default=None)
+
+# Functions listed in a cProfile capture, by cumulative time
+PROFILE_TOP = 30
+
+# Upper bounds (seconds) of the solve duration histogram on /api/metrics
+SOLVE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class ProfilerUnavailable(RuntimeError):
+    """Raised for an unknown profiler, or pyinstrument without it installed"""
+
+
+def profiler_available(name):
+    if name == "cprofile":
+        return True
+    if name == "pyinstrument":
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    return False
+
+
+class PerfRecorder:
+    """Accumulated wall time per named phase and event counters for one solve.
+
+    Phase names are dotted by optimizer ("gradual.solve", "fallback.best_effort");
+    a phase entered several times, e.g. once per sub-problem, adds up.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}    # name -> [seconds, calls]
+        self.counters = {}  # name -> count
+        self.profile = None
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    def add_phase(self, name, seconds, calls=1):
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, perf):
+        """Add the phases and counters of another solve's to_dict() output"""
+        for name, entry in (perf or {}).get("phases", {}).items():
+            self.add_phase(name, entry["ms"] / 1000, entry["calls"])
+        for name, n in (perf or {}).get("counters", {}).items():
+            self.count(name, n)
+
+    def to_dict(self):
+        perf = {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "phases": {
+                name: {"ms": round(seconds * 1000, 2), "calls": calls}
+                for name, (seconds, calls) in self.phases.items()
+            },
+            "counters": dict(self.counters),
+        }
+        if self.profile is not None:
+            perf["profile"] = self.profile
+        return perf
+
+
+@contextmanager
+def recording(profiler=None):
+    """Record phases and counters of everything run inside the block.
+
+    With `profiler` set to "cprofile" or "pyinstrument" the block is also
+    profiled and the report is kept on the recorder.
+    """
+    if profiler is not None and not profiler_available(profiler):
+        raise ProfilerUnavailable(f"Profiler {profiler!r} is not available on this server")
+    recorder = PerfRecorder()
+    token = _current.set(recorder)
+    try:
+        if profiler == "cprofile":
+            with _cprofile(recorder):
+                yield recorder
+        elif profiler == "pyinstrument":
+            with _pyinstrument(recorder):
+                yield recorder
+        else:
+            yield recorder
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def _cprofile(recorder):
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        top = []
+        for (filename, line, function), (_, calls, self_time, cumulative, _) in stats.stats.items():
+            top.append({
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "self_ms": round(self_time * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            })
+        top.sort(key=lambda row: -row["cumulative_ms"])
+        recorder.profile = {"profiler": "cprofile", "total_calls": stats.total_calls, "top": top[:PROFILE_TOP]}
+
+
+@contextmanager
+def _pyinstrument(recorder):
+    from pyinstrument import Profiler
+
+    profiler = Profiler()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        recorder.profile = {"profiler": "pyinstrument", "text": profiler.output_text(unicode=False, color=False)}
+
+
+def phase(name):
+    """Time a block as `name` on the active recorder, if any"""
+    recorder = _current.get()
+    return nullcontext() if recorder is None else recorder.phase(name)
+
+
+def add_phase(name, seconds):
+    """Record `seconds` spent in `name` on the active recorder, if any"""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.add_phase(name, seconds)
+
+
+def count(name, n=1):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.count(name, n)
+
+
+def merge(perf):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.merge(perf)
+
+
+class PerfMetrics:
+    """Process-wide aggregates of solve perf data, rendered for Prometheus.
+
+    Fed with the metrics["perf"] dict of every finished solve; solves run in
+    worker processes, so aggregation happens here in the API process.
+    """
+
+    def __init__(self, buckets=SOLVE_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._solves = {}         # optimizer -> [count, seconds, bucket counts]
+        self._phases = {}         # phase -> [seconds, calls]
+        self._counters = {}       # counter -> count
+        self._profiles = {}       # profiler -> count
+
+    def observe(self, perf):
+        if not perf:
+            return
+        optimizer = perf.get("optimizer", "unknown")
+        seconds = perf.get("total_ms", 0) / 1000
+        with self._lock:
+            solves = self._solves.setdefault(optimizer, [0, 0.0, [0] * len(self.buckets)])
+            solves[0] += 1
+            solves[1] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    solves[2][i] += 1
+            for name, entry in perf.get("phases", {}).items():
+                totals = self._phases.setdefault(name, [0.0, 0])
+                totals[0] += entry["ms"] / 1000
+                totals[1] += entry["calls"]
+            for name, n in perf.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + n
+            if "profile" in perf:
+                profiler = perf["profile"].get("profiler", "unknown")
+                self._profiles[profiler] = self._profiles.get(profiler, 0) + 1
+
+    def render(self, extra=None):
+        """Prometheus text exposition; `extra` adds name -> (type, help, value) samples"""
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            header("scheduler_solve_seconds", "histogram", "Wall time of optimizer solves")
+            for optimizer, (n, seconds, buckets) in sorted(self._solves.items()):
+                label = f'optimizer="{_escape(optimizer)}"'
+                for bound, bucket in zip(self.buckets, buckets):
+                    lines.append(f'scheduler_solve_seconds_bucket{{{label},le="{bound}"}} {bucket}')
+                lines.append(f'scheduler_solve_seconds_bucket{{{label},le="+Inf"}} {n}')
+                lines.append(f"scheduler_solve_seconds_sum{{{label}}} {seconds:.6f}")
+                lines.append(f"scheduler_solve_seconds_count{{{label}}} {n}")
+
+            header("scheduler_phase_seconds_total", "counter", "Time spent per optimizer phase")
+            for name, (seconds, _) in sorted(self._phases.items()):
+                lines.append(f'scheduler_phase_seconds_total{{phase="{_escape(name)}"}} {seconds:.6f}')
+            header("scheduler_phase_calls_total", "counter", "Times each optimizer phase ran")
+            for name, (_, calls) in sorted(self._phases.items()):
+                lines.append(f'scheduler_phase_calls_total{{phase="{_escape(name)}"}} {calls}')
+
+            header("scheduler_optimizer_events_total", "counter",
+                   "Candidate evaluations, constraint checks, fallbacks and other optimizer events")
+            for name, n in sorted(self._counters.items()):
+                lines.append(f'scheduler_optimizer_events_total{{event="{_escape(name)}"}} {n}')
+
+            header("scheduler_profiled_solves_total", "counter", "Solves run with a profiler attached")
+            for profiler, n in sorted(self._profiles.items()):
+                lines.append(f'scheduler_profiled_solves_total{{profiler="{_escape(profiler)}"}} {n}')
+
+        for name, (kind, text, value) in (extra or {}).items():
+            header(name, kind, text)
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,118 @@
+import dataclasses
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+from cache import problem_key
+from jobs import solve_schedule
+from models import ScheduleRequest
+from optimizers.CompiledProblem import CompiledProblem
+
+# Constraints that change CompiledProblem.eligible; scenarios that leave them
+# alone reuse the compiled base problem as is
+ELIGIBILITY_CONSTRAINTS = ("require_qualifications", "enforce_department_matching")
+
+# Base problems a worker keeps loaded, least recently used dropped first
+MAX_CACHED_BASES = 2
+
+# problem key -> (base request, compiled base), per worker process
+_bases = OrderedDict()
+_bases_lock = threading.Lock()
+
+
+def _eligibility(constraints):
+    return tuple((constraints or {}).get(name, True) for name in ELIGIBILITY_CONSTRAINTS)
+
+
+def scenario_request(base_request: ScheduleRequest, constraints, business_rules) -> ScheduleRequest:
+    """The base problem under different constraints / business rules, sharing its employees and shifts"""
+    return dataclasses.replace(base_request, constraints=constraints, business_rules=business_rules)
+
+
+def _delta(base_items, items):
+    """None if `items` is `base_items`, else each item as its index in base_items or itself if new"""
+    if items is base_items:
+        return None
+    index = {id(item): i for i, item in enumerate(base_items)}
+    return [index.get(id(item), item) for item in items]
+
+
+def scenario_overrides(base_request: ScheduleRequest, request: ScheduleRequest):
+    """What a scenario request changes in the base, small enough to send with every task
+
+    Employees and shifts the scenario shares with the base go as their
+    index in the base lists; only added or changed ones are sent whole.
+    """
+    return {
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "employees": _delta(base_request.employees, request.employees),
+        "shifts": _delta(base_request.shifts, request.shifts),
+        "constraints": request.constraints,
+        "business_rules": request.business_rules,
+        "blackouts": None if request.blackouts is base_request.blackouts else request.blackouts,
+    }
+
+
+def _apply(base_items, delta):
+    if delta is None:
+        return base_items
+    return [base_items[item] if isinstance(item, int) else item for item in delta]
+
+
+def share_base(base_request: ScheduleRequest, compiled: CompiledProblem):
+    """Write the base problem once for the workers; returns the reference each task carries
+
+    Workers read the file the first time they see its problem key and
+    keep the base cached, so it is pickled once per call, not per
+    scenario. Pass the reference to release_base() when done.
+    """
+    fd, path = tempfile.mkstemp(prefix="scenario_base_", suffix=".pickle")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((base_request, compiled), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return problem_key(base_request), path
+
+
+def release_base(base_ref):
+    os.unlink(base_ref[1])
+
+
+def _load_base(base_ref):
+    key, path = base_ref
+    with _bases_lock:
+        base = _bases.get(key)
+        if base is not None:
+            _bases.move_to_end(key)
+            return base
+    with open(path, "rb") as f:
+        base = pickle.load(f)
+    with _bases_lock:
+        _bases[key] = base
+        while len(_bases) > MAX_CACHED_BASES:
+            _bases.popitem(last=False)
+    return base
+
+
+def solve_scenario(base_ref, overrides, optimizer, phase, options):
+    """Worker entry point: solve one scenario as its overrides applied to the shared base"""
+    base_request, compiled = _load_base(base_ref)
+    request = dataclasses.replace(
+        base_request,
+        start_date=overrides["start_date"],
+        end_date=overrides["end_date"],
+        employees=_apply(base_request.employees, overrides["employees"]),
+        shifts=_apply(base_request.shifts, overrides["shifts"]),
+        constraints=overrides["constraints"],
+        business_rules=overrides["business_rules"],
+        blackouts=base_request.blackouts if overrides["blackouts"] is None else overrides["blackouts"],
+    )
+    reuse = (overrides["employees"] is None and overrides["shifts"] is None
+             and overrides["blackouts"] is None
+             and _eligibility(request.constraints) == _eligibility(base_request.constraints))
+    return solve_schedule(request, phase, None, optimizer, options, compiled=compiled if reuse else None)
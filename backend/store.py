@@ -0,0 +1,256 @@
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from cache import problem_key
+from models import ScheduleRequest, ScheduleResponse
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS problems (key TEXT PRIMARY KEY, request BLOB, employees INTEGER, "
+    "shifts INTEGER, created_at REAL)",
+    "CREATE TABLE IF NOT EXISTS schedules (id TEXT, version INTEGER, problem_key TEXT, response BLOB, "
+    "total_cost REAL, coverage_score REAL, created_at REAL, PRIMARY KEY (id, version))",
+    "CREATE TABLE IF NOT EXISTS assignments (schedule_id TEXT, version INTEGER, shift_id TEXT, "
+    "employee_id TEXT, date TEXT, PRIMARY KEY (schedule_id, version, shift_id, employee_id))",
+    "CREATE INDEX IF NOT EXISTS assignments_by_employee ON assignments (schedule_id, version, employee_id, date)",
+    "CREATE INDEX IF NOT EXISTS assignments_by_shift ON assignments (schedule_id, version, shift_id, date)",
+)
+
+
+@dataclass
+class StoredSchedule:
+    id: str
+    version: int
+    request: ScheduleRequest
+    response: ScheduleResponse
+    created_at: float
+    # views.ScheduleIndex over this version, built on first read
+    index: Any = field(default=None, repr=False, compare=False)
+
+
+def assignment_delta(previous, current):
+    """Employees added to / removed from each shift between two assignment maps"""
+    added, removed = {}, {}
+    for shift_id in previous.keys() | current.keys():
+        before, after = set(previous.get(shift_id, ())), set(current.get(shift_id, ()))
+        if after - before:
+            added[shift_id] = sorted(after - before)
+        if before - after:
+            removed[shift_id] = sorted(before - after)
+    return {"added": added, "removed": removed}
+
+
+class ScheduleStore:
+    """Keeps solved schedules, and every patched version of them, by id.
+
+    Memory holds the versions of up to `max_schedules` ids, least recently
+    used evicted first. With `path` set every version is also written to
+    SQLite: the problem once per distinct request (by problem_key), the
+    response, and one row per assignment indexed by (employee, date) and
+    (shift, date). Stored schedules then survive restarts, evicted ones
+    are read back on demand, and diffs between versions read only the
+    assignment rows they need.
+
+    Several processes may share one database: versions are numbered
+    inside the write transaction, so two processes saving the same id
+    get consecutive versions, and the latest version is always read
+    from the database.
+    """
+
+    def __init__(self, max_schedules=200, path=None):
+        self.max_schedules = max_schedules
+        self.path = path
+        self._schedules = OrderedDict()  # id -> {version: StoredSchedule}
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            # Autocommit mode; _write runs its own BEGIN IMMEDIATE transaction
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+
+    def save(self, request: ScheduleRequest, response: ScheduleResponse, schedule_id=None) -> StoredSchedule:
+        """Store a new schedule, or a new version of `schedule_id`"""
+        with self._lock:
+            if schedule_id is None:
+                schedule_id = uuid.uuid4().hex
+            stored = StoredSchedule(
+                id=schedule_id,
+                version=0,
+                request=request,
+                response=response,
+                created_at=time.time(),
+            )
+            if self._db is not None:
+                self._write(stored)
+            else:
+                self._stamp(stored, self._latest_version(schedule_id) + 1)
+            self._remember(stored)
+        return stored
+
+    def get(self, schedule_id, version=None) -> Optional[StoredSchedule]:
+        """Latest version by default"""
+        with self._lock:
+            if version is None:
+                version = self._latest_version(schedule_id)
+            versions = self._schedules.get(schedule_id)
+            stored = versions.get(version) if versions else None
+            if stored is None and self._db is not None and version >= 1:
+                stored = self._read(schedule_id, version)
+                if stored is not None:
+                    self._remember(stored)
+            if stored is not None:
+                self._schedules.move_to_end(schedule_id)
+            return stored
+
+    def versions(self, schedule_id):
+        """Version, cost, coverage and time of every version of a schedule, oldest first"""
+        with self._lock:
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT version, total_cost, coverage_score, created_at FROM schedules "
+                    "WHERE id = ? ORDER BY version", (schedule_id,)).fetchall()
+            else:
+                rows = [(s.version, s.response.total_cost, s.response.coverage_score, s.created_at)
+                        for _, s in sorted(self._schedules.get(schedule_id, {}).items())]
+        return [{"version": v, "total_cost": cost, "coverage_score": coverage, "created_at": created}
+                for v, cost, coverage, created in rows]
+
+    def diff(self, schedule_id, from_version, to_version=None, employee_id=None, start_date=None, end_date=None):
+        """Assignment changes and cost / coverage movement between two versions, or None.
+
+        Can be narrowed to one employee and/or a date range. Versions that
+        are not in memory are never unpickled: their totals come from the
+        schedules table and only the matching assignment rows are read.
+        """
+        with self._lock:
+            if to_version is None:
+                to_version = self._latest_version(schedule_id)
+            summaries, rows = [], []
+            for version in (from_version, to_version):
+                summary = self._summary(schedule_id, version)
+                if summary is None:
+                    return None
+                summaries.append(summary)
+                rows.append(self._assignment_rows(schedule_id, version, employee_id, start_date, end_date))
+        (_, cost_before, coverage_before), (_, cost_after, coverage_after) = summaries
+
+        added, removed = {}, {}
+        for shift_id, emp_id, _ in sorted(rows[1] - rows[0]):
+            added.setdefault(shift_id, []).append(emp_id)
+        for shift_id, emp_id, _ in sorted(rows[0] - rows[1]):
+            removed.setdefault(shift_id, []).append(emp_id)
+
+        return {
+            "schedule_id": schedule_id,
+            "from_version": from_version,
+            "to_version": to_version,
+            "added": added,
+            "removed": removed,
+            "changed_shifts": len(added.keys() | removed.keys()),
+            "added_count": sum(len(e) for e in added.values()),
+            "removed_count": sum(len(e) for e in removed.values()),
+            "total_cost": {"from": cost_before, "to": cost_after, "delta": round(cost_after - cost_before, 2)},
+            "coverage_score": {"from": coverage_before, "to": coverage_after,
+                               "delta": round(coverage_after - coverage_before, 2)},
+        }
+
+    def _in_memory(self, schedule_id, version):
+        return self._schedules.get(schedule_id, {}).get(version)
+
+    def _summary(self, schedule_id, version):
+        """(version, total_cost, coverage_score) without loading the schedule"""
+        stored = self._in_memory(schedule_id, version)
+        if stored is not None:
+            return stored.version, stored.response.total_cost, stored.response.coverage_score
+        if self._db is None:
+            return None
+        return self._db.execute("SELECT version, total_cost, coverage_score FROM schedules WHERE id = ? AND version = ?",
+                                (schedule_id, version)).fetchone()
+
+    def _assignment_rows(self, schedule_id, version, employee_id=None, start_date=None, end_date=None):
+        """{(shift id, employee id, date)} of a version, optionally narrowed"""
+        stored = self._in_memory(schedule_id, version)
+        if stored is None:
+            query = "SELECT shift_id, employee_id, date FROM assignments WHERE schedule_id = ? AND version = ?"
+            params = [schedule_id, version]
+            for clause, value in (("employee_id = ?", employee_id), ("date >= ?", start_date),
+                                  ("date <= ?", end_date)):
+                if value is not None:
+                    query += f" AND {clause}"
+                    params.append(value)
+            return set(self._db.execute(query, params).fetchall())
+
+        rows = set()
+        assignments = stored.response.assignments
+        for shift in stored.request.shifts:
+            if (start_date is not None and shift.date < start_date) or (end_date is not None and shift.date > end_date):
+                continue
+            for emp_id in assignments.get(shift.id, ()):
+                if employee_id is None or emp_id == employee_id:
+                    rows.add((shift.id, emp_id, shift.date))
+        return rows
+
+    def _latest_version(self, schedule_id):
+        if self._db is not None:
+            # Another process may have saved a newer version
+            return self._db.execute("SELECT COALESCE(MAX(version), 0) FROM schedules WHERE id = ?",
+                                    (schedule_id,)).fetchone()[0]
+        return max(self._schedules.get(schedule_id, ()), default=0)
+
+    @staticmethod
+    def _stamp(stored, version):
+        stored.version = version
+        stored.response.metrics["schedule_id"] = stored.id
+        stored.response.metrics["schedule_version"] = version
+
+    def _remember(self, stored):
+        self._schedules.setdefault(stored.id, {})[stored.version] = stored
+        self._schedules.move_to_end(stored.id)
+        while len(self._schedules) > self.max_schedules:
+            self._schedules.popitem(last=False)
+
+    def _write(self, stored):
+        """Number the new version and write it in one transaction"""
+        request, response = stored.request, stored.response
+        key = problem_key(request)
+        pickled_request = pickle.dumps(request, protocol=pickle.HIGHEST_PROTOCOL)
+        dates = {shift.id: shift.date for shift in request.shifts}
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            version = db.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM schedules WHERE id = ?",
+                                 (stored.id,)).fetchone()[0]
+            self._stamp(stored, version)
+            db.execute(
+                "INSERT OR IGNORE INTO problems (key, request, employees, shifts, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, pickled_request, len(request.employees), len(request.shifts), stored.created_at))
+            db.execute(
+                "INSERT INTO schedules (id, version, problem_key, response, total_cost, coverage_score, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (stored.id, version, key, pickle.dumps(response, protocol=pickle.HIGHEST_PROTOCOL),
+                 response.total_cost, response.coverage_score, stored.created_at))
+            db.executemany(
+                "INSERT INTO assignments (schedule_id, version, shift_id, employee_id, date) VALUES (?, ?, ?, ?, ?)",
+                [(stored.id, version, shift_id, emp_id, dates.get(shift_id))
+                 for shift_id, employee_ids in response.assignments.items() for emp_id in dict.fromkeys(employee_ids)])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _read(self, schedule_id, version):
+        row = self._db.execute(
+            "SELECT s.response, s.created_at, p.request FROM schedules s JOIN problems p ON p.key = s.problem_key "
+            "WHERE s.id = ? AND s.version = ?", (schedule_id, version)).fetchone()
+        if row is None:
+            return None
+        response, created_at, request = row
+        return StoredSchedule(id=schedule_id, version=version, request=pickle.loads(request),
+                              response=pickle.loads(response), created_at=created_at)
@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other top-level (from models import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Department, Employee, ScheduleRequest, Shift, ShiftType, SkillLevel
+
+
+def make_employee(emp_id, department=Department.SUPPORT, skill_level=SkillLevel.MID, **kwargs):
+    return Employee(id=emp_id, name=emp_id, department=department, skill_level=skill_level,
+                    skills=kwargs.pop("skills", {"analytics"}), **kwargs)
+
+
+def make_shift(shift_id, date, shift_type=ShiftType.STANDARD_SHIFT, department=Department.SUPPORT, **kwargs):
+    return Shift(id=shift_id, date=date, shift_type=shift_type, department=department,
+                 required_skill_level=kwargs.pop("required_skill_level", SkillLevel.JUNIOR),
+                 required_skills=kwargs.pop("required_skills", {"analytics"}),
+                 min_employees=kwargs.pop("min_employees", 1), max_employees=kwargs.pop("max_employees", 2),
+                 **kwargs)
+
+
+@pytest.fixture
+def small_request():
+    """Three employees, four shifts over two days"""
+    return ScheduleRequest(
+        start_date="2025-11-03",
+        end_date="2025-11-04",
+        employees=[make_employee("e1"), make_employee("e2"), make_employee("e3", cost_per_hour=40.0)],
+        shifts=[
+            make_shift("s1", "2025-11-03", ShiftType.MORNING_SHIFT),
+            make_shift("s2", "2025-11-03", ShiftType.AFTERNOON_SHIFT),
+            make_shift("s3", "2025-11-04", ShiftType.MORNING_SHIFT),
+            make_shift("s4", "2025-11-04", ShiftType.NIGHT_SHIFT, min_employees=2),
+        ],
+        constraints={"min_rest_hours": 11, "max_consecutive_shifts": 5},
+        business_rules={},
+    )
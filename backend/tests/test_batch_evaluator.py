@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from conftest import make_employee, make_shift
+from models import ScheduleRequest, ShiftType
+from optimizers.BaseOptimizer import BaseOptimizer
+from optimizers.BatchEvaluator import BatchEvaluator
+from optimizers.CompiledProblem import CompiledProblem
+
+
+@pytest.fixture
+def week_request():
+    """Six employees, three shifts a day for a week, one day high-priority"""
+    types = [ShiftType.MORNING_SHIFT, ShiftType.AFTERNOON_SHIFT, ShiftType.NIGHT_SHIFT]
+    shifts = [make_shift(f"s{day}_{n}", f"2025-11-{day:02d}", shift_type, min_employees=2, max_employees=3,
+                         priority=9 if day == 5 else 1)
+              for day in range(3, 10) for n, shift_type in enumerate(types)]
+    employees = [make_employee(f"e{i}", cost_per_hour=20.0 + i, max_hours_per_week=24 + 4 * i) for i in range(6)]
+    return ScheduleRequest(start_date="2025-11-03", end_date="2025-11-09", employees=employees, shifts=shifts,
+                           constraints={"min_rest_hours": 11, "max_consecutive_shifts": 5}, business_rules={})
+
+
+def _random_schedules(request, count, seed=7):
+    rng = random.Random(seed)
+    ids = [e.id for e in request.employees]
+    return [{s.id: rng.sample(ids, rng.randint(0, 3)) for s in request.shifts} for _ in range(count)]
+
+
+def test_scores_match_the_comprehensive_response(week_request):
+    candidates = _random_schedules(week_request, 20) + [{}]
+    scored = BatchEvaluator(CompiledProblem(week_request)).evaluate(candidates)
+    for assignments, result in zip(candidates, scored):
+        response = BaseOptimizer()._build_comprehensive_response(week_request, assignments, 1, "evaluated")
+        assert result["total_cost"] == pytest.approx(response.total_cost, abs=0.01)
+        assert result["coverage_score"] == pytest.approx(response.coverage_score, abs=0.05)
+        assert result["understaffed_shifts_count"] == response.metrics["understaffed_shifts_count"]
+        risk = result["risk_assessment"]
+        assert risk["risk_score"] == response.risk_assessment["risk_score"]
+        assert risk["risk_breakdown"] == response.risk_assessment["risk_breakdown"]
+        assert sorted(risk["high_traffic_risks"]) == sorted(response.risk_assessment["high_traffic_risks"])
+        assert ([s["shift_id"] for s in risk["understaffed_shifts"]]
+                == [s["shift_id"] for s in response.risk_assessment["understaffed_shifts"]])
+
+
+def test_chunking_does_not_change_scores(week_request, monkeypatch):
+    candidates = _random_schedules(week_request, 9)
+    whole = BatchEvaluator(CompiledProblem(week_request)).evaluate(candidates, details=False)
+    monkeypatch.setattr(BatchEvaluator, "MAX_CELLS", 1)
+    assert BatchEvaluator(CompiledProblem(week_request)).evaluate(candidates, details=False) == whole
+
+
+def test_rule_violations_are_counted(week_request):
+    # e0 works the afternoon and night of the 3rd, then the morning of the 4th:
+    # two shifts on one day, each less than 11 hours before the morning
+    assignments = {"s3_2": ["e0"], "s4_0": ["e0"], "s3_1": ["e0"], "s5_0": ["e1", "e2", "e3", "e4"],
+                   "s6_0": ["nobody"]}
+    violations = BatchEvaluator(CompiledProblem(week_request)).evaluate([assignments])[0]["violations"]
+    assert violations["rest_violations"] == 2
+    assert violations["overlap_violations"] == 1
+    assert violations["overstaffed_shifts"] == 1
+    assert violations["unknown_assignments"] == 1
@@ -0,0 +1,27 @@
+import io
+import json
+
+import pytest
+
+from datasets import DatasetError, parse_shifts
+
+
+def _ndjson(*rows):
+    return io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+
+def _shift(**values):
+    return {"id": "s1", "date": "2025-11-03", "shift_type": "day", "department": "support", "required_skill_level": "junior",
+            "min_employees": 1, "max_employees": 2, **values}
+
+
+def test_integral_floats_are_integers():
+    shifts = parse_shifts(_ndjson(_shift(min_employees=2.0, max_employees=3)), "ndjson")
+    assert shifts[0].min_employees == 2 and isinstance(shifts[0].min_employees, int)
+
+
+@pytest.mark.parametrize("value", [2.5, True, "2.5"])
+def test_non_integers_are_rejected(value):
+    with pytest.raises(DatasetError) as info:
+        parse_shifts(_ndjson(_shift(max_employees=value)), "ndjson")
+    assert "max_employees" in info.value.errors[0] and "must be an integer" in info.value.errors[0]
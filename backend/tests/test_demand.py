@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from demand import DemandModel, agents_for, erlang_c_agents
+
+
+def _erlang_c_reference(load, handle_seconds, service_level, answer_seconds, max_occupancy, max_agents):
+    """Textbook one-load-at-a-time search with the closed-form Erlang C"""
+    if load <= 0:
+        return 0
+    for n in range(1, max_agents + 1):
+        if n <= load or load / n > max_occupancy:
+            continue
+        top = load ** n / math.factorial(n) * n / (n - load)
+        waiting = top / (sum(load ** k / math.factorial(k) for k in range(n)) + top)
+        if 1 - waiting * math.exp(-(n - load) * answer_seconds / handle_seconds) >= service_level:
+            return n
+    return max_agents
+
+
+@pytest.mark.parametrize("service_level, answer_seconds, max_occupancy", [
+    (0.8, 20, 0.85), (0.9, 10, 1.0), (0.5, 60, 0.7),
+])
+def test_matches_the_closed_form(service_level, answer_seconds, max_occupancy):
+    loads = np.array([0.0, 0.3, 1.0, 2.5, 7.9, 10.0, 24.0, 41.7, 80.0])
+    agents = erlang_c_agents(loads, 180, service_level, answer_seconds, max_occupancy, 150)
+    expected = [_erlang_c_reference(load, 180, service_level, answer_seconds, max_occupancy, 150)
+                for load in loads]
+    assert agents.tolist() == expected
+
+
+def test_known_staffing_level():
+    # 10 erlangs of 3-minute calls, 80% answered in 20 seconds: 14 agents
+    assert erlang_c_agents([10.0], 180, 0.8, 20, 1.0, 100).tolist() == [14]
+
+
+def test_loads_past_max_agents_get_max_agents():
+    agents = erlang_c_agents([5.0, 500.0], 300, 0.8, 20, 0.85, 20)
+    assert agents.tolist() == [_erlang_c_reference(5.0, 300, 0.8, 20, 0.85, 20), 20]
+
+
+def test_agents_for_applies_shrinkage_and_remembers_loads():
+    model = DemandModel(method="erlang_c", handle_seconds=180, shrinkage=0.25)
+    volumes = np.array([200.0, 0.0, 200.0, 400.0])  # contacts per hour
+    agents = agents_for(model, volumes)
+    base = erlang_c_agents(volumes * 180 / 3600, 180, 0.8, 20, 0.85, 500)
+    assert agents.tolist() == np.ceil(base / 0.75 - 1e-9).astype(int).tolist()
+    assert agents_for(model, volumes[::-1]).tolist() == agents[::-1].tolist()
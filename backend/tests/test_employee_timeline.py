@@ -0,0 +1,82 @@
+from conftest import make_employee, make_shift
+from models import ScheduleRequest, ShiftType
+from optimizers.CompiledProblem import CompiledProblem
+from optimizers.EmployeeTimeline import EmployeeTimeline
+from optimizers.FallbackOptimizer import FallbackOptimizer
+
+
+def _timeline(shifts, employees=None, **rules):
+    request = ScheduleRequest(start_date=shifts[0].date, end_date=shifts[-1].date,
+                              employees=employees or [make_employee("e1")], shifts=shifts,
+                              constraints={}, business_rules={})
+    return EmployeeTimeline(CompiledProblem(request), **rules)
+
+
+def test_one_shift_per_day_and_unassign(small_request):
+    timeline = EmployeeTimeline(CompiledProblem(small_request), min_rest_hours=0)
+    timeline.assign(0, 0)
+    assert not timeline.can_take(0, 1)  # s2, same day
+    assert timeline.can_take(0, 1, ignoring=0)  # moving s1 -> s2
+    timeline.unassign(0, 0)
+    assert timeline.can_take(0, 1)
+    assert timeline.week_hours(0, timeline.week[0]) == 0
+    assert not timeline.shifts(0)
+
+
+def test_min_rest_hours_spans_midnight():
+    # Night 22:00-06:00 then morning 06:00 the next day leaves no rest
+    shifts = [make_shift("n", "2025-11-03", ShiftType.NIGHT_SHIFT),
+              make_shift("m", "2025-11-04", ShiftType.MORNING_SHIFT),
+              make_shift("a", "2025-11-04", ShiftType.AFTERNOON_SHIFT)]
+    timeline = _timeline(shifts, min_rest_hours=11)
+    timeline.assign(0, 0)
+    assert not timeline.can_take(0, 1)
+    assert not timeline.can_take(0, 2)  # 14:00, eight hours after
+    shorter = _timeline(shifts, min_rest_hours=8)
+    shorter.assign(0, 0)
+    assert not shorter.can_take(0, 1)
+    assert shorter.can_take(0, 2)
+    relaxed = _timeline(shifts, min_rest_hours=0)
+    relaxed.assign(0, 0)
+    assert relaxed.can_take(0, 1)
+
+
+def test_max_consecutive_counts_both_sides():
+    shifts = [make_shift(f"d{day}", f"2025-11-{day:02d}") for day in range(3, 10)]
+    timeline = _timeline(shifts, min_rest_hours=0, max_consecutive=3)
+    for s_idx in (0, 1, 3, 4):  # 3rd, 4th, 6th and 7th
+        timeline.assign(0, s_idx)
+    assert not timeline.can_take(0, 2)  # 5th joins both runs into five days
+    assert timeline.can_take(0, 5)  # 8th: 6th-8th is three
+    timeline.unassign(0, 0)
+    timeline.unassign(0, 4)
+    assert timeline.can_take(0, 2)  # 4th-6th
+
+
+def test_weekly_hours_are_per_iso_week():
+    # Mon 3rd - Fri 7th, then Mon 10th: four 8h shifts fill a 32h week
+    shifts = [make_shift(f"d{day}", f"2025-11-{day:02d}") for day in (3, 4, 5, 6, 7, 10)]
+    timeline = _timeline(shifts, employees=[make_employee("e1", max_hours_per_week=32)],
+                         min_rest_hours=0, max_consecutive=0)
+    for s_idx in range(4):
+        timeline.assign(0, s_idx)
+    assert timeline.week_hours(0, timeline.week[0]) == 32
+    assert not timeline.can_take(0, 4)
+    assert timeline.can_take(0, 5)  # next ISO week
+    assert timeline.can_take(0, 4, ignoring=3)
+
+    overtime = _timeline(shifts, employees=[make_employee("e1", max_hours_per_week=32)],
+                         min_rest_hours=0, max_consecutive=0, max_overtime=8)
+    for s_idx in range(4):
+        overtime.assign(0, s_idx)
+    assert overtime.can_take(0, 4)
+
+
+def test_greedy_caps_hours_over_the_horizon():
+    # Two ISO weeks of one shift each; 8h per week fits, 16h in total does not
+    shifts = [make_shift("w1", "2025-11-07"), make_shift("w2", "2025-11-10")]
+    request = ScheduleRequest(start_date="2025-11-07", end_date="2025-11-10",
+                              employees=[make_employee("e1", max_hours_per_week=8)], shifts=shifts,
+                              constraints={}, business_rules={})
+    response = FallbackOptimizer().greedy(request)
+    assert sum(len(staff) for staff in response.assignments.values()) == 1
@@ -0,0 +1,24 @@
+from conftest import make_employee, make_shift
+from models import Department, ScheduleRequest
+from optimizers.GradualOptimizer import GradualOptimizer
+
+
+def _request():
+    # One support analyst; only the priority 4 engineering shift is open to them at phase 4
+    shifts = [make_shift("urgent", "2025-11-03", department=Department.ENGINEERING, priority=4),
+              make_shift("routine", "2025-11-04", department=Department.ENGINEERING, min_employees=0),
+              make_shift("python", "2025-11-05", required_skills={"python"}, min_employees=0)]
+    return ScheduleRequest(start_date="2025-11-03", end_date="2025-11-05",
+                           employees=[make_employee("e1")], shifts=shifts,
+                           constraints={}, business_rules={})
+
+
+def test_phase4_fills_priority_shifts_cross_department():
+    response = GradualOptimizer(time_limit=5).optimize(_request(), phase=4)
+    assert response.assignments == {"urgent": ["e1"], "routine": [], "python": []}
+    assert response.metrics["solution_type"] == "optimal"
+
+
+def test_phase3_ignores_qualifications():
+    response = GradualOptimizer(time_limit=5).optimize(_request(), phase=3)
+    assert response.assignments == {"urgent": ["e1"], "routine": ["e1"], "python": ["e1"]}
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+import pytest
+
+from jobs import JobManager, JobQueueFull
+
+
+def _fail(value):
+    raise ValueError(value)
+
+
+def test_run_all_returns_results_and_exceptions_in_order():
+    jobs = JobManager(max_workers=2, use_processes=False, warmup=())
+    try:
+        results = asyncio.run(jobs.run_all(divmod, [(7, 2), (9, 4)]))
+        assert results == [(3, 1), (2, 1)]
+        results = asyncio.run(jobs.run_all(_fail, [("bad",)]))
+        assert isinstance(results[0], ValueError)
+        assert jobs._pending() == 0
+    finally:
+        jobs.shutdown()
+
+
+def test_run_all_rejects_batches_that_overflow_the_queue():
+    jobs = JobManager(max_workers=1, max_pending=2, use_processes=False, warmup=())
+    try:
+        with pytest.raises(JobQueueFull):
+            asyncio.run(jobs.run_all(divmod, [(1, 1)] * 3))
+        assert jobs._pending() == 0
+        assert asyncio.run(jobs.run_all(divmod, [(1, 1)] * 2)) == [(1, 0), (1, 0)]
+    finally:
+        jobs.shutdown()
+
+
+def test_run_is_bounded_by_max_pending():
+    jobs = JobManager(max_workers=1, max_pending=1, use_processes=False, warmup=())
+
+    async def two_at_once():
+        first = asyncio.ensure_future(jobs.run(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(JobQueueFull):
+            await jobs.run(divmod, 1, 1)
+        with pytest.raises(JobQueueFull):
+            jobs.check_capacity()
+        await first
+        return await jobs.run(divmod, 7, 2)
+
+    try:
+        assert asyncio.run(two_at_once()) == (3, 1)
+        assert jobs._pending() == 0
+    finally:
+        jobs.shutdown()
@@ -0,0 +1,37 @@
+import pulp
+
+import optimizers.RollingHorizonOptimizer as rolling
+from conftest import make_employee, make_shift
+from models import ScheduleRequest, ShiftType
+from optimizers.MilpOptimizer import MilpOptimizer
+from optimizers.RollingHorizonOptimizer import RollingHorizonOptimizer
+
+
+class _FailSecondWindow(MilpOptimizer):
+    """Makes the second window's model infeasible, so the MILP falls back"""
+    built = 0
+
+    def _build_model(self, request):
+        super()._build_model(request)
+        type(self).built += 1
+        if type(self).built == 2:
+            impossible = pulp.LpVariable("impossible", lowBound=0, upBound=0)
+            self.problem += impossible >= 1, "impossible"
+
+
+def test_fallback_window_respects_the_fixed_context(monkeypatch):
+    monkeypatch.setattr(rolling, "MilpOptimizer", _FailSecondWindow)
+    # Night 22:00-06:00 on the 3rd, then a morning at 06:00: no rest for the only employee
+    request = ScheduleRequest(
+        start_date="2025-11-03", end_date="2025-11-04", employees=[make_employee("e1")],
+        shifts=[make_shift("night", "2025-11-03", ShiftType.NIGHT_SHIFT),
+                make_shift("morning", "2025-11-04", ShiftType.MORNING_SHIFT)],
+        constraints={"min_rest_hours": 11}, business_rules={})
+    response = RollingHorizonOptimizer(window_days=1, overlap_days=0, time_limit=5,
+                                       warm_start=False).optimize(request)
+
+    windows = response.metrics["windows"]
+    assert windows[0]["solution_type"] == "optimal"
+    assert windows[1]["solution_type"] in ("relaxed", "best_effort")
+    assert response.assignments == {"night": ["e1"], "morning": []}
+    assert windows[1]["dropped_assignments"] == 1
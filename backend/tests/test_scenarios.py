@@ -0,0 +1,53 @@
+import dataclasses
+import pickle
+
+import scenarios
+from conftest import make_employee, make_shift
+from optimizers.CompiledProblem import CompiledProblem
+
+
+def _solved(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scenarios, "solve_schedule",
+                        lambda request, phase, job_id, optimizer, options, compiled=None: calls.append(
+                            (request, compiled)))
+    return calls
+
+
+def test_tasks_carry_overrides_and_workers_rebuild_the_scenario(small_request, monkeypatch):
+    calls = _solved(monkeypatch)
+    compiled = CompiledProblem(small_request)
+    patched = dataclasses.replace(
+        small_request, employees=small_request.employees[1:] + [make_employee("e9")],
+        shifts=small_request.shifts + [make_shift("s5", "2025-11-04")])
+    variants = [small_request,
+                scenarios.scenario_request(small_request, {"min_rest_hours": 8}, {}),
+                scenarios.scenario_request(patched, {}, {})]
+    base_ref = scenarios.share_base(small_request, compiled)
+    try:
+        for variant in variants:
+            overrides = scenarios.scenario_overrides(small_request, variant)
+            assert len(pickle.dumps(overrides)) < len(pickle.dumps(small_request))
+            scenarios.solve_scenario(base_ref, overrides, "gradual", 1, {})
+    finally:
+        scenarios.release_base(base_ref)
+
+    (same, same_compiled), (rest, rest_compiled), (roster, roster_compiled) = calls
+    # Workers hold their own copy of the base, unpickled once
+    assert same.employees is same_compiled.request.employees
+    assert [e.id for e in same.employees] == ["e1", "e2", "e3"]
+    assert rest.constraints == {"min_rest_hours": 8} and rest_compiled is same_compiled
+    assert [e.id for e in roster.employees] == ["e2", "e3", "e9"]
+    assert [s.id for s in roster.shifts] == ["s1", "s2", "s3", "s4", "s5"]
+    assert roster_compiled is None
+
+
+def test_workers_load_each_base_once(small_request, monkeypatch):
+    calls = _solved(monkeypatch)
+    base_ref = scenarios.share_base(small_request, CompiledProblem(small_request))
+    overrides = scenarios.scenario_overrides(small_request, small_request)
+    scenarios.solve_scenario(base_ref, overrides, "gradual", 1, {})
+    scenarios.release_base(base_ref)
+    # The file is gone; the cached base still serves the problem key
+    scenarios.solve_scenario(base_ref, overrides, "gradual", 1, {})
+    assert calls[0][1] is calls[1][1]
@@ -0,0 +1,63 @@
+from models import ScheduleResponse
+from store import ScheduleStore, assignment_delta
+
+
+def _response(assignments, cost=100.0, coverage=50.0):
+    return ScheduleResponse(assignments=assignments, metrics={}, total_cost=cost, coverage_score=coverage,
+                            risk_assessment={})
+
+
+def test_versions_are_numbered_per_id(small_request):
+    store = ScheduleStore()
+    first = store.save(small_request, _response({"s1": ["e1"]}))
+    second = store.save(small_request, _response({"s1": ["e2"]}), first.id)
+    other = store.save(small_request, _response({}))
+    assert (first.version, second.version, other.version) == (1, 2, 1)
+    assert second.response.metrics["schedule_version"] == 2
+    assert store.get(first.id).version == 2
+    assert store.get(first.id, 1).response.assignments == {"s1": ["e1"]}
+    assert [v["version"] for v in store.versions(first.id)] == [1, 2]
+
+
+def test_processes_sharing_a_database_get_distinct_versions(tmp_path, small_request):
+    path = str(tmp_path / "schedules.sqlite3")
+    a, b = ScheduleStore(path=path), ScheduleStore(path=path)
+    first = a.save(small_request, _response({"s1": ["e1"]}))
+    second = b.save(small_request, _response({"s1": ["e2"]}), first.id)
+    third = a.save(small_request, _response({"s1": ["e3"]}), first.id)
+    assert (first.version, second.version, third.version) == (1, 2, 3)
+    # a's memory never saw version 2, it is read back from disk
+    assert a.get(first.id, 2).response.assignments == {"s1": ["e2"]}
+    assert a.get(first.id).version == 3
+    assert [v["version"] for v in b.versions(first.id)] == [1, 2, 3]
+
+
+def test_evicted_versions_are_read_back(tmp_path, small_request):
+    store = ScheduleStore(max_schedules=1, path=str(tmp_path / "s.sqlite3"))
+    kept = store.save(small_request, _response({"s1": ["e1"]}, cost=12.5))
+    store.save(small_request, _response({}))
+    restored = store.get(kept.id)
+    assert restored.response.total_cost == 12.5
+    assert restored.request.shifts[0].id == "s1"
+
+
+def test_diff_matches_between_memory_and_disk(tmp_path, small_request):
+    for path in (None, str(tmp_path / "s.sqlite3")):
+        store = ScheduleStore(max_schedules=1, path=path)
+        base = store.save(small_request, _response({"s1": ["e1"], "s3": ["e2"]}, cost=100, coverage=50))
+        store.save(small_request, _response({"s1": ["e2"], "s3": ["e2"], "s4": ["e1"]}, cost=150, coverage=75),
+                   base.id)
+        diff = store.diff(base.id, 1)
+        assert diff["to_version"] == 2
+        assert diff["added"] == {"s1": ["e2"], "s4": ["e1"]}
+        assert diff["removed"] == {"s1": ["e1"]}
+        assert diff["total_cost"]["delta"] == 50
+        assert diff["coverage_score"]["delta"] == 25
+        narrowed = store.diff(base.id, 1, 2, employee_id="e1", start_date="2025-11-04")
+        assert narrowed["added"] == {"s4": ["e1"]} and narrowed["removed"] == {}
+        assert store.diff(base.id, 1, 9) is None
+
+
+def test_assignment_delta():
+    delta = assignment_delta({"a": ["x", "y"], "b": ["x"]}, {"a": ["y", "z"], "c": ["x"]})
+    assert delta == {"added": {"a": ["z"], "c": ["x"]}, "removed": {"a": ["x"], "b": ["x"]}}
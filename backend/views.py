@@ -0,0 +1,226 @@
+import gzip
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from models import SHIFT_HOURS, SHIFT_TIMES, Employee, Shift
+
+# Bodies smaller than this are sent uncompressed even when gzip is accepted
+GZIP_MIN_BYTES = 1024
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Keys of shift_dict(), the columns of a compact page
+SHIFT_COLUMNS = ("id", "date", "shift_type", "department", "required_skill_level", "min_employees",
+                 "max_employees", "region", "priority", "expected_traffic")
+
+
+class ScheduleIndex:
+    """Positional indexes over one stored schedule version.
+
+    Shifts are kept in chronological order (date, then start time), so a
+    date range is a slice found by bisection. Assignments are lists of
+    employee positions per shift, and every employee has the sorted
+    positions of their shifts, so a rota never scans the whole schedule.
+    """
+
+    def __init__(self, request, response):
+        self.employees = request.employees
+        self.employee_ids = [e.id for e in request.employees]
+        self.employee_pos = {emp_id: i for i, emp_id in enumerate(self.employee_ids)}
+        self.shifts = sorted(request.shifts, key=lambda s: (s.date, SHIFT_TIMES.get(s.shift_type, (0, 0))[0]))
+        self.dates = [s.date for s in self.shifts]
+        self.assigned = [
+            [self.employee_pos[e] for e in response.assignments.get(s.id, ()) if e in self.employee_pos]
+            for s in self.shifts
+        ]
+        self.by_employee = [[] for _ in self.employee_ids]
+        for pos, staff in enumerate(self.assigned):
+            for e in staff:
+                self.by_employee[e].append(pos)
+
+    def date_range(self, start_date=None, end_date=None, days=None):
+        """(lo, hi) shift positions of a date range and the first date after it, if any
+
+        `days` counts calendar days from `start_date` (or the first shift
+        date) and wins over `end_date`. Raises ValueError for a malformed date.
+        """
+        if not self.dates:
+            return 0, 0, None
+        start = date.fromisoformat(start_date).isoformat() if start_date else self.dates[0]
+        if days is not None:
+            end = (date.fromisoformat(start) + timedelta(days=days - 1)).isoformat()
+        else:
+            end = date.fromisoformat(end_date).isoformat() if end_date else self.dates[-1]
+        lo = bisect_left(self.dates, start)
+        hi = max(lo, bisect_right(self.dates, end))
+        return lo, hi, self.dates[hi] if hi < len(self.dates) else None
+
+
+def schedule_index(stored) -> ScheduleIndex:
+    """The stored schedule's index, built on first use"""
+    if stored.index is None:
+        stored.index = ScheduleIndex(stored.request, stored.response)
+    return stored.index
+
+
+def shift_dict(shift: Shift):
+    return {
+        "id": shift.id,
+        "date": shift.date,
+        "shift_type": shift.shift_type.value,
+        "department": shift.department.value,
+        "required_skill_level": shift.required_skill_level.value,
+        "min_employees": shift.min_employees,
+        "max_employees": shift.max_employees,
+        "region": shift.region,
+        "priority": shift.priority,
+        "expected_traffic": shift.expected_traffic,
+    }
+
+
+def employee_dict(employee: Employee):
+    return {
+        "id": employee.id,
+        "name": employee.name,
+        "department": employee.department.value,
+        "skill_level": employee.skill_level.value,
+        "max_hours_per_week": employee.max_hours_per_week,
+        "cost_per_hour": employee.cost_per_hour,
+        "preferred_shift": employee.preferred_shift.value if employee.preferred_shift else None,
+    }
+
+
+def _page(lo, hi, next_date, index):
+    return {
+        "start_date": index.dates[lo] if lo < hi else None,
+        "end_date": index.dates[hi - 1] if lo < hi else None,
+        "shift_count": hi - lo,
+        "next_start_date": next_date,
+    }
+
+
+def schedule_page(stored, start_date=None, end_date=None, days=None, layout="compact",
+                  include_roster=True, include_metrics=False):
+    """Shifts and assignments of one date range of a stored schedule.
+
+    The "compact" layout has the shifts as columns and, aligned with them,
+    each shift's staff as positions in the `employees` id table. That
+    table covers the whole roster so it can be fetched once, with the
+    first page, and left out (include_roster=False) of later ones. The
+    "full" layout is a list of shift objects and a shift id -> employee
+    ids map, like ScheduleResponse.assignments.
+    """
+    index = schedule_index(stored)
+    lo, hi, next_date = index.date_range(start_date, end_date, days)
+    shifts = index.shifts[lo:hi]
+    response = stored.response
+    page = {
+        "schedule_id": stored.id,
+        "schedule_version": stored.version,
+        "layout": layout,
+        "total_cost": response.total_cost,
+        "coverage_score": response.coverage_score,
+        "page": _page(lo, hi, next_date, index),
+    }
+    if layout == "compact":
+        if include_roster:
+            page["employees"] = index.employee_ids
+        rows = [shift_dict(s) for s in shifts]
+        page["shifts"] = {key: [row[key] for row in rows] for key in SHIFT_COLUMNS}
+        page["assignments"] = index.assigned[lo:hi]
+    else:
+        page["shifts"] = [shift_dict(s) for s in shifts]
+        page["assignments"] = {
+            s.id: [index.employee_ids[e] for e in staff] for s, staff in zip(shifts, index.assigned[lo:hi])
+        }
+    if include_metrics:
+        page["metrics"] = response.metrics
+        page["risk_assessment"] = response.risk_assessment
+    return page
+
+
+def employee_rota(stored, employee_id, start_date=None, end_date=None, days=None):
+    """One employee's shifts in a date range with hours and cost per ISO week, or None if unknown"""
+    index = schedule_index(stored)
+    pos = index.employee_pos.get(employee_id)
+    if pos is None:
+        return None
+    employee = index.employees[pos]
+    lo, hi, next_date = index.date_range(start_date, end_date, days)
+    positions = index.by_employee[pos]
+    mine = positions[bisect_left(positions, lo):bisect_left(positions, hi)]
+
+    shifts, weeks = [], {}
+    for p in mine:
+        shift = index.shifts[p]
+        hours = SHIFT_HOURS.get(shift.shift_type, 8)
+        day = date.fromisoformat(shift.date)
+        week_start = (day - timedelta(days=day.weekday())).isoformat()
+        shifts.append({**shift_dict(shift), "hours": hours, "week_start": week_start})
+        week = weeks.setdefault(week_start, {"week_start": week_start, "shift_count": 0, "hours": 0, "cost": 0.0})
+        week["shift_count"] += 1
+        week["hours"] += hours
+        week["cost"] += hours * employee.cost_per_hour
+    for week in weeks.values():
+        week["cost"] = round(week["cost"], 2)
+        week["over_max_hours"] = week["hours"] > employee.max_hours_per_week
+
+    total_hours = sum(s["hours"] for s in shifts)
+    return {
+        "schedule_id": stored.id,
+        "schedule_version": stored.version,
+        "employee": employee_dict(employee),
+        "shifts": shifts,
+        "weeks": list(weeks.values()),
+        "total_hours": total_hours,
+        "total_cost": round(total_hours * employee.cost_per_hour, 2),
+        "page": _page(lo, hi, next_date, index),
+    }
+
+
+def schedule_etag(stored):
+    """Weak validator for a schedule version; versions never change once stored"""
+    return f'W/"{stored.id}.{stored.version}"'
+
+
+def not_modified(request: Request, etag):
+    """True if the client's If-None-Match already names `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def encoded_response(request: Request, payload, etag=None, status_code=200):
+    """Encode `payload` as the client asked: msgpack for an msgpack Accept
+    header (when msgpack is installed, JSON otherwise), then gzip when
+    accepted and worth it. Sets the ETag and Vary headers.
+    """
+    headers = {"Vary": "Accept, Accept-Encoding", "Cache-Control": "no-cache"}
+    if etag is not None:
+        headers["ETag"] = etag
+    if etag is not None and not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    body, media_type = None, "application/json"
+    accept = request.headers.get("accept", "")
+    if any(t in accept for t in MSGPACK_TYPES):
+        try:
+            import msgpack
+        except ImportError:
+            msgpack = None
+        if msgpack is not None:
+            body = msgpack.packb(jsonable_encoder(payload), use_bin_type=True)
+            media_type = "application/msgpack"
+    if body is None:
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
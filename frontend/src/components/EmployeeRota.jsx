@@ -1,17 +1,59 @@
-import React from 'react';
+import React, { useEffect, useMemo, useState } from 'react';
 import { ArrowLeft, Calendar, Clock, Building2, AlertTriangle } from 'lucide-react';
 import './EmployeeRota.css';
 
-const EmployeeRota = ({ employee, schedule, shifts, employees, onBack }) => {
-  // Get all shifts assigned to this employee
-  const getEmployeeShifts = () => {
+const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+
+const SHIFT_ORDER = {
+  'morning': 1,
+  'day': 2,
+  'swing': 3,
+  'night': 4,
+  'on_call': 5
+};
+
+const SHIFT_HOURS = {
+  'morning': 8,    // 6AM-2PM
+  'day': 8,        // 9AM-5PM
+  'swing': 8,      // 2PM-10PM
+  'night': 8,      // 10PM-6AM
+  'on_call': 4     // On-call typically counts as 4 hours
+};
+
+const EmployeeRota = ({ employee, schedule, scheduleId, shifts, employees, onBack }) => {
+  // Rota from the server's per-employee index once the schedule is stored
+  const [serverRota, setServerRota] = useState(null);
+
+  useEffect(() => {
+    if (!scheduleId) {
+      setServerRota(null);
+      return undefined;
+    }
+    const controller = new AbortController();
+    fetch(`${API_BASE}/api/schedule/${scheduleId}/employee/${encodeURIComponent(employee.id)}`, {
+      signal: controller.signal,
+    })
+      .then(response => (response.ok ? response.json() : null))
+      .then(setServerRota)
+      .catch(error => {
+        if (error.name !== 'AbortError') {
+          console.error('Error loading rota:', error);
+          setServerRota(null);
+        }
+      });
+    return () => controller.abort();
+  }, [scheduleId, employee.id]);
+
+  // Until then (e.g. while the schedule is still streaming) build it locally
+  const localShifts = useMemo(() => {
     if (!schedule) return [];
     
+    const shiftsById = new Map(shifts.map(shift => [shift.id, shift]));
     const employeeShifts = [];
     
     Object.entries(schedule).forEach(([shiftId, employeeIds]) => {
       if (employeeIds.includes(employee.id)) {
-        const shift = shifts.find(s => s.id === shiftId);
+        const shift = shiftsById.get(shiftId);
         if (shift) {
           employeeShifts.push({
             ...shift,
@@ -25,35 +67,24 @@ const EmployeeRota = ({ employee, schedule, shifts, employees, onBack }) => {
     return employeeShifts.sort((a, b) => {
       const dateCompare = new Date(a.date).getTime() - new Date(b.date).getTime();
       if (dateCompare !== 0) return dateCompare;
-      
-      const shiftOrder = {
-        'morning': 1,
-        'day': 2,
-        'swing': 3,
-        'night': 4,
-        'on_call': 5
-      };
-      
-      return (shiftOrder[a.shift_type] || 6) - (shiftOrder[b.shift_type] || 6);
+      return (SHIFT_ORDER[a.shift_type] || 6) - (SHIFT_ORDER[b.shift_type] || 6);
     });
-  };
+  }, [schedule, shifts, employee.id]);
 
-  const employeeShifts = getEmployeeShifts();
+  const employeeShifts = serverRota
+    ? serverRota.shifts.map(shift => ({ ...shift, shiftId: shift.id }))
+    : localShifts;
   
   // Calculate total hours and cost
   const calculateTotals = () => {
+    if (serverRota) {
+      return { totalHours: serverRota.total_hours, totalCost: serverRota.total_cost };
+    }
     let totalHours = 0;
     let totalCost = 0;
     
     employeeShifts.forEach(shift => {
-      const shiftHours = {
-        'morning': 8,    // 6AM-2PM
-        'day': 8,        // 9AM-5PM
-        'swing': 8,      // 2PM-10PM
-        'night': 8,      // 10PM-6AM
-        'on_call': 4     // On-call typically counts as 4 hours
-      }[shift.shift_type] || 8;
-      
+      const shiftHours = SHIFT_HOURS[shift.shift_type] || 8;
       totalHours += shiftHours;
       totalCost += shiftHours * employee.cost_per_hour;
     });
@@ -192,7 +223,7 @@ const EmployeeRota = ({ employee, schedule, shifts, employees, onBack }) => {
                       </div>
                       <div className="shift-meta">
                         <span className="priority">Priority: {shift.priority}</span>
-                        {shift.is_weekend && <span className="weekend-tag">Weekend</span>}
+                        {(shift.is_weekend ?? [0, 6].includes(new Date(shift.date).getUTCDay())) && <span className="weekend-tag">Weekend</span>}
                       </div>
                     </div>
                   ))}
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import axios from 'axios';
 import './WorkforceScheduler.css';
 import EmployeeRota from './EmployeeRota';
@@ -47,13 +47,37 @@ const getDepartmentColor = (department) => {
   return colorMap[department] || '#6B7280';
 };
 
+// Constraints the demo endpoint solves with
+const DEMO_CONSTRAINTS = {
+  max_overtime: 10,
+  min_rest_hours: 12,
+  max_consecutive_shifts: 5,
+  require_qualifications: true,
+  enforce_department_matching: true
+};
+
+// Apply a {added, removed} delta from the schedule stream to an assignments map
+const applyAssignmentDelta = (assignments, delta) => {
+  const next = { ...assignments };
+  Object.entries(delta.removed).forEach(([shiftId, employeeIds]) => {
+    next[shiftId] = (next[shiftId] || []).filter(id => !employeeIds.includes(id));
+  });
+  Object.entries(delta.added).forEach(([shiftId, employeeIds]) => {
+    next[shiftId] = [...(next[shiftId] || []), ...employeeIds];
+  });
+  return next;
+};
+
 const WorkforceScheduler = () => {
   const [employees, setEmployees] = useState([]);
   const [shifts, setShifts] = useState([]);
   const [schedule, setSchedule] = useState(null);
+  const [scheduleId, setScheduleId] = useState(null);
   const [metrics, setMetrics] = useState(null);
   const [riskAssessment, setRiskAssessment] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [streamStage, setStreamStage] = useState(null);
+  const streamController = useRef(null);
   const [activeTab, setActiveTab] = useState('schedule');
   const [selectedEmployee, setSelectedEmployee] = useState(null);
   const [showRota, setShowRota] = useState(false);
@@ -84,6 +108,7 @@ const WorkforceScheduler = () => {
       <EmployeeRota 
         employee={selectedEmployee}
         schedule={schedule}
+        scheduleId={scheduleId}
         shifts={shifts}
         employees={employees}
         onBack={handleBackToSchedule}
@@ -148,6 +173,7 @@ const WorkforceScheduler = () => {
       setEmployees(data.input_data.employees);
       setShifts(data.input_data.shifts);
       setSchedule(null);
+      setScheduleId(null);
       setMetrics(null);
       setRiskAssessment(null);
       setActiveTab('employees');
@@ -164,29 +190,29 @@ const WorkforceScheduler = () => {
   
   const generateDemoSchedule = async (config) => {
     setLoading(true);
+    const controller = new AbortController();
+    streamController.current = controller;
+    setScheduleId(null);
     try {
-      console.log('Generating schedule with config:', config);
-      
-      // Convert percentages to decimals for the backend
-      const distributionDecimals = {
-        ad_operations: config.employeeDistribution.ad_operations / 100,
-        engineering: config.employeeDistribution.engineering / 100,
-        support: config.employeeDistribution.support / 100
-      };
+      console.log('Streaming schedule with config:', config);
       
+      const endDate = shifts.reduce((latest, shift) => (shift.date > latest ? shift.date : latest), config.startDate);
       const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:8000';
-      const response = await fetch(`${API_BASE}/api/generate-demo-schedule`, {
+      const response = await fetch(`${API_BASE}/api/schedule/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-          numEmployees: config.numEmployees,
-          numDays: config.numDays,
-          startDate: config.startDate,
-          employeeDistribution: distributionDecimals,
-          loadOnly: false // Generate full schedule
+          start_date: config.startDate,
+          end_date: endDate,
+          employees,
+          shifts,
+          constraints: DEMO_CONSTRAINTS,
+          optimizer: 'milp',
+          time_limit_seconds: 30
         }),
+        signal: controller.signal,
       });
       
       if (!response.ok) {
@@ -194,29 +220,62 @@ const WorkforceScheduler = () => {
         throw new Error(`Server error: ${response.status} - ${errorText}`);
       }
       
-      const data = await response.json();
-      console.log('Received schedule data:', data);
-      
-      // Update both the input data AND the schedule results
-      setEmployees(data.input_data.employees);
-      setShifts(data.input_data.shifts);
-      setSchedule(data.schedule.assignments);
-      setMetrics(data.schedule.metrics);
-      setRiskAssessment(data.schedule.risk_assessment);
-      setActiveTab('schedule');
+      // Server-Sent Events: a quick greedy schedule first, then one event per solver stage
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let assignments = {};
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop();
+        
+        for (const frame of frames) {
+          const event = frame.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(frame.match(/^data: (.*)$/m)?.[1] || 'null');
+          if (event === 'schedule') {
+            assignments = applyAssignmentDelta(assignments, data.delta);
+            setSchedule(assignments);
+            setMetrics(data.metrics);
+            setRiskAssessment(data.risk_assessment);
+            setStreamStage(data.stage);
+            setActiveTab('schedule');
+            console.log(`Stage ${data.stage}: coverage ${data.coverage_score.toFixed(1)}% after ${data.elapsed_ms}ms`);
+          } else if (event === 'done') {
+            setScheduleId(data.schedule_id);
+          } else if (event === 'error') {
+            throw new Error(data.error);
+          }
+        }
+      }
       
     } catch (error) {
-      console.error('Error generating schedule:', error);
-      alert(`Error generating schedule: ${error.message}`);
+      if (error.name === 'AbortError') {
+        console.log('Schedule stream stopped; keeping the best schedule so far');
+      } else {
+        console.error('Error generating schedule:', error);
+        alert(`Error generating schedule: ${error.message}`);
+      }
     } finally {
+      streamController.current = null;
+      setStreamStage(null);
       setLoading(false);
     }
   };
 
+  const stopGenerating = () => {
+    if (streamController.current) {
+      streamController.current.abort();
+    }
+  };
+
   const reset = () => {
     setEmployees([]);
     setShifts([]);
     setSchedule(null);
+    setScheduleId(null);
     setMetrics(null);
     setRiskAssessment(null);
     setDemoConfig({
@@ -358,9 +417,18 @@ const WorkforceScheduler = () => {
       onClick={() => generateDemoSchedule(demoConfig)}
       disabled={loading || employees.length === 0}
     >
-      {loading ? 'Generating...' : 'Generate Optimized Schedule'}
+      {loading ? (streamStage ? `Improving (${streamStage})...` : 'Generating...') : 'Generate Optimized Schedule'}
     </button>
 
+    {streamStage && (
+      <button 
+        className="btn btn-secondary"
+        onClick={stopGenerating}
+      >
+        Stop
+      </button>
+    )}
+
     <button 
       className="btn btn-warning"
       onClick={reset} 